@@ -0,0 +1,172 @@
+"""
+End-to-end latency benchmark: stick movement -> key event.
+
+Runs the real driver and ControlLoop against a virtual device (a pty DUML
+server for N1/M300, a stub joystick for RC3) and records key events in a
+sink instead of sending them to the OS.
+
+cpu_per_frame_us is the loop thread's CPU time per controller frame the
+loop consumed (update() returned True); cpu_per_tick_us divides the same
+time by every tick, idle ones included. With --threaded the device I/O
+runs on the acquisition thread and is not part of either.
+
+    python -m benchmarks.bench_latency --model N1 --rate 250 --out n1.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import threading
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+
+from src.keyboard.keyboard import KeyboardEmulator
+from src.keyboard.sinks import RecordingSink
+from src.remote_controller.acquisition import ThreadedController
+from src.remote_controller.dji_m300 import DJIM300
+from src.remote_controller.dji_rcN1 import DJIRCN1
+from src.utils.control_loop import ControlLoop
+from src.utils.scheduler import TickScheduler
+from benchmarks.virtual_devices import VirtualDumlDevice, StubJoystick, StubbedRC3
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def build(model, pipeline_depth, threaded):
+    if model == 'RC3':
+        pygame.display.init()
+        device = StubJoystick()
+        rc = StubbedRC3(device)
+    else:
+        device = VirtualDumlDevice(model=model)
+        cls = DJIRCN1 if model == 'N1' else DJIM300
+        rc = cls(port=device.port, pipeline_depth=pipeline_depth, deadzone_threshold_movement=0.3, deadzone_threshold_elevation=0.6)
+    if threaded:
+        rc = ThreadedController(rc)
+    return device, rc
+
+
+def stimulate(device, sink, results, moves, stop, settle=0.02, timeout=0.5):
+    """Flips pitch between 0 and full forward and times the matching 'w' event."""
+    target = 0.0
+    for _ in range(moves):
+        if stop.is_set():
+            break
+        target = 1.0 if target == 0.0 else 0.0
+        seen = len(sink.events)
+        device.set_axes(pitch=target)
+
+        deadline = time.perf_counter() + timeout
+        latency = None
+        while time.perf_counter() < deadline and latency is None:
+            for t, pressed, key in sink.events[seen:]:
+                if key == 'w' and pressed == (target > 0):
+                    latency = t - device.changed_at
+                    break
+            time.sleep(0.0002)
+
+        if latency is None:
+            results['timeouts'] += 1
+        else:
+            results['latencies'].append(latency)
+        time.sleep(settle + random.random() * settle)
+    stop.set()
+
+
+def run(model, rate, moves, pipeline_depth=1, threaded=False, spin=0.0):
+    device, rc = build(model, pipeline_depth, threaded)
+    # Key events are timestamped in a sink instead of going to the OS
+    sink = RecordingSink()
+    k_emu = KeyboardEmulator(print_events=False, sinks=[sink])
+    loop = ControlLoop(rc, k_emu)
+    scheduler = TickScheduler(rate=rate, spin=spin)
+
+    # Frames the loop consumed, counted the way Metrics times methods: by wrapping
+    frames = [0]
+    update = rc.update
+
+    def counted_update():
+        ok = update()
+        frames[0] += bool(ok)
+        return ok
+
+    rc.update = counted_update
+
+    results = {'latencies': [], 'timeouts': 0}
+    stop = threading.Event()
+    driver = threading.Thread(target=stimulate, args=(device, sink, results, moves, stop), daemon=True)
+
+    cpu_start = time.thread_time()
+    wall_start = time.perf_counter()
+    driver.start()
+    scheduler.reset()
+    ticks = 0
+    while not stop.is_set():
+        scheduler.wait()
+        loop.tick()
+        ticks += 1
+    wall = time.perf_counter() - wall_start
+    cpu = time.thread_time() - cpu_start
+
+    parser = getattr(getattr(rc, 'rc', rc), 'parser', None)
+    rc.close()
+    if hasattr(device, 'close'):
+        device.close()
+
+    ms = [x * 1000.0 for x in results['latencies']]
+    return {
+        'model': model,
+        'rate_target_hz': rate,
+        'pipeline_depth': pipeline_depth,
+        'threaded': threaded,
+        'moves': moves,
+        'samples': len(ms),
+        'timeouts': results['timeouts'],
+        'latency_ms': {
+            'p50': percentile(ms, 50),
+            'p99': percentile(ms, 99),
+            'max': max(ms) if ms else None,
+            'mean': statistics.fmean(ms) if ms else None,
+        },
+        'loop_rate_hz': ticks / wall if wall else 0.0,
+        'device_frames': parser.frames if parser is not None else None,
+        'loop_frames': frames[0],
+        'cpu_per_frame_us': cpu / frames[0] * 1e6 if frames[0] else None,
+        'cpu_per_tick_us': cpu / ticks * 1e6 if ticks else None,
+        'overruns': scheduler.overruns,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RC -> keyboard latency benchmark")
+    parser.add_argument('--model', nargs='+', default=['RC3', 'N1', 'M300'], choices=['RC3', 'N1', 'M300'])
+    parser.add_argument('--rate', type=float, default=250.0, help='Control loop rate in Hz')
+    parser.add_argument('--moves', type=int, default=200, help='Stick movements to time per model')
+    parser.add_argument('--pipeline', type=int, default=1, help='Poll pipeline depth for N1/M300')
+    parser.add_argument('--threaded', action='store_true', help='Use the background acquisition thread')
+    parser.add_argument('--out', type=str, default=None, help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    report = [run(model, args.rate, args.moves, pipeline_depth=args.pipeline, threaded=args.threaded) for model in args.model]
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
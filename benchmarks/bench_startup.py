@@ -0,0 +1,119 @@
+"""
+Startup benchmark: how long until a fresh process has its first frame.
+
+Every run is a new interpreter (imports are cached otherwise) that
+imports main.py, imports the selected driver through the registry,
+connects and polls until the first frame. N1/M300 talk to a virtual DUML
+device on a pty, RC3 reads a stub joystick through the real driver.
+
+    python -m benchmarks.bench_startup --model RC3 N1 --repeat 5 --out startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.virtual_devices import VirtualDumlDevice
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DRIVER_MODULES = {
+    'RC3': 'src.remote_controller.dji_rc3',
+    'N1': 'src.remote_controller.dji_rcN1',
+    'M300': 'src.remote_controller.dji_m300',
+}
+
+# Runs in the child; prints one JSON line with its timings (ms)
+CHILD = r'''
+import importlib, json, os, sys, time
+start = time.perf_counter()
+model, port, module = sys.argv[1], sys.argv[2], sys.argv[3]
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import main
+from src.remote_controller import registry
+imported_main = time.perf_counter()
+
+importlib.import_module(module)
+imported_driver = time.perf_counter()
+
+if model == 'RC3':
+    import pygame
+    pygame.display.init()
+    from benchmarks.virtual_devices import StubJoystick, StubbedRC3
+    rc = StubbedRC3(StubJoystick())
+else:
+    rc = registry.create(model, port=port)
+connected = time.perf_counter()
+
+deadline = connected + 5.0
+while not rc.update():
+    if time.perf_counter() > deadline:
+        sys.exit('no frame within 5 s')
+first_frame = time.perf_counter()
+rc.close()
+
+loaded = sorted(name for name in ('pygame', 'serial', 'pynput') if name in sys.modules)
+print(json.dumps({
+    'import_main_ms': (imported_main - start) * 1000,
+    'import_driver_ms': (imported_driver - imported_main) * 1000,
+    'connect_ms': (connected - imported_driver) * 1000,
+    'first_frame_ms': (first_frame - connected) * 1000,
+    'loaded': loaded,
+}))
+'''
+
+
+def run_once(model, port):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD, model, port or '', DRIVER_MODULES[model]],
+                            cwd=ROOT, capture_output=True, text=True, timeout=60)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{model} startup run failed: {result.stderr.strip()}")
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    # Interpreter start and exit included
+    timings['process_ms'] = wall * 1000
+    return timings
+
+
+def run(model, repeat):
+    device = VirtualDumlDevice(model=model) if model != 'RC3' else None
+    try:
+        runs = [run_once(model, device.port if device else None) for _ in range(repeat)]
+    finally:
+        if device:
+            device.close()
+
+    report = {'model': model, 'repeat': repeat}
+    for key in ('import_main_ms', 'import_driver_ms', 'connect_ms', 'first_frame_ms', 'process_ms'):
+        values = [r[key] for r in runs]
+        report[key] = {'median': statistics.median(values), 'min': min(values), 'max': max(values)}
+    report['loaded'] = runs[-1]['loaded']
+    report['python'] = platform.python_version()
+    report['platform'] = platform.platform()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time benchmark: import and first frame per model")
+    parser.add_argument('--model', nargs='+', default=['RC3', 'N1', 'M300'], choices=list(DRIVER_MODULES))
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh processes per model')
+    parser.add_argument('--out', type=str, default=None, help='Write JSON results here instead of stdout')
+    args = parser.parse_args()
+
+    report = [run(model, args.repeat) for model in args.model]
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
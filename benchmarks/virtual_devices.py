@@ -0,0 +1,66 @@
+import time
+
+from src.remote_controller.dji_rc3 import DJIRC3
+from src.utils.rc_emulator import ManualTrajectory, RCEmulator
+
+class VirtualDumlDevice(RCEmulator):
+    """
+    The RC emulator with sticks set from code (no impairments by default).
+    `changed_at` is the time of the last set_axes() call, i.e. when the
+    stick "moved".
+    """
+    def __init__(self, reply_delay=0.0, model='N1'):
+        super().__init__(model, ManualTrajectory(), latency=reply_delay)
+
+    def set_axes(self, **values):
+        self.trajectory.set_axes(**values)
+
+    @property
+    def axes(self):
+        return self.trajectory.axes
+
+    @property
+    def changed_at(self):
+        return self.trajectory.changed_at
+
+
+class StubJoystick:
+    """Stands in for pygame.joystick.Joystick with settable axes/buttons."""
+    def __init__(self):
+        self.axes = [0.0] * 4
+        self.buttons = [0] * 8
+        self.changed_at = None
+
+    def set_axes(self, roll=None, pitch=None, throttle=None, yaw=None):
+        for i, value in enumerate((roll, pitch, throttle, yaw)):
+            if value is not None:
+                self.axes[i] = value
+        self.changed_at = time.perf_counter()
+
+    def get_axis(self, i):
+        return self.axes[i]
+
+    def get_button(self, i):
+        return self.buttons[i]
+
+    def init(self):
+        pass
+
+    def get_instance_id(self):
+        return id(self)
+
+    def get_name(self):
+        return 'Stub DJI RC3'
+
+    def get_init(self):
+        return True
+
+    def quit(self):
+        pass
+
+
+class StubbedRC3(DJIRC3):
+    """The real DJIRC3, built through its joystick_factory hook around a StubJoystick."""
+    def __init__(self, js, deadzone_threshold_movement=0.3, deadzone_threshold_elevation=0.6, event_driven=False):
+        super().__init__(0, deadzone_threshold_movement=deadzone_threshold_movement, deadzone_threshold_elevation=deadzone_threshold_elevation,
+                         event_driven=event_driven, joystick_factory=lambda device_index: js)
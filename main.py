@@ -1,186 +1,597 @@
+import os
 import time
 import argparse
-import serial.tools.list_ports
-from src.remote_controller.dji_rc3 import DJIRC3
-from src.remote_controller.dji_rcN1 import DJIRCN1
-from src.remote_controller.dji_m300 import DJIM300
-from src.remote_controller.base_rc import RCConnectionError
+import multiprocessing
+from src.remote_controller import registry
+from src.remote_controller.base_rc import RCConnectionError, RCConfigurationError
+from src.remote_controller.acquisition import ThreadedController
+from src.remote_controller.process_reader import ProcessController
+from src.remote_controller.supervisor import ControllerSupervisor
+from src.remote_controller.multi_rc import MergedController
 
-from src.utils.sequence import SequenceHandler, SequenceStep
-from src.keyboard.keyboard import KeyboardEmulator, KbAxis, KbButton
+from src.utils.scheduler import TickScheduler
+from src.utils.recorder import FrameRecorder
+from src.utils.control_loop import ControlLoop
+from src.utils.profile import compile_profiles
+from src.utils.metrics import Metrics, MetricsServer, MetricsDumper
+from src.utils.profiler import LoopProfiler
+from src.utils.event_log import log
+from src.utils.state_publisher import StatePublisher
+from src.keyboard.keyboard import KeyboardEmulator
+from src.keyboard.sinks import parse_sink
 
 
 
-def main(model_choice):
-    print(f"--- DJI Universal Interface | Target: {model_choice} ---")
+def create_controller(model_choice, axis_options=None, **options):
+    """Builds the driver for a model. Module-level so a reader process can call it."""
+    rc = registry.create(model_choice, **options)
+    if axis_options:
+        rc.axis_filter.configure(**axis_options)
+    return rc
 
-    rc = None
-    retry_limit = 15
+
+def list_devices():
+    """Probes every serial port for every DUML model and prints what answers."""
+    from src.remote_controller.discovery import discover_all, list_ports
+    ports = list_ports()
+    if not ports:
+        print("No serial ports found.")
+        return
+    found = discover_all()
+    for port in ports:
+        print(f"{port}: {found.get(port, 'no DJI controller')}")
+
+
+def connect(controller_args, isolated=False, record_path=None, retry_limit=15):
+    """Builds one controller, retrying while the device is not there yet."""
+    model_choice = controller_args['model_choice']
+
+    if isolated:
+        # The device lives in a child process that is restarted if it dies
+        return ProcessController(create_controller, controller_args, model_name=model_choice, record_path=record_path)
 
     for retry in range(retry_limit):
         try:
-            if model_choice == 'RC3':
-                rc = DJIRC3(joystick_index=0, deadzone_threshold_movement=0.3, deadzone_threshold_elevation=0.6)
-            elif model_choice == 'M300':
-                rc = DJIM300()
-            elif model_choice == 'N1':
-                rc = DJIRCN1()
+            rc = create_controller(**controller_args)
             
             # If we reach this line, constructor succeeded
             print(f"Successfully connected to {model_choice}!")
-            break 
-            
+            return rc
+
+        except RCConfigurationError as e:
+            # Bad settings (e.g. a missing recording): no point in waiting
+            print(f"Cannot start {model_choice}: {e}")
+            return None
+
         except RCConnectionError as e:
-            rc = None
             print(f"Retrying... [{retry}/{retry_limit}] {e}")
             time.sleep(1)
+    return None
 
-    k_emu = KeyboardEmulator(emulate_hardware=True, print_events=True)
 
-    seq_handler = SequenceHandler()
-    cross_and_turn = [
-        SequenceStep(duration=3.0, axes_map={KbAxis.PITCH: 1.0, KbAxis.YAW: 0.0}), # Cross
-        SequenceStep(duration=0.1, axes_map={KbButton.PAUSE: True}), # Wait
-        SequenceStep(duration=8.0, axes_map={KbAxis.PITCH: 0.0, KbAxis.YAW: 1.0}), # Turn 180
-    ]
+def main(model_choice, pipeline_depth=1, threaded=False, rate=100.0, spin=0.0, on_overrun='skip', pwm_period=None,
+         record_path=None, replay_path=None, replay_speed=1.0, isolated=False, ports=None, reconnect=True,
+         event_driven=False, axis_owners=None, mapping_paths=None, mapping_switch=None,
+         metrics_port=None, metrics_path=None, metrics_interval=10.0,
+         profile_mode=None, profile_path=None, profile_interval=0.001, profile_window=30.0, slow_tick=None,
+         log_path=None, console='all', log_rates=None, log_summary=10.0, axis_options=None,
+         sink_specs=None, state_name=None, reclaim_shm=False):
+    models = [model_choice] if isinstance(model_choice, str) else list(model_choice)
+    merged = len(models) > 1
+    print(f"--- DJI Universal Interface | Target: {' + '.join(models)} ---")
 
+    # ports: one serial port (or None, auto-detect) per controller;
+    # device_index: the Nth controller of its model, e.g. the second RC3 joystick
+    ports = list(ports or []) + [None] * (len(models) - len(ports or []))
+    all_args = [dict(model_choice=model, pipeline_depth=pipeline_depth,
+                     replay_path=replay_path, replay_speed=replay_speed,
+                     port=ports[i], device_index=models[:i].count(model),
+                     event_driven=event_driven, axis_options=axis_options)
+                for i, model in enumerate(models)]
 
-    last_camera = None
+    controllers = []
+    for args in all_args:
+        # Auto-detection skips the ports given to the other controllers or already opened by them
+        claimed = ports + [getattr(rc, 'port', None) for rc in controllers]
+        args['exclude_ports'] = tuple(p for p in claimed if p and p != args['port'])
+        controllers.append(connect(args, isolated, None if merged else record_path))
+    if isolated:
+        record_path = None  # recorded inside the child
+    if None in controllers:
+        print("Could not connect to every controller.")
+        for rc in controllers:
+            if rc: rc.close()
+        return
 
-    # State toggles
-    hold_cruise = False  # Locks Pitch
-    hold_turn = False    # Locks Yaw
-    seq_running = False
+    sinks = []
+    try:
+        # Default: the OS keyboard only
+        for spec in sink_specs or ['keyboard']:
+            sinks.append(parse_sink(spec, reclaim=reclaim_shm))
+    except (OSError, ValueError) as e:
+        print(f"Could not open output sink: {e}")
+        if isinstance(e, FileExistsError):
+            print("Another instance is using that shared memory name, or a killed run left it behind (--reclaim-shm replaces it)")
+        for sink in sinks:
+            sink.close()
+        for rc in controllers:
+            rc.close()
+        return
 
-    # Values to store when hold is activated
-    frozen_pitch = 0.0
-    frozen_roll = 0.0
-    frozen_yaw = 0.0
+    k_emu = KeyboardEmulator(print_events=True, pwm_period=pwm_period, sinks=sinks)
 
-    # 3. Universal loop
     try:
-        print("Streaming data. Press Ctrl+C to stop.")
-        while True:
-            if not rc.is_connected:
-                print("[!!!] CONTROLLER DISCONNECTED [!!!]")
-                break
+        profiles = compile_profiles(mapping_paths, k_emu)
+    except (OSError, ValueError) as e:
+        print(f"Could not load mapping profile: {e}")
+        k_emu.close()
+        for rc in controllers:
+            rc.close()
+        return
+    for profile in profiles:
+        print(f"Mapping: {profile}")
 
-            if not rc.update(): continue
-
-            if rc.button1.is_short_tap:
-                print('>>> Emergency PAUSE for 3 sec <<<')
-                seq_handler.stop()
-                k_emu.force_cleanup()
-                hold_cruise = False
-                hold_turn = False
-                time.sleep(3)
-                print('>>> Emergency PAUSE Finished <<<')
-                continue
-
-            if rc.button3.is_long_press and not (hold_cruise or hold_turn):
-                if seq_running:
-                    seq_handler.stop()
-                else:
-                    seq_handler.start_sequence(cross_and_turn)
-
-            overrides, seq_running = seq_handler.update()
-            
-            if not seq_running:
-                # --- enable cruise ---
-                if rc.button4.is_short_tap:
-                    if hold_cruise:
-                        print('>>> DISABLE CRUISE <<<')
-                        hold_cruise = False
-                    else:
-                        if hold_turn:
-                            print('>>> DISABLE TURN <<<')
-                            hold_turn = False
-                        elif rc.yaw != 0:
-                            print('>>> ENABLE TURN <<<')
-                            frozen_yaw = rc.yaw
-                            hold_turn = True
-
-                if rc.button1.is_maintained_long_press and rc.button4.is_short_tap:
-                    print('>>> ENABLE FORWARD CRUISE <<<')
-                    hold_cruise = True
-                    frozen_pitch = 1
-                    frozen_roll = 0
-
-                if rc.button4.is_long_press:
-                    if rc.pitch != 0 or rc.roll != 0:
-                        print('>>> ENABLE FREE CRUISE <<<')
-                        hold_cruise = True
-                        frozen_pitch = rc.pitch
-                        frozen_roll = rc.roll
-                    else:
-                        print('>>> FREE CRUISE HAS NO VALUES TO CRUISE<<<')
+    if reconnect and not isolated:
+        # Unplugging releases every key and the session resumes on replug.
+        # When read from another thread the loop releases them on seeing rc.connected drop.
+        controllers = [
+            ControllerSupervisor(rc, lambda args=args: create_controller(**args),
+                                 on_disconnect=None if threaded or merged else k_emu.cleanup)
+            if args['model_choice'] != 'REPLAY' else rc
+            for rc, args in zip(controllers, all_args)
+        ]
 
-            
+    recorder = None
+    if record_path and not merged:
+        recorder = FrameRecorder(record_path, models[0])
+        controllers[0].recorder = recorder
 
-            # --- Determine Final Axis Values ---
-            # If Cruise is on, use the frozen pitch, otherwise use real-time stick
-            pitch_val = frozen_pitch if hold_cruise else overrides.get(KbAxis.PITCH, rc.pitch)
-            
-            # Roll remains real-time unless you want to lock that too
-            roll_val = frozen_roll if hold_cruise else overrides.get(KbAxis.ROLL, rc.roll)
-            
-            # If Hold Turn is on, use the frozen yaw, otherwise use real-time stick
-            yaw_val = frozen_yaw if hold_turn else overrides.get(KbAxis.YAW, rc.yaw)
+    if merged:
+        # Every controller is read on its own thread and merged once per tick
+        rc = MergedController(controllers, owners=axis_owners)
+    elif threaded:
+        # Device I/O moves to its own thread; the loop below reads snapshots
+        rc = ThreadedController(controllers[0])
+    else:
+        rc = controllers[0]
 
-            # --- 2. Handle Mode Switch (Camera modes) ---
-            if rc.sw1 != last_camera:
-                target = {1: KbButton.CAMERA_WIDE, 0: KbButton.CAMERA_ZOOM, -1: KbButton.CAMERA_IR}.get(rc.sw1)
-                if target: k_emu.tap(target)
-                last_camera = rc.sw1
-
-            if overrides.get(KbButton.PAUSE, False):
-                k_emu.tap(KbButton.PAUSE)
+    loop = ControlLoop(rc, k_emu, profiles, switch=mapping_switch)
+    if state_name:
+        # Observers read it with src.utils.state_publisher.StateReader
+        try:
+            loop.publisher = StatePublisher(state_name, reclaim=reclaim_shm)
+            print(f"Publishing state to shared memory '{loop.publisher.name}'")
+        except OSError as e:
+            print(f"Could not publish state: {e}")
+    # Event-driven input wakes the loop as soon as the controller reports a change
+    waiter = rc.wait_for_input if event_driven and not (threaded or isolated or merged) else None
+    scheduler = TickScheduler(rate=rate, spin=spin, on_overrun=on_overrun, waiter=waiter)
 
-            # --- 3. Handle Buttons (One-shot Taps) ---
-            if rc.button2.is_short_tap:
-                k_emu.tap(KbButton.ANNOTATION)
+    exporters = []
+    reconnect_hooks = []  # re-instrument drivers rebuilt after a reconnect
+    if metrics_port or metrics_path:
+        # Wraps the stage methods in place; without --metrics-* nothing is timed
+        metrics = Metrics()
+        metrics.instrument_controller(rc)
+        metrics.instrument_keyboard(k_emu)
+        metrics.instrument_loop(loop, scheduler)
+        reconnect_hooks.append(metrics.instrument_driver)
+        if metrics_port:
+            try:
+                exporters.append(MetricsServer(metrics, metrics_port))
+            except OSError as e:
+                print(f"Could not serve metrics on port {metrics_port}: {e}")
+                rc.close()
+                if recorder: recorder.close()
+                if loop.publisher: loop.publisher.close()
+                k_emu.close()
+                return
+        if metrics_path:
+            exporters.append(MetricsDumper(metrics, metrics_path, metrics_interval))
 
-            if rc.button3.is_short_tap:
-                k_emu.tap(KbButton.PICTURE)
+    profiler = None
+    if profile_mode or slow_tick:
+        profiler = LoopProfiler(profile_mode, profile_path, profile_interval, profile_window, slow_tick)
+        profiler.attach(rc, k_emu, loop, scheduler)
+        reconnect_hooks.append(profiler.on_reconnect)
 
-            # --- 4. Handle Keyboard Emulation ---
-            # We send the processed pitch_val and yaw_val (either live or frozen)
-            k_emu.handle_axis(KbAxis.PITCH, pitch_val)
-            k_emu.handle_axis(KbAxis.ROLL, roll_val)
-            k_emu.handle_axis(KbAxis.YAW, yaw_val)
+    def instrument_new_driver(driver):
+        for hook in reconnect_hooks:
+            hook(driver)
 
-            # Extra Camera Yaw (Fast phase) if in Wide mode
-            if last_camera == 1:
-                k_emu.handle_axis(KbAxis.CAMERA_YAW, yaw_val)
+    if reconnect_hooks:
+        for supervisor in controllers:
+            if isinstance(supervisor, ControllerSupervisor):
+                supervisor.on_reconnect = lambda supervisor=supervisor: instrument_new_driver(supervisor.rc)
 
-            # Elevation (Throttle)
-            k_emu.handle_axis(KbAxis.THROTTLE, rc.throttle)
+    # Console and log file output move to a writer thread from here on
+    if log_rates:
+        log.set_rate_limits(log_rates)
+    log.start(log_path, console=console, summary_interval=log_summary)
 
-            # Camera Tilt (Gimbal)
-            k_emu.handle_axis(KbAxis.CAMERA_PITCH, rc.tilt) 
-            
-            time.sleep(0.01) # ~100Hz update rate
+    # 3. Universal loop
+    try:
+        print("Streaming data. Press Ctrl+C to stop.")
+        if profiler: profiler.start()
+        scheduler.reset()
+        while True:
+            scheduler.wait()
+            if not loop.tick():
+                break
 
     except KeyboardInterrupt:
         print("User interrupted. Closing connection...")
     finally:
         rc.close()
+        if recorder: recorder.close()
+        if loop.publisher: loop.publisher.close()
+        for exporter in exporters: exporter.close()
+        if profiler: profiler.stop()
         k_emu.force_cleanup()
+        k_emu.close()
+        log.stop()
+        print(f"Loop: {scheduler}")
         print("Done.")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # Needed for --process in a PyInstaller build
     parser = argparse.ArgumentParser(description="DJI RC Interface")
     
     # Define the --model flag
     parser.add_argument(
         '--model', 
         type=str, 
-        default='RC3', 
-        choices=['RC3', 'N1', 'M300'],
-        help='Remote controller model to use (default: RC3)'
+        nargs='+',
+        default=['RC3'], 
+        metavar='MODEL',
+        help=f"Remote controller model(s) to use, {', '.join(registry.BUILTIN)} or an installed driver plugin; "
+             "several merge into one session (default: RC3)"
+    )
+
+    parser.add_argument(
+        '--list-devices',
+        action='store_true',
+        help='Probe every serial port, print which N1/M300 answers where, and exit'
+    )
+
+    parser.add_argument(
+        '--axis-owner',
+        type=str,
+        action='append',
+        default=[],
+        metavar='AXIS=INDEX',
+        help='With several --model: take AXIS (throttle, yaw, pitch, roll, tilt, sw1, sw2, buttons) only from controller INDEX; repeatable'
+    )
+
+    parser.add_argument(
+        '--port',
+        type=str,
+        action='append',
+        default=[],
+        metavar='[MODEL=|INDEX=]PORT',
+        help='Serial port for N1/M300 (default: auto-detect); with several --model give one per controller, '
+             'e.g. --port N1=/dev/ttyUSB0 --port N1=/dev/ttyUSB1 or --port 1=COM5; repeatable'
+    )
+
+    parser.add_argument(
+        '--pipeline',
+        type=int,
+        default=1,
+        help='Stick polls kept in flight for N1/M300 (default: 1, lock-step)'
+    )
+    
+    isolation = parser.add_mutually_exclusive_group()
+    isolation.add_argument(
+        '--threaded',
+        action='store_true',
+        help='Poll the controller on a background acquisition thread (RC3: SDL events are still pumped on the main thread, once per tick)'
+    )
+
+    isolation.add_argument(
+        '--process',
+        action='store_true',
+        help='Run the controller driver in a separate, auto-restarted process'
+    )
+    
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=100.0,
+        help='Control loop rate in Hz (default: 100)'
+    )
+
+    parser.add_argument(
+        '--spin',
+        type=float,
+        default=0.0,
+        help='Busy-wait the last N milliseconds of each tick for tighter timing (default: 0, sleep only)'
+    )
+
+    parser.add_argument(
+        '--overrun',
+        type=str,
+        default='skip',
+        choices=['skip', 'report'],
+        help='What to do when a tick runs late: skip silently or report it (default: skip)'
+    )
+    
+    parser.add_argument(
+        '--pwm',
+        type=float,
+        default=None,
+        metavar='MS',
+        help='Proportional axis output: PWM period in milliseconds (default: off)'
+    )
+    
+    parser.add_argument(
+        '--record',
+        type=str,
+        default=None,
+        help='Write every raw controller frame to this file'
+    )
+
+    parser.add_argument(
+        '--replay',
+        type=str,
+        default=None,
+        help='Recording to play back (use with --model REPLAY)'
+    )
+
+    parser.add_argument(
+        '--replay-speed',
+        type=float,
+        default=1.0,
+        help='Replay time scale, 0 for maximum speed (default: 1.0)'
+    )
+    
+    parser.add_argument(
+        '--events',
+        action='store_true',
+        help='RC3: apply joystick events as they arrive and wake the loop on input instead of polling every tick'
+    )
+
+    parser.add_argument(
+        '--mapping',
+        type=str,
+        action='append',
+        default=[],
+        metavar='FILE',
+        help='Mapping profile (.json or .toml); repeat to switch between profiles at runtime (default: built-in profile)'
+    )
+
+    parser.add_argument(
+        '--mapping-switch',
+        type=str,
+        default=None,
+        choices=['sw1', 'sw2'],
+        help='Switch that selects between several --mapping profiles (positions -1/0/1 = 1st/2nd/3rd)'
+    )
+
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=None,
+        help='Serve Prometheus metrics on http://127.0.0.1:PORT/metrics'
+    )
+
+    parser.add_argument(
+        '--metrics-json',
+        type=str,
+        default=None,
+        help='Append a JSON line of metrics (counters, rates, stage latencies) to this file periodically'
+    )
+
+    parser.add_argument(
+        '--metrics-interval',
+        type=float,
+        default=10.0,
+        help='Seconds between --metrics-json lines (default: 10)'
+    )
+
+    parser.add_argument(
+        '--profile',
+        type=str,
+        default=None,
+        choices=['sample', 'cprofile'],
+        help='Profile the control loop, writing collapsed stacks (flamegraph.pl/speedscope) to --profile-out on exit: '
+             'sample = stack sampler (counts are samples), cprofile = cProfile for --profile-window seconds '
+             '(counts are microseconds; the pstats dump goes next to it as .pstats)'
+    )
+
+    parser.add_argument(
+        '--profile-out',
+        type=str,
+        default=None,
+        help='Collapsed-stack output file (default: profile.folded)'
+    )
+
+    parser.add_argument(
+        '--profile-interval',
+        type=float,
+        default=1.0,
+        help='Sampling interval in milliseconds (default: 1)'
+    )
+
+    parser.add_argument(
+        '--profile-window',
+        type=float,
+        default=30.0,
+        help='Seconds of the loop to run under cProfile (default: 30)'
+    )
+
+    parser.add_argument(
+        '--slow-tick',
+        type=float,
+        default=None,
+        help='Report ticks longer than N milliseconds with the stage that took the time'
+    )
+
+    parser.add_argument(
+        '--sink',
+        action='append',
+        default=[],
+        metavar='SPEC',
+        help='Output: keyboard (OS key events), udp:[HOST:]PORT (axis values and key edges per tick), '
+             'shm[:NAME] (shared memory), null; repeatable (default: keyboard)'
+    )
+
+    parser.add_argument(
+        '--publish-state',
+        nargs='?',
+        const='dji_rc_state',
+        default=None,
+        metavar='NAME',
+        help='Publish every decoded frame (axes, switches, buttons, gestures, holds) to shared memory '
+             'for local readers (default name: dji_rc_state)'
+    )
+
+    parser.add_argument(
+        '--reclaim-shm',
+        action='store_true',
+        help='Replace shared memory segments (--sink shm, --publish-state) left behind by a killed run'
+    )
+
+    parser.add_argument(
+        '--hysteresis',
+        type=float,
+        default=0.2,
+        help='Sticks release at (1 - N) x the dead zone they engage at, so noise near it does not chatter keys (default: 0.2)'
+    )
+
+    parser.add_argument(
+        '--expo',
+        type=float,
+        default=0.0,
+        help='Expo curve 0..1 on stick values (changes PWM duty, not which key is held)'
+    )
+
+    parser.add_argument(
+        '--smoothing',
+        choices=['none', 'lowpass', 'one_euro'],
+        default='none',
+        help='Stick filter before the dead zone (default: none)'
+    )
+
+    parser.add_argument(
+        '--cutoff',
+        type=float,
+        default=5.0,
+        help='Filter cutoff in Hz; the one-euro minimum cutoff (default: 5)'
+    )
+
+    parser.add_argument(
+        '--beta',
+        type=float,
+        default=0.05,
+        help='One-euro speed coefficient: higher follows fast moves with less lag (default: 0.05)'
+    )
+
+    parser.add_argument(
+        '--min-key-hold',
+        type=float,
+        default=0.0,
+        help='Minimum milliseconds between key changes of one axis (default: 0, off)'
+    )
+
+    parser.add_argument(
+        '--log-file',
+        default=None,
+        help='Append every log record (key events, gestures, driver errors, ...) to this JSONL file'
+    )
+
+    parser.add_argument(
+        '--console',
+        choices=['all', 'events', 'summary'],
+        default='all',
+        help="Console output: every record, notices only, or only a periodic summary (default: all)"
+    )
+
+    parser.add_argument(
+        '--log-rate',
+        action='append',
+        default=[],
+        metavar='CATEGORY=N',
+        help='Keep at most N records per second of a log category, 0 for no limit (repeatable, e.g. key=50)'
+    )
+
+    parser.add_argument(
+        '--log-summary',
+        type=float,
+        default=10.0,
+        help='Seconds between console summaries with --console events/summary (default: 10)'
+    )
+
+    parser.add_argument(
+        '--no-reconnect',
+        action='store_true',
+        help='Exit when the controller disconnects instead of waiting for it to come back'
     )
     
     args = parser.parse_args()
+    if args.list_devices:
+        list_devices()
+        parser.exit()
+    for model in args.model:
+        if not registry.is_known(model):
+            parser.error(f"unknown --model '{model}', expected one of {', '.join(registry.available())}")
+    if 'REPLAY' in args.model and not args.replay:
+        parser.error('--model REPLAY requires --replay FILE')
+    if args.replay and not os.path.isfile(args.replay):
+        parser.error(f"--replay file not found: {args.replay}")
+    if len(args.model) > 1 and args.record:
+        parser.error('--record supports a single --model')
+    ports = [None] * len(args.model)
+    for item in args.port:
+        key, _, port = item.rpartition('=')
+        if not key:
+            if len(args.model) > 1:
+                parser.error(f"with several --model, --port needs MODEL=PORT or INDEX=PORT, got '{item}'")
+            ports[0] = port
+            continue
+        if key.isdigit():
+            # Controller index, as in --axis-owner
+            candidates = [int(key)] if int(key) < len(args.model) else []
+        else:
+            # The next controller of that model without a port
+            candidates = [i for i, model in enumerate(args.model) if model == key and ports[i] is None][:1]
+        if not candidates:
+            parser.error(f"--port '{item}' matches no controller of --model {' '.join(args.model)}")
+        ports[candidates[0]] = port
+    if len(set(p for p in ports if p)) < len([p for p in ports if p]):
+        parser.error('--port: every controller needs its own serial port')
+    if args.rate <= 0:
+        parser.error('--rate must be a positive number of ticks per second')
+    if args.pwm is not None and args.pwm <= 0:
+        parser.error('--pwm must be a positive period in milliseconds')
+
+    axis_owners = {}
+    for item in args.axis_owner:
+        axis, _, index = item.partition('=')
+        if not index.isdigit():
+            parser.error(f"--axis-owner expects AXIS=INDEX, got '{item}'")
+        axis_owners[axis.strip().lower()] = int(index)
+
+    log_rates = {}
+    for item in args.log_rate:
+        category, _, rate = item.partition('=')
+        try:
+            log_rates[category.strip()] = float(rate)
+        except ValueError:
+            parser.error(f"--log-rate expects CATEGORY=N, got '{item}'")
     
     # Pass the argument value into main
-    main(args.model)
+    main(args.model, pipeline_depth=args.pipeline, threaded=args.threaded,
+         rate=args.rate, spin=args.spin / 1000.0, on_overrun=args.overrun,
+         pwm_period=args.pwm / 1000.0 if args.pwm else None,
+         record_path=args.record, replay_path=args.replay, replay_speed=args.replay_speed,
+         isolated=args.process, ports=ports, reconnect=not args.no_reconnect,
+         event_driven=args.events, axis_owners=axis_owners,
+         mapping_paths=args.mapping, mapping_switch=args.mapping_switch,
+         metrics_port=args.metrics_port, metrics_path=args.metrics_json, metrics_interval=args.metrics_interval,
+         profile_mode=args.profile, profile_path=args.profile_out, profile_interval=args.profile_interval / 1000.0,
+         profile_window=args.profile_window, slow_tick=args.slow_tick / 1000.0 if args.slow_tick else None,
+         log_path=args.log_file, console=args.console, log_rates=log_rates, log_summary=args.log_summary,
+         axis_options=dict(hysteresis=args.hysteresis, expo=args.expo, smoothing=args.smoothing, cutoff=args.cutoff,
+                           beta=args.beta, min_hold=args.min_key_hold / 1000.0),
+         sink_specs=args.sink, state_name=args.publish_state,
+         reclaim_shm=args.reclaim_shm)
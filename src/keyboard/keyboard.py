@@ -1,6 +1,10 @@
-from pynput.keyboard import Controller, Key
+from pynput.keyboard import Key
 from enum import Enum
-from time import sleep
+from time import perf_counter
+import heapq
+from .pwm import AxisPWM
+from .sinks import PynputSink
+from src.utils.event_log import log
 
 class KbButton(Enum):
     CAMERA_WIDE   = '1'
@@ -19,69 +23,217 @@ class KbAxis(Enum):
     CAMERA_YAW    = (Key.right, Key.left)
 
 class KeyboardEmulator:
-    def __init__(self, emulate_hardware=True, print_events=True):
-        self.keyboard = Controller()
+    def __init__(self, emulate_hardware=True, print_events=True, pwm_period=None, pwm_min_pulse=0.01, sinks=None):
+        """
+        sinks: where events go (see src.keyboard.sinks). By default the OS
+        keyboard, or nothing with emulate_hardware=False.
+        """
         self.emulate_hardware = emulate_hardware
         self.print_events = print_events
+        if sinks is None:
+            sinks = [PynputSink(pause_key=KbButton.PAUSE.value)] if emulate_hardware else []
+        self.sinks = list(sinks)
+        self._frame_sinks = [sink for sink in self.sinks if sink.wants_frames]
+
+        # Proportional output: hold axis keys for a duty cycle of abs(value)
+        self.pwm = AxisPWM(pwm_period, pwm_min_pulse, channels=len(KbAxis)) if pwm_period else None
         
-        # 1. Automatically generate active_keys from the Axis Enum
-        # We also add the static keys for one-shot buttons
-        # self.active_keys = {'1': False, '2': False, '3': False, 'f': False, 't': False}
-        self.active_keys = {}
+        # 1. Every mapped key gets a bit index; the pressed set is one int mask.
+        # Buttons first, then each axis' (positive, negative) pair.
+        self.keys = []        # bit index -> key
+        self._key_bits = {}   # key -> bit
+        self.state = 0        # bitmask of keys currently held down
 
         for button in KbButton:
-            key = button.value
-            self.active_keys[key] = False
-            
-        for axis in KbAxis:
-            pos_key, neg_key = axis.value
-            self.active_keys[pos_key] = False
-            self.active_keys[neg_key] = False
+            self._register_key(button.value)
+
+        # Axis channels: channel -> (positive bit, negative bit). The KbAxis
+        # defaults come first so their channel is their enum position.
+        self._channel_bits = []
+        self._pair_channel = {}
+        self.axis_values = []  # last set_axis() value per channel, before PWM
+        self._axis_channel = {axis: self.register_axis(*axis.value) for axis in KbAxis}
+
+        # Per-tick desired state, built by handle_axis() and emitted by flush()
+        self._desired = 0
+        self._touched = 0
+
+        # Taps waiting for their release: heap of (release_time, order, key).
+        # _release_at holds the live deadline per key; stale heap entries are skipped.
+        self._release_queue = []
+        self._release_at = {}
+        self._tap_order = 0
+
+        for sink in self.sinks:
+            sink.attach(self)
 
     def _press(self, key):
-        if self.print_events: print(f'[PRESS]: {key}')
-        if self.emulate_hardware: self.keyboard.press(key)
+        if self.print_events: log.debug('key', '[PRESS]: {key}', key=key)
+        bit = self._key_bits[key]
+        for sink in self.sinks:
+            sink.press(key, bit)
 
     def _release(self, key):
-        if self.print_events: print(f'[RELEASE]: {key}')
-        if self.emulate_hardware: self.keyboard.release(key)
+        if self.print_events: log.debug('key', '[RELEASE]: {key}', key=key)
+        bit = self._key_bits[key]
+        for sink in self.sinks:
+            sink.release(key, bit)
+
+    def _register_key(self, key):
+        bit = self._key_bits.get(key)
+        if bit is None:
+            bit = 1 << len(self.keys)
+            self._key_bits[key] = bit
+            self.keys.append(key)
+        return bit
+
+    def register_axis(self, pos_key, neg_key):
+        """Returns the channel driving this key pair, creating it if needed."""
+        channel = self._pair_channel.get((pos_key, neg_key))
+        if channel is None:
+            channel = len(self._channel_bits)
+            self._channel_bits.append((self._register_key(pos_key), self._register_key(neg_key)))
+            self._pair_channel[(pos_key, neg_key)] = channel
+            self.axis_values.append(0.0)
+        return channel
+
+    @property
+    def channel_count(self):
+        return len(self._channel_bits)
+
+    @property
+    def active_keys(self):
+        """{key: is_pressed} view of the bitmask, for debugging."""
+        return {key: bool(self.state >> i & 1) for i, key in enumerate(self.keys)}
+
+    def is_pressed(self, key):
+        return bool(self.state & self._key_bits.get(key, 0))
+
+    def _emit(self, mask, press):
+        """Sends one event per set bit, lowest bit first."""
+        keys = self.keys
+        while mask:
+            low = mask & -mask
+            key = keys[low.bit_length() - 1]
+            if press:
+                self._press(key)
+            else:
+                self._release(key)
+            mask ^= low
 
     def set_key_state(self, key, should_be_pressed):
-        is_currently_pressed = self.active_keys.get(key, False)
-        if should_be_pressed and not is_currently_pressed:
+        """Immediately presses or releases a single key if its state changes."""
+        bit = self._key_bits.get(key) or self._register_key(key)
+        if should_be_pressed and not self.state & bit:
             self._press(key)
-            self.active_keys[key] = True
-        elif not should_be_pressed and is_currently_pressed:
+            self.state |= bit
+        elif not should_be_pressed and self.state & bit:
             self._release(key)
-            self.active_keys[key] = False
+            self.state &= ~bit
 
     # 2. Simplified handle_axis using the Enum
     def handle_axis(self, axis_enum: KbAxis, axis_value):
-        """Maps a float value to the keys defined in the Axis Enum."""
-        key_pos, key_neg = axis_enum.value
-        
+        """
+        Maps a float value to the keys defined in the Axis Enum.
+        Only records the desired state; nothing is sent until flush().
+        """
+        self.set_axis(self._axis_channel[axis_enum], axis_value)
+
+    def set_axis(self, channel, axis_value):
+        """
+        handle_axis() for a channel from register_axis(): no enum or dict
+        lookup, for compiled mappings. In PWM mode the key is only down for
+        its share of the period.
+        """
+        pos_bit, neg_bit = self._channel_bits[channel]
+        both = pos_bit | neg_bit
+        self._touched |= both
+        self.axis_values[channel] = axis_value
+
+        if self.pwm and not self.pwm.is_on(channel, abs(axis_value), perf_counter()):
+            axis_value = 0  # off part of the duty cycle
+
+        desired = self._desired & ~both
         if axis_value > 0:
-            self.set_key_state(key_pos, True)
-            self.set_key_state(key_neg, False)
+            desired |= pos_bit
         elif axis_value < 0:
-            self.set_key_state(key_neg, True)
-            self.set_key_state(key_pos, False)
-        else:
-            self.set_key_state(key_pos, False)
-            self.set_key_state(key_neg, False)
+            desired |= neg_bit
+        self._desired = desired
+
+    def flush(self):
+        """
+        Emits the difference between the current and the desired key state.
+        Releases go out before presses, each in bit order, so opposite keys
+        of an axis are never held together. Call once per loop tick.
+        """
+        touched = self._touched
+        if touched:
+            current = self.state
+            new = (current & ~touched) | self._desired
+            self._desired = 0
+            self._touched = 0
+
+            diff = new ^ current
+            if diff:
+                self._emit(diff & current, press=False)
+                self._emit(diff & new, press=True)
+                self.state = new
+
+        # Sinks that take axis values get them every tick, changed or not
+        for sink in self._frame_sinks:
+            sink.frame(self.axis_values, self.state)
 
     def tap(self, button_enum: KbButton, delay=0.08):
         """One-shot tap using KbButton Enum."""
-        key = button_enum.value
+        self.tap_key(button_enum.value, delay)
+
+    def tap_key(self, key, delay=0.08):
+        """
+        Presses `key` now and schedules the release `delay` seconds later,
+        so the caller never blocks. Releases are sent from service().
+        """
+        bit = self._key_bits.get(key) or self._register_key(key)
+        if key in self._release_at:
+            # Re-tapped before its release: finish the previous tap first
+            self._release(key)
+
         self._press(key)
-        sleep(delay)
-        self._release(key)
+        self.state |= bit
+
+        release_at = perf_counter() + delay
+        self._release_at[key] = release_at
+        self._tap_order += 1
+        heapq.heappush(self._release_queue, (release_at, self._tap_order, key))
+
+    def service(self, now=None):
+        """Sends every tap release that is due. Call once per loop tick."""
+        queue = self._release_queue
+        if not queue:
+            return
+        if now is None:
+            now = perf_counter()
+        while queue and queue[0][0] <= now:
+            release_at, _, key = heapq.heappop(queue)
+            if self._release_at.get(key) != release_at:
+                continue  # superseded by a later tap of the same key
+            del self._release_at[key]
+            self._release(key)
+            self.state &= ~self._key_bits[key]
+
+    @property
+    def pending_taps(self):
+        return len(self._release_at)
+
+    def _clear_pending(self):
+        self._release_queue.clear()
+        self._release_at.clear()
+        self._desired = 0
+        self._touched = 0
 
     def cleanup(self):
-        for key, is_pressed in list(self.active_keys.items()):
-            if is_pressed:
-                self._release(key)
-                self.active_keys[key] = False
+        self._clear_pending()
+        self._emit(self.state, press=False)
+        self.state = 0
 
     def force_cleanup(self):
         """
@@ -89,19 +241,20 @@ class KeyboardEmulator:
         regardless of whether the script thinks they are pressed.
         """
         if self.print_events:
-            print("[EMERGENCY] Force releasing all mapped keys...")
-            
-        self.keyboard.tap(KbButton.PAUSE.value)
-        for key in self.active_keys.keys():
-            # We call the internal _release directly to bypass state checks
-            try:
-                self.keyboard.release(key)
-                self.active_keys[key] = False
-            except Exception as e:
-                # Silently fail if a specific key wasn't actually 'down' in the OS
-                pass
+            log.event('key', "[EMERGENCY] Force releasing all mapped keys...")
+
+        self._clear_pending()
+        # Each sink releases everything it may have pressed, bypassing our state
+        for sink in self.sinks:
+            sink.reset(self.keys)
+        self.state = 0
+        self.axis_values[:] = [0.0] * len(self.axis_values)
+        for sink in self._frame_sinks:
+            sink.frame(self.axis_values, self.state)
         
         if self.print_events:
-            print("[CLEANUP] Keyboard reset complete.")
-
+            log.event('key', "[CLEANUP] Keyboard reset complete.")
 
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
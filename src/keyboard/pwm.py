@@ -0,0 +1,39 @@
+from time import perf_counter
+
+class AxisPWM:
+    """
+    Turns an axis magnitude into a key duty cycle.
+
+    A key is held for abs(value) * period out of every period. Phases are
+    computed from a fixed epoch, so the pulse train never drifts no matter
+    when the loop happens to sample it; each channel gets its own phase
+    offset so the six axes don't all press on the same tick.
+
+    Pulses shorter than min_pulse are not reliably seen by games, so for
+    small deflections the pulse stays at min_pulse and the period stretches
+    instead (pulse-density), which keeps the average proportional.
+    """
+    def __init__(self, period=0.1, min_pulse=0.01, channels=6):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self.min_pulse = min(min_pulse, period)
+        self.epoch = perf_counter()
+        self.channels = channels
+        self._offsets = [period * i / channels for i in range(channels)]
+
+    def is_on(self, channel, magnitude, now):
+        if magnitude <= 0.0:
+            return False
+        if magnitude >= 1.0:
+            return True
+
+        period = self.period
+        on_time = magnitude * period
+        if on_time < self.min_pulse:
+            on_time = self.min_pulse
+            period = on_time / magnitude
+
+        # Channels added by a mapping profile reuse the offsets cyclically
+        phase = (now - self.epoch + self._offsets[channel % self.channels]) % period
+        return phase < on_time
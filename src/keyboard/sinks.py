@@ -0,0 +1,245 @@
+"""
+Where KeyboardEmulator's output goes.
+
+A sink gets every key press/release (with the key's bit in
+KeyboardEmulator.keys) and, if it sets wants_frames, one frame per
+flush() with the full-resolution axis value of every channel and the
+key-state bitmask. Several sinks can be used at once, e.g. the OS
+keyboard plus a UDP stream to a simulator.
+
+  PynputSink     OS key events through pynput (the default)
+  UdpSink        binary datagram per tick: axes, key state and edges, sequence numbered
+  SharedStateSink  the same frame in a multiprocessing.shared_memory ring
+  RecordingSink  timestamped events in a list, for tests and benchmarks
+  NullSink       discards everything
+"""
+import json
+import socket
+import struct
+import time
+from src.utils.shared_ring import SharedFrameRing
+
+# --- UDP wire format (little-endian) ---
+#   header: magic 'DJRC', version, type, sequence number (u32, per datagram), sender perf_counter (f64)
+#   TYPE_FRAME: channel count (u8), one f32 per channel, keys held, keys pressed and
+#               keys released since the previous frame (u64 masks, bit i = key i)
+#   TYPE_KEYS:  UTF-8 JSON list of key names, index = bit; sent first and then every second
+UDP_MAGIC = b'DJRC'
+UDP_VERSION = 1
+UDP_HEADER = struct.Struct('<4sBBId')
+TYPE_FRAME = 0
+TYPE_KEYS = 1
+MASKS = struct.Struct('<QQQ')
+
+
+def key_name(key):
+    """'w', 'space', 'up': the name a consumer can match on."""
+    name = getattr(key, 'name', None)
+    return name if name is not None else str(key)
+
+
+class OutputSink:
+    """Base sink: every hook is optional."""
+    wants_frames = False
+
+    def attach(self, k_emu):
+        """Called once by KeyboardEmulator, before any event."""
+        pass
+
+    def press(self, key, bit):
+        pass
+
+    def release(self, key, bit):
+        pass
+
+    def frame(self, axes, state):
+        """Once per flush() if wants_frames: axis value per channel, held-key mask."""
+        pass
+
+    def reset(self, keys):
+        """Emergency release: forget or release everything, whatever the state."""
+        pass
+
+    def close(self):
+        pass
+
+
+class NullSink(OutputSink):
+    pass
+
+
+class PynputSink(OutputSink):
+    """Injects key events into the OS with pynput."""
+    def __init__(self, pause_key=None):
+        from pynput.keyboard import Controller
+        self.keyboard = Controller()
+        self.pause_key = pause_key  # tapped first on reset()
+
+    def press(self, key, bit):
+        self.keyboard.press(key)
+
+    def release(self, key, bit):
+        self.keyboard.release(key)
+
+    def reset(self, keys):
+        if self.pause_key is not None:
+            self.keyboard.tap(self.pause_key)
+        for key in keys:
+            try:
+                self.keyboard.release(key)
+            except Exception:
+                pass  # a key that wasn't actually 'down' in the OS
+
+
+class _EdgeSink(OutputSink):
+    """Collects press/release edges between frames."""
+    wants_frames = True
+
+    def __init__(self):
+        self.pressed = 0
+        self.released = 0
+
+    def press(self, key, bit):
+        self.pressed |= bit
+
+    def release(self, key, bit):
+        self.released |= bit
+
+    def _take_edges(self):
+        pressed, released = self.pressed, self.released
+        self.pressed = self.released = 0
+        return pressed, released
+
+
+class UdpSink(_EdgeSink):
+    """
+    One datagram per tick to (host, port), see the wire format above.
+    Never blocks: a full socket buffer or an absent listener only counts
+    as an error.
+    """
+    def __init__(self, host='127.0.0.1', port=9200, key_table_interval=1.0):
+        super().__init__()
+        self.address = (host, port)
+        self.key_table_interval = key_table_interval
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.seq = 0
+        self.sent = 0
+        self.errors = 0
+        self.keys = []
+        self._next_key_table = 0.0
+        self._frame_struct = None
+
+    def attach(self, k_emu):
+        self.keys = k_emu.keys  # the emulator's list, so keys registered later are included
+
+    def _send(self, kind, body, now):
+        datagram = UDP_HEADER.pack(UDP_MAGIC, UDP_VERSION, kind, self.seq, now) + body
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        try:
+            self.sock.sendto(datagram, self.address)
+            self.sent += 1
+        except OSError:
+            self.errors += 1
+
+    def frame(self, axes, state):
+        now = time.perf_counter()
+        if now >= self._next_key_table:
+            self._send(TYPE_KEYS, json.dumps([key_name(key) for key in self.keys]).encode(), now)
+            self._next_key_table = now + self.key_table_interval
+
+        count = len(axes)
+        if self._frame_struct is None or self._frame_struct.size != 1 + 4 * count + MASKS.size:
+            self._frame_struct = struct.Struct(f'<B{count}f3Q')
+        pressed, released = self._take_edges()
+        self._send(TYPE_FRAME, self._frame_struct.pack(count, *axes, state, pressed, released), now)
+
+    def reset(self, keys):
+        self.pressed = self.released = 0
+
+    def close(self):
+        self.sock.close()
+
+
+class SharedStateSink(_EdgeSink):
+    """
+    The per-tick frame in a SharedFrameRing: (perf_counter, axis f32 x
+    channels, keys held, pressed, released). Unused channels read 0.0.
+    Readers attach with SharedStateSink.reader(name, channels). The
+    segment is created right away (FileExistsError if the name is taken);
+    reclaim=True replaces one left behind by a killed run.
+    """
+    def __init__(self, name='dji_rc_output', channels=16, slots=16, reclaim=False):
+        super().__init__()
+        self.name = name
+        self.channels = channels
+        self.ring = SharedFrameRing(self.frame_struct(channels), slots=slots, name=name, create=True, replace=reclaim)
+        self.frames = 0
+
+    @staticmethod
+    def frame_struct(channels):
+        return struct.Struct(f'<d{channels}f3Q')
+
+    @classmethod
+    def reader(cls, name='dji_rc_output', channels=16):
+        """Attaches to a running sink from another process (latest() gives the newest frame)."""
+        return SharedFrameRing(cls.frame_struct(channels), name=name, track=False)
+
+    def frame(self, axes, state):
+        channels = self.channels
+        if len(axes) != channels:
+            axes = (list(axes) + [0.0] * channels)[:channels]
+        pressed, released = self._take_edges()
+        self.ring.publish(time.perf_counter(), *axes, state, pressed, released)
+        self.frames += 1
+
+    def reset(self, keys):
+        self.pressed = self.released = 0
+
+    def close(self):
+        if self.ring:
+            self.ring.close()
+            self.ring = None
+
+
+class RecordingSink(OutputSink):
+    """Keeps (perf_counter, pressed, key) for every key event, and the frames if record_frames."""
+    def __init__(self, record_frames=False):
+        self.wants_frames = record_frames
+        self.events = []
+        self.frames = []
+
+    def press(self, key, bit):
+        self.events.append((time.perf_counter(), True, key))
+
+    def release(self, key, bit):
+        self.events.append((time.perf_counter(), False, key))
+
+    def frame(self, axes, state):
+        self.frames.append((time.perf_counter(), tuple(axes), state))
+
+    def reset(self, keys):
+        self.events.append((time.perf_counter(), None, None))
+
+
+def parse_sink(spec, reclaim=False):
+    """
+    Builds a sink from a command-line spec: keyboard, null, udp:[HOST:]PORT
+    or shm[:NAME] (reclaim: replace a stale segment of that name). Raises
+    ValueError on anything else, OSError if the sink can't be opened.
+    """
+    kind, _, rest = spec.partition(':')
+    kind = kind.lower()
+    if kind == 'keyboard':
+        from .keyboard import KbButton
+        return PynputSink(pause_key=KbButton.PAUSE.value)
+    if kind == 'null':
+        return NullSink()
+    if kind == 'udp':
+        host, _, port = rest.rpartition(':')
+        if not port.isdigit():
+            raise ValueError(f"udp sink expects udp:[HOST:]PORT, got '{spec}'")
+        return UdpSink(host or '127.0.0.1', int(port))
+    if kind == 'shm':
+        return SharedStateSink(rest or 'dji_rc_output', reclaim=reclaim)
+    raise ValueError(f"unknown sink '{spec}', expected keyboard, null, udp:[HOST:]PORT or shm[:NAME]")
@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import NamedTuple
+from .base_rc import BaseRemoteController
+from src.utils.event_log import log
+
+class RCSnapshot(NamedTuple):
+    """Immutable copy of a controller's state at the moment a frame arrived."""
+    seq: int
+    timestamp: float  # time.perf_counter() when the frame was decoded
+    throttle: float
+    yaw: float
+    pitch: float
+    roll: float
+    tilt: float
+    sw1: int
+    sw2: int
+    buttons: int      # raw pressed bits, bit 0 = button1
+
+    @classmethod
+    def capture(cls, rc, seq, timestamp):
+        bits = (rc.button1.is_pressed
+                | rc.button2.is_pressed << 1
+                | rc.button3.is_pressed << 2
+                | rc.button4.is_pressed << 3)
+        return cls(seq, timestamp, rc.throttle, rc.yaw, rc.pitch, rc.roll, rc.tilt, rc.sw1, rc.sw2, bits)
+
+
+class AcquisitionThread(threading.Thread):
+    """
+    Polls a controller as fast as it answers and publishes RCSnapshots.
+
+    Publishing is a single reference swap of an immutable tuple, which is
+    atomic under the GIL, so readers never take a lock and never see a
+    half-written frame.
+    """
+    def __init__(self, rc: BaseRemoteController, min_interval=0.001):
+        super().__init__(name=f"acquisition-{type(rc).__name__}", daemon=True)
+        self.rc = rc
+        self.min_interval = min_interval  # keeps non-blocking drivers (RC3) from hogging the GIL
+
+        self.latest = None
+        self.connected = True
+        self.frames = 0
+        self.errors = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        rc = self.rc
+        wait = self._stop_event.wait
+        while not self._stop_event.is_set():
+            try:
+                if not rc.is_connected:
+                    self.connected = False
+                    wait(0.1)
+                    continue
+                self.connected = True
+
+                if rc.update():
+                    self.frames += 1
+                    self.latest = RCSnapshot.capture(rc, self.frames, time.perf_counter())
+            except Exception as e:
+                self.errors += 1
+                log.event('device', "Acquisition Error: {error}", error=e)
+
+            if self.min_interval:
+                wait(self.min_interval)
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+class ThreadedController(BaseRemoteController):
+    """
+    Wraps any controller so device I/O runs on an AcquisitionThread.
+
+    update() never touches the hardware: it copies the newest snapshot and
+    runs the button logic on the caller's thread, so gesture flags keep
+    their one-frame semantics for the mapping loop.
+    """
+    def __init__(self, rc: BaseRemoteController, min_interval=0.001):
+        buttons = [[b.button_name, b.print_update] for b in (rc.button1, rc.button2, rc.button3, rc.button4)]
+        super().__init__(buttons, deadzone_threshold_movement=rc.deadzone_threshold_movement, deadzone_threshold_elevation=rc.deadzone_threshold_elevation)
+
+        self.rc = rc
+        self.snapshot = None
+        self.fresh = False  # True when the last update() saw a new frame
+
+        self.thread = AcquisitionThread(rc, min_interval=min_interval)
+        self.thread.start()
+
+    def update(self):
+        self.rc.pump_events()  # main-thread-only event queues (SDL) are drained here
+        snap = self.thread.latest
+        if snap is None:
+            return False
+
+        self.fresh = snap is not self.snapshot
+        self.snapshot = snap
+
+        self.throttle = snap.throttle
+        self.yaw      = snap.yaw
+        self.pitch    = snap.pitch
+        self.roll     = snap.roll
+        self.tilt     = snap.tilt
+        self.sw1      = snap.sw1
+        self.sw2      = snap.sw2
+
+        # Gesture timing follows the frame's own timestamp, not this thread's
+        self.update_buttons(snap.buttons, snap.timestamp)
+        return True
+
+    @property
+    def connected(self) -> bool:
+        return self.rc.connected
+
+    @property
+    def is_connected(self) -> bool:
+        return self.thread.is_alive() and self.thread.connected
+
+    def close(self):
+        self.thread.stop()
+        self.rc.close()
@@ -1,11 +1,21 @@
+import time
 from abc import ABC, abstractmethod
-from src.utils.input_logic import ButtonHandler
+from src.utils.gestures import GestureEngine
+from src.utils.axis_filter import AxisConditioner
 
 class BaseRemoteController(ABC):
     """
     Standard interface for DJI Remote Controllers.
     All values are normalized to a float range of -1.0 to 1.0.
     """
+    # True if the driver notices the device coming back by itself (keep calling
+    # update() while disconnected); False if it has to be rebuilt.
+    hot_plug = False
+
+    # False while the device is gone but a wrapper keeps the session going
+    # (ControllerSupervisor reconnecting, ProcessController restarting its reader)
+    connected = True
+
     def __init__(self, buttons, deadzone_threshold_movement, deadzone_threshold_elevation):
 
         self.deadzone_threshold_movement = deadzone_threshold_movement
@@ -18,16 +28,23 @@ class BaseRemoteController(ABC):
         self.roll = 0.0
         self.tilt = 0.0
 
+        # Raw stick values go through this (dead zone with hysteresis, optional
+        # smoothing/expo/transition limit) in update_axes()
+        movement, elevation = deadzone_threshold_movement, deadzone_threshold_elevation
+        self.axis_filter = AxisConditioner((movement, movement, elevation, movement, movement))
+
         # --- Mode Switches ---
         # Represented as integers: -1 (Left/Up), 0 (Center), 1 (Right/Down)
         self.sw1 = 0
         self.sw2 = 0
 
         # --- Digital Buttons ---
-        self.button1 = ButtonHandler(buttons[0][0], print_update=buttons[0][1])
-        self.button2 = ButtonHandler(buttons[1][0], print_update=buttons[1][1])
-        self.button3 = ButtonHandler(buttons[2][0], print_update=buttons[2][1])
-        self.button4 = ButtonHandler(buttons[3][0], print_update=buttons[3][1])
+        # One gesture engine for all buttons; buttonN are views onto it
+        self.gestures = GestureEngine(buttons)
+        self.button1, self.button2, self.button3, self.button4 = self.gestures.views
+
+        # Optional FrameRecorder; drivers log every raw frame to it when set
+        self.recorder = None
 
     @abstractmethod
     def update(self) -> bool:
@@ -46,21 +63,42 @@ class BaseRemoteController(ABC):
         """
         pass
 
+    def update_buttons(self, bits, timestamp=None):
+        """Feeds one frame's raw button bits (bit 0 = button1) to the gesture engine."""
+        self.gestures.update(bits, time.perf_counter() if timestamp is None else timestamp)
+
+    def update_axes(self, values, timestamp=None):
+        """
+        Conditions one frame's raw axes, (roll, pitch, throttle, yaw[, tilt]),
+        all in one batch, and publishes them.
+        """
+        out = self.axis_filter.apply(values, time.perf_counter() if timestamp is None else timestamp)
+        self.roll, self.pitch, self.throttle, self.yaw = out[0], out[1], out[2], out[3]
+        if len(values) > 4:
+            self.tilt = out[4]
+
+    def pump_events(self):
+        """
+        Called on the main thread every tick by wrappers that run update()
+        on another thread (ThreadedController, MergedController). Drivers
+        whose event queue must be drained on the main thread (SDL) do it here.
+        """
+        pass
+
+    def wait_for_input(self, timeout):
+        """
+        Blocks for up to `timeout` seconds. Drivers that can be woken by the
+        device override this and return True as soon as input arrives.
+        """
+        time.sleep(timeout)
+        return False
+
     @property
     @abstractmethod
     def is_connected(self) -> bool:
         """Returns True if the physical hardware is still reachable."""
         pass
     
-    def dead_zone_movement(self, value):
-        return self._dead_zone(value, self.deadzone_threshold_movement)
-    
-    def dead_zone_elevation(self, value):
-        return self._dead_zone(value, self.deadzone_threshold_elevation)
-    
-    def _dead_zone(self, value, threshold):
-        return 0.0 if abs(value) < threshold else value
-
     def __str__(self):
         """Standardized string output for debugging across all models."""
         axes = f"T: {self.throttle: .2f} | Y: {self.yaw: .2f} | P: {self.pitch: .2f} | R: {self.roll: .2f} | Tilt: {self.tilt: .2f}"
@@ -72,3 +110,7 @@ class RCConnectionError(Exception):
     """Custom exception for DJI Remote Controller connection issues."""
     pass
 
+class RCConfigurationError(RCConnectionError):
+    """The controller can't be built with these settings (e.g. a missing recording); retrying won't help."""
+    pass
+
@@ -0,0 +1,132 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import serial
+import serial.tools.list_ports
+
+from .duml import DumlStreamParser
+from .dji_rcN1 import DJIRCN1
+from .dji_m300 import DJIM300
+
+# Stricter shapes first: an N1 stick packet would also pass the M300 check
+MODELS = {
+    'N1': DJIRCN1,
+    'M300': DJIM300,
+}
+
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.dji_rc_to_keyboard', 'ports.json')
+
+
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(model, port, path=CACHE_PATH):
+    cache = load_cache(path)
+    if cache.get(model) == port:
+        return
+    cache[model] = port
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"Could not save port cache: {e}")
+
+
+def identify(frame, models):
+    """
+    Returns (model, exact) for a stick reply, or (None, False).
+    exact means the reply was also addressed to that model's sender id.
+    """
+    for name in models:
+        if MODELS[name].is_stick_reply(frame):
+            return name, True
+    for name in models:
+        if MODELS[name]._is_stick_packet(frame):
+            return name, False
+    return None, False
+
+
+def probe(port, models=tuple(MODELS), timeout=0.3, baudrate=115200):
+    """
+    Sends each model's simulator-enable and stick poll to `port` and waits
+    up to `timeout` for a stick reply. Returns the model name or None.
+    """
+    try:
+        # Exclusive: a port another controller already has open is skipped, not written to
+        ser = serial.Serial(port, baudrate, timeout=0.02, exclusive=True)
+    except (serial.SerialException, OSError):
+        return None
+
+    try:
+        ser.write(b''.join(MODELS[name].ENABLE_REQUEST + MODELS[name].stick_request(i) for i, name in enumerate(models)))
+
+        parser = DumlStreamParser(check_crc16=True)
+        fallback = None
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            parser.fill_from(ser)
+            for frame in parser.frames_available():
+                name, exact = identify(frame, models)
+                if exact:
+                    return name
+                fallback = fallback or name
+        return fallback
+    except (serial.SerialException, OSError):
+        return None
+    finally:
+        ser.close()
+
+
+def list_ports():
+    return [p.device for p in serial.tools.list_ports.comports()]
+
+
+def discover_port(model, timeout=0.3, use_cache=True, exclude=()):
+    """
+    Finds the serial port the given model answers on, skipping `exclude`
+    (ports other controllers of the session use).
+    The last good port is tried first, then every other port concurrently.
+    Every port is probed for all models and only taken if its best match
+    is `model`: the M300 shape check alone would also accept an N1.
+    """
+    cached = load_cache().get(model) if use_cache else None
+    if cached in exclude:
+        cached = None
+    if cached and probe(cached, tuple(MODELS), timeout) == model:
+        return cached
+
+    ports = [p for p in list_ports() if p != cached and p not in exclude]
+    if not ports:
+        return None
+
+    pool = ThreadPoolExecutor(max_workers=len(ports))
+    try:
+        futures = {pool.submit(probe, port, tuple(MODELS), timeout): port for port in ports}
+        for future in as_completed(futures):
+            if future.result() == model:
+                port = futures[future]
+                if use_cache:
+                    save_cache(model, port)
+                return port
+        return None
+    finally:
+        # Don't wait for the probes still running on other ports
+        pool.shutdown(wait=False)
+
+
+def discover_all(timeout=0.3):
+    """Probes every port for every model. Returns {port: model}."""
+    ports = list_ports()
+    if not ports:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(ports)) as pool:
+        results = dict(zip(ports, pool.map(lambda port: probe(port, tuple(MODELS), timeout), ports)))
+    return {port: model for port, model in results.items() if model}
@@ -1,5 +1,9 @@
+import threading
+import time
+from collections import deque
 import pygame
 from .base_rc import BaseRemoteController, RCConnectionError
+from src.utils.event_log import log
 
 buttons = [
     ['c1', False],
@@ -8,72 +12,230 @@ buttons = [
     ['start_stop', False],
 ]
 
+# Standard DJI RC3 HID Layout
+AXIS_ROLL, AXIS_PITCH, AXIS_THROTTLE, AXIS_YAW = 0, 1, 2, 3
+AXIS_COUNT = 4
+BUTTON_COUNT = 8
+
+# --- Shared SDL event queue ---
+# pygame has one event queue per process, and SDL wants it pumped on the
+# main thread (the one that initialised it; Windows is strict about this).
+# The main thread drains it, in update() or, when update() runs on an
+# acquisition thread (--threaded, merged sessions), in pump_events(), and
+# hands every event to all open RC3s, which pick out their own (by
+# instance_id) in their own update().
+_controllers = []
+_queue_lock = threading.Lock()
+
+
+def _dispatch(events, now):
+    with _queue_lock:
+        for event in events:
+            if event.type == pygame.JOYDEVICEADDED:
+                # A replugged joystick goes to one RC3 that lost its own, not to all of them
+                for rc in _controllers:
+                    if rc.js is None and not rc._attaching:
+                        rc._attaching = True
+                        rc._pending.append((event, now))
+                        break
+            else:
+                for rc in _controllers:
+                    rc._pending.append((event, now))
+
+
+def _pump_events():
+    events = pygame.event.get()
+    if events:
+        _dispatch(events, time.perf_counter())
+
 class DJIRC3(BaseRemoteController):
-    def __init__(self, joystick_index=0, deadzone_threshold_movement=0.1, deadzone_threshold_elevation=0.1):
+    # Unplug/replug is picked up from JOYDEVICEADDED/REMOVED inside update()
+    hot_plug = True
+
+    """
+    DJI RC3 as an SDL joystick. Several can be used at once (joystick_index
+    0, 1, ...); they share the process-wide event queue, see _dispatch().
+
+    joystick_factory(device_index) builds the joystick object; the default
+    is pygame.joystick.Joystick, benchmarks pass a stub.
+    """
+    def __init__(self, joystick_index=0, deadzone_threshold_movement=0.1, deadzone_threshold_elevation=0.1, event_driven=False,
+                 joystick_factory=None):
         super().__init__(buttons, deadzone_threshold_movement=deadzone_threshold_movement, deadzone_threshold_elevation=deadzone_threshold_elevation)
-        
+
+        self.joystick_index = joystick_index
+        self.joystick_factory = joystick_factory or pygame.joystick.Joystick
+        self.js = None
+
+        # Event-driven mode applies JOYAXISMOTION/JOYBUTTON* events instead of
+        # polling every axis and button each tick.
+        self.event_driven = event_driven
+        self._raw_axes = [0.0] * AXIS_COUNT
+        self._raw_buttons = [False] * BUTTON_COUNT
+        self.axis_timestamps = [0.0] * AXIS_COUNT      # perf_counter of each axis' last change
+        self._button_edges = []                        # (bits, perf_counter) of each button edge not yet applied
+        self.last_input_time = 0.0
+        self._pending = deque()   # (event, perf_counter) handed over by _dispatch()
+        self._attaching = False   # a JOYDEVICEADDED is queued for this controller
+
         # 1. Initialize Pygame core if not already done
         if not pygame.get_init():
             pygame.init()
-            
-        # This tells Pygame to ask the OS for the current list of USB devices again.
-        if pygame.joystick.get_init():
-            pygame.joystick.quit()  # Shutdown the current scan
-        pygame.joystick.init()      # Start a fresh scan
-
-        # 3. Check if anything was found before trying to use it
-        if pygame.joystick.get_count() == 0:
+        if not pygame.joystick.get_init():
+            pygame.joystick.init()
+
+        # Pumping lets SDL pick up devices plugged in since the last scan
+        pygame.event.pump()
+
+        # 3. Check if anything was found before trying to use it (an injected joystick needn't be listed)
+        if joystick_factory is None and pygame.joystick.get_count() == 0:
             raise RCConnectionError("No joysticks detected by OS.")
 
         try:
-            self.js = pygame.joystick.Joystick(joystick_index)
-            self.js.init()
-            print(f"Connected to: {self.js.get_name()}")
+            self._open(joystick_index)
         except pygame.error as e:
             # Re-raise as a generic exception so your main loop catches it
             raise RCConnectionError(f"DJI RC3 not found at index {joystick_index}: {e}")
+        with _queue_lock:
+            _controllers.append(self)
+
+    def _open(self, device_index):
+        js = self.joystick_factory(device_index)
+        js.init()
+        self.js = js
+        print(f"Connected to: {js.get_name()}")
+        # Events only report changes, so start from a full read
+        self._poll_all()
+        self._apply_axes()
+
+    def _poll_all(self):
+        js = self.js
+        self._raw_axes[:] = [js.get_axis(i) for i in range(AXIS_COUNT)]
+        self._raw_buttons[:] = [bool(js.get_button(i)) for i in range(BUTTON_COUNT)]
+
+    def _handle_event(self, event, now):
+        """Applies one SDL event. Returns True if it was controller input."""
+        etype = event.type
+        if self.event_driven and self.js is not None and getattr(event, 'instance_id', None) == self.js.get_instance_id():
+            if etype == pygame.JOYAXISMOTION:
+                if event.axis < AXIS_COUNT:
+                    self._raw_axes[event.axis] = event.value
+                    self.axis_timestamps[event.axis] = now
+                    self.last_input_time = now
+                return True
+            if etype == pygame.JOYBUTTONDOWN or etype == pygame.JOYBUTTONUP:
+                if event.button < BUTTON_COUNT:
+                    self._raw_buttons[event.button] = etype == pygame.JOYBUTTONDOWN
+                    self._button_edges.append((self._button_bits(), now))
+                    self.last_input_time = now
+                return True
+
+        if etype == pygame.JOYDEVICEREMOVED:
+            if self.js is not None and event.instance_id == self.js.get_instance_id():
+                log.event('device', "DJI RC3 removed")
+                self.js = None
+        elif etype == pygame.JOYDEVICEADDED:
+            self._attaching = False
+            if self.js is None:
+                try:
+                    self._open(event.device_index)
+                except pygame.error as e:
+                    log.event('device', "DJI RC3 re-attach failed: {error}", error=e)
+        return False
+
+    def _handle_pending(self):
+        """Applies the events dispatched to this controller. True if any was its input."""
+        pending = self._pending
+        got_input = False
+        while pending:
+            event, now = pending.popleft()
+            got_input |= self._handle_event(event, now)
+        return got_input
+
+    def pump_events(self):
+        _pump_events()
+
+    def _handle_events(self):
+        """Applies queued events: unplug/replug always, input in event-driven mode."""
+        # Off the main thread the events come from pump_events(), called by the wrapper
+        if threading.current_thread() is threading.main_thread():
+            _pump_events()
+        self._handle_pending()
+
+    def wait_for_input(self, timeout):
+        """Sleeps until the next SDL event or `timeout` seconds. True if input arrived."""
+        event = pygame.event.wait(max(1, int(timeout * 1000)))
+        if event.type == pygame.NOEVENT:
+            return False
+        _dispatch([event], time.perf_counter())
+        return self._handle_pending()
+
+    # --- Analog Axis Mapping ---
+    def _apply_axes(self, now=None):
+        # The raw layout is already roll, pitch, throttle, yaw; tilt comes from sw2
+        self.update_axes(self._raw_axes, now)
+
+    def _button_bits(self):
+        # --- Digital Button Mapping ---
+        # button1 = c1, button2 = pause, button3 = trigger, button4 = start_stop
+        raw = self._raw_buttons
+        return raw[0] | raw[2] << 1 | raw[3] << 2 | raw[1] << 3
+
+    def _apply_buttons(self, now):
+        raw = self._raw_buttons
+
+        # Event-driven: every edge is fed at the time it arrived, so a press and
+        # release within one tick is still a tap; then the tick itself for long presses
+        edges = self._button_edges
+        if edges:
+            edges.append((self._button_bits(), now))
+            self.gestures.update_edges(edges)
+            edges.clear()
+        else:
+            self.update_buttons(self._button_bits(), now)
+
+        # --- Switch Mapping ---
+        self.sw1 = -1 if raw[7] else 1 if raw[6] else 0 # mode
+        self.sw2 = 1 if raw[5] else 0 if raw[4] else -1 # aux
+
+        self.tilt = self.sw2
 
     def update(self):
+        self._handle_events()
         if not self.js:
             return False
 
-        pygame.event.pump()
-        
         try:
-            # --- Analog Axis Mapping ---
-            # Standard DJI RC3 HID Layout
-            self.roll     = self.dead_zone_movement(self.js.get_axis(0))
-            self.pitch    = self.dead_zone_movement(self.js.get_axis(1))
-            self.throttle = self.dead_zone_elevation(self.js.get_axis(2))
-            self.yaw      = self.dead_zone_movement(self.js.get_axis(3))
+            now = time.perf_counter()
+            if not self.event_driven:
+                self._poll_all()
+            # Every tick, also in event-driven mode, so time-based filtering keeps running
+            self._apply_axes(now)
+            self._apply_buttons(now)
 
-            # --- Digital Button Mapping ---
-            self.button1.update(bool(self.js.get_button(0))) # c1
-            self.button2.update(bool(self.js.get_button(2))) # pause
-            self.button3.update(bool(self.js.get_button(3))) # trigger
-            self.button4.update(bool(self.js.get_button(1))) # start_stop
-
-            # --- Switch Mapping ---
-            self.sw1 = -1 if bool(self.js.get_button(7)) else 1 if bool(self.js.get_button(6)) else 0 # mode
-            self.sw2 = 1 if bool(self.js.get_button(5)) else 0 if bool(self.js.get_button(4)) else -1 # aux
-
-            self.tilt = self.sw2
+            if self.recorder:
+                roll, pitch, throttle, yaw = self._raw_axes
+                self.recorder.write_state(roll, pitch, throttle, yaw, self.tilt, self.sw1, self.sw2,
+                                          self.gestures.masks[0])
 
             return True
 
         except pygame.error:
-            print('pygame.error')
+            log.event('device', 'pygame.error')
             return False
-        
+
     @property
     def is_connected(self) -> bool:
-        import pygame
-        pygame.event.pump() 
+        # Kept current by the device events handled in update()
         try:
-            return pygame.joystick.get_count() > 0 and self.js.get_init()
-        except:
+            return self.js is not None and self.js.get_init()
+        except pygame.error:
             return False
 
     def close(self):
+        with _queue_lock:
+            if self in _controllers:
+                _controllers.remove(self)
         if self.js:
             self.js.quit()
+            self.js = None
@@ -0,0 +1,191 @@
+import struct
+
+# DUML frame layout (DJI Universal Markup Language):
+#   [0]     0x55 start byte
+#   [1:3]   little-endian: length (10 bits) | version (6 bits)
+#   [3]     CRC8 of bytes 0..2
+#   [4]     sender    [5] receiver
+#   [6:8]   sequence number
+#   [8]     command type    [9] command set    [10] command id
+#   [11:-2] payload
+#   [-2:]   CRC16 of everything before it
+START_BYTE = 0x55
+HEADER_SIZE = 4
+MIN_FRAME_SIZE = 13
+MAX_FRAME_SIZE = 0x3FF
+
+
+def _make_table(poly, width_mask):
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ poly if crc & 1 else crc >> 1
+        table.append(crc & width_mask)
+    return table
+
+_CRC8_TABLE = _make_table(0x8C, 0xFF)
+_CRC16_TABLE = _make_table(0x8408, 0xFFFF)
+
+
+def crc8(data, crc=0x77):
+    """Header CRC used by DUML (reflected 0x31, seed 0x77)."""
+    table = _CRC8_TABLE
+    for b in data:
+        crc = table[(crc ^ b) & 0xFF]
+    return crc
+
+
+def crc16(data, crc=0x3692):
+    """Frame CRC used by DUML (reflected 0x1021, seed 0x3692)."""
+    table = _CRC16_TABLE
+    for b in data:
+        crc = (crc >> 8) ^ table[(crc ^ b) & 0xFF]
+    return crc
+
+
+def build_frame(sender, receiver, seq, cmd_type, cmd_set, cmd_id, payload=b'', version=1):
+    """Assembles a complete DUML frame, including both CRCs."""
+    length = MIN_FRAME_SIZE + len(payload)
+    frame = bytearray(length)
+    struct.pack_into('<BH', frame, 0, START_BYTE, length | (version << 10))
+    frame[3] = crc8(frame[:3])
+    struct.pack_into('<BBHBBB', frame, 4, sender, receiver, seq & 0xFFFF, cmd_type, cmd_set, cmd_id)
+    frame[11:length - 2] = payload
+    struct.pack_into('<H', frame, length - 2, crc16(frame[:length - 2]))
+    return bytes(frame)
+
+
+def frame_seq(frame):
+    return frame[6] | (frame[7] << 8)
+
+
+class DumlStreamParser:
+    """
+    Incremental DUML frame parser.
+
+    Bytes are read in bulk straight into a preallocated buffer, and complete
+    frames are handed out as memoryview slices of that buffer (no copies).
+    A frame view is only valid until the next call to feed()/fill_from().
+
+    On a bad start byte, a failed header CRC8 or a failed frame CRC16 the
+    parser skips one byte and resyncs on the next 0x55.
+    """
+    def __init__(self, capacity=4096, check_crc16=True):
+        self.capacity = capacity
+        self.check_crc16 = check_crc16
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._head = 0  # first unparsed byte
+        self._tail = 0  # one past the last received byte
+
+        # --- Counters ---
+        self.frames = 0            # valid frames handed out
+        self.corrupt_frames = 0    # header or frame CRC failures
+        self.dropped_frames = 0    # frames lost to buffer overflow
+        self.dropped_bytes = 0     # bytes discarded while resyncing
+
+    @property
+    def buffered(self):
+        return self._tail - self._head
+
+    def reset(self):
+        self._head = self._tail = 0
+
+    def _make_room(self, wanted):
+        """Compacts the unparsed bytes to the front so `wanted` bytes fit."""
+        if self.capacity - self._tail >= wanted:
+            return
+        pending = self._tail - self._head
+        if pending:
+            self._buf[:pending] = self._buf[self._head:self._tail]
+        self._head, self._tail = 0, pending
+
+        if self.capacity - self._tail < wanted:
+            # Consumer is too slow: throw away what we have and count it as lost.
+            self.dropped_frames += 1
+            self.dropped_bytes += pending
+            self._head = self._tail = 0
+
+    def feed(self, data):
+        """Appends raw bytes received from the device."""
+        n = len(data)
+        if n > self.capacity:
+            self.dropped_bytes += n - self.capacity
+            data = data[-self.capacity:]
+            n = self.capacity
+        self._make_room(n)
+        self._buf[self._tail:self._tail + n] = data
+        self._tail += n
+        return n
+
+    def fill_from(self, ser):
+        """
+        Bulk-reads everything in the serial driver's queue into the buffer.
+        If nothing is waiting yet it blocks for at most ser.timeout.
+        Returns the number of bytes read.
+        """
+        waiting = ser.in_waiting
+        wanted = min(max(waiting, 1), self.capacity)
+        self._make_room(wanted)
+        n = ser.readinto(self._view[self._tail:self._tail + wanted])
+        if n:
+            self._tail += n
+        return n or 0
+
+    def frames_available(self):
+        """Yields every complete, valid frame currently in the buffer."""
+        buf = self._buf
+        view = self._view
+        while True:
+            avail = self._tail - self._head
+            if avail < HEADER_SIZE:
+                return
+
+            start = self._head
+            if buf[start] != START_BYTE:
+                nxt = buf.find(START_BYTE, start + 1, self._tail)
+                skip_to = self._tail if nxt < 0 else nxt
+                self.dropped_bytes += skip_to - start
+                self._head = skip_to
+                continue
+
+            if crc8(view[start:start + 3]) != buf[start + 3]:
+                self.corrupt_frames += 1
+                self.dropped_bytes += 1
+                self._head = start + 1
+                continue
+
+            length = (buf[start + 1] | (buf[start + 2] << 8)) & MAX_FRAME_SIZE
+            if length < MIN_FRAME_SIZE:
+                self.corrupt_frames += 1
+                self.dropped_bytes += 1
+                self._head = start + 1
+                continue
+
+            if avail < length:
+                return  # wait for the rest of the frame
+
+            end = start + length
+            if self.check_crc16:
+                expected = buf[end - 2] | (buf[end - 1] << 8)
+                if crc16(view[start:end - 2]) != expected:
+                    self.corrupt_frames += 1
+                    self.dropped_bytes += 1
+                    self._head = start + 1
+                    continue
+
+            self._head = end
+            self.frames += 1
+            yield view[start:end]
+
+    def __str__(self):
+        return (f"frames: {self.frames} | corrupt: {self.corrupt_frames} | "
+                f"dropped: {self.dropped_frames} | dropped bytes: {self.dropped_bytes}")
+
+
+def read_axis(frame, index):
+    """Normalizes a DJI 16-bit stick value (center 1024, 660 throw) to -1.0..1.0."""
+    raw = struct.unpack_from('<H', frame, index)[0]
+    val = (raw - 1024) / 660.0
+    return max(min(val, 1.0), -1.0)
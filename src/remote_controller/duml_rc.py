@@ -0,0 +1,169 @@
+import time
+import serial
+from abc import abstractmethod
+from .base_rc import BaseRemoteController, RCConnectionError
+from .duml import DumlStreamParser, build_frame, frame_seq, read_axis
+from src.utils.recorder import KIND_DUML
+from src.utils.event_log import log
+
+buttons = [
+    ['button1', False],
+    ['button2', False],
+    ['button3', False],
+    ['button4', False],
+]
+
+class DumlRemoteController(BaseRemoteController):
+    """
+    Shared serial/DUML plumbing for the RCs that stream sticks over USB serial.
+
+    pipeline_depth=1 keeps the original lock-step protocol: write one poll,
+    block (up to `timeout`) for its reply. With pipeline_depth > 1 up to that
+    many polls are kept in flight, each with its own sequence number, and
+    update() only consumes the replies that have already arrived.
+    """
+    MODEL_NAME = 'DUML RC'
+    DEFAULT_PORT = None
+    SENDER = 0x0a
+    RECEIVER = 0x06
+    ENABLE_REQUEST = b''
+
+    def __init__(self, port=None, baudrate=115200, deadzone_threshold_movement=0.1, deadzone_threshold_elevation=0.1,
+                 pipeline_depth=1, reply_timeout=0.1, poll_wait=0.002):
+        super().__init__(buttons, deadzone_threshold_movement=deadzone_threshold_movement, deadzone_threshold_elevation=deadzone_threshold_elevation)
+
+        port = port or self.DEFAULT_PORT
+        self.port = port
+        self.pipeline_depth = max(1, pipeline_depth)
+        self.reply_timeout = reply_timeout
+
+        self.parser = DumlStreamParser()
+        self._seq = 0x34eb
+        self._in_flight = {}  # seq -> send time
+        self.poll_timeouts = 0
+
+        # In lock-step mode we wait for the reply, in pipelined mode we only
+        # wait a tick for *any* byte so an idle loop doesn't spin the CPU.
+        timeout = reply_timeout if self.pipeline_depth == 1 else poll_wait
+
+        try:
+            # Exclusive, so a second controller of the session can't open the same port
+            self.ser = serial.Serial(port, baudrate, timeout=timeout, exclusive=True)
+            self.ser.write(self.ENABLE_REQUEST)
+            print(f"{self.MODEL_NAME} connected on {port}")
+        except serial.SerialException as e:
+            self.ser = None
+            raise RCConnectionError(f"Could not open serial port {port}: {e}")
+
+    @classmethod
+    def stick_request(cls, seq):
+        """Stick data request (CmdSet 0x06, CmdID 0x01)."""
+        return build_frame(cls.SENDER, cls.RECEIVER, seq, 0x40, 0x06, 0x01)
+
+    @classmethod
+    def is_stick_reply(cls, frame):
+        """True for a stick packet addressed to this model's sender id."""
+        return frame[5] == cls.SENDER and cls._is_stick_packet(frame)
+
+    def _poll_request(self):
+        seq = self._seq
+        self._seq = (seq + 1) & 0xFFFF
+        return seq, self.stick_request(seq)
+
+    @staticmethod
+    @abstractmethod
+    def _is_stick_packet(frame):
+        """
+        True if the frame has this model's stick packet shape.
+        MUST be implemented by child classes.
+        """
+        pass
+
+    def _apply_frame(self, frame):
+        """Decodes a stick packet. Returns False if the frame is not one."""
+        if not self._is_stick_packet(frame):
+            return False
+
+        # Roll, pitch, throttle, yaw and the wheel (mapped to tilt)
+        self.update_axes((read_axis(frame, 13), read_axis(frame, 16), read_axis(frame, 19),
+                          read_axis(frame, 22), read_axis(frame, 25)))
+        return True
+
+    def _ack(self, frame):
+        """Retires the in-flight poll this reply answers."""
+        if self._in_flight.pop(frame_seq(frame), None) is None and self._in_flight:
+            # RC didn't echo our sequence number: credit the oldest request
+            del self._in_flight[next(iter(self._in_flight))]
+
+    def _expire(self, now):
+        deadline = now - self.reply_timeout
+        for seq, sent in list(self._in_flight.items()):
+            if sent >= deadline:
+                break
+            del self._in_flight[seq]
+            self.poll_timeouts += 1
+
+    def _top_up(self, now):
+        """Keeps pipeline_depth poll requests outstanding."""
+        missing = self.pipeline_depth - len(self._in_flight)
+        if missing <= 0:
+            return
+        requests = []
+        for _ in range(missing):
+            seq, frame = self._poll_request()
+            self._in_flight[seq] = now
+            requests.append(frame)
+        self.ser.write(b''.join(requests))
+
+    def _drain(self):
+        got_frame = False
+        recorder = self.recorder
+        for frame in self.parser.frames_available():
+            if recorder:
+                recorder.write(KIND_DUML, frame)
+            if self._apply_frame(frame):
+                self._ack(frame)
+                got_frame = True
+        return got_frame
+
+    def update(self):
+        if not self.ser:
+            return False
+
+        try:
+            now = time.perf_counter()
+            self._expire(now)
+            self._top_up(now)
+
+            if self.pipeline_depth > 1:
+                self.parser.fill_from(self.ser)
+                return self._drain()
+
+            # Lock-step: bulk-read until the reply shows up or the port times out
+            while True:
+                if self._drain():
+                    return True
+                if not self.parser.fill_from(self.ser):
+                    self._in_flight.clear()
+                    self.poll_timeouts += 1
+                    return False
+
+        except (serial.SerialException, OSError) as e:
+            # The USB device went away: drop the port so is_connected reports it
+            log.event('device', "{model} lost: {error}", model=self.MODEL_NAME, error=e)
+            self.close()
+            return False
+
+        except Exception as e:
+            log.event('device', "{model} Update Error: {error}", model=self.MODEL_NAME, error=e)
+            return False
+
+    @property
+    def is_connected(self) -> bool:
+        # Check if the serial object exists and the OS hasn't closed the port
+        return self.ser is not None and self.ser.is_open
+
+    def close(self):
+        if self.ser:
+            self.ser.close()
+            self.ser = None
@@ -0,0 +1,102 @@
+from .base_rc import BaseRemoteController
+from .acquisition import AcquisitionThread
+
+AXES = ('throttle', 'yaw', 'pitch', 'roll', 'tilt')
+SWITCHES = ('sw1', 'sw2')
+
+buttons = [
+    ['button1', False],
+    ['button2', False],
+    ['button3', False],
+    ['button4', False],
+]
+
+class MergedController(BaseRemoteController):
+    """
+    Several controllers driving one session (e.g. pilot + camera operator).
+
+    Every child is read on its own AcquisitionThread, so update() only
+    merges the newest snapshots and a second controller adds no device
+    latency to the tick. Merge rules:
+      - an axis or switch listed in `owners` ({'tilt': 1, 'sw1': 1, ...})
+        is taken from that child only,
+      - any other axis comes from the first child, in priority order, whose
+        stick is off-centre,
+      - switches default to child 0,
+      - buttons are OR'd unless owners has 'buttons'.
+    Children that are disconnected or have no frame yet are ignored.
+    """
+    def __init__(self, controllers, owners=None, min_interval=0.001):
+        if not controllers:
+            raise ValueError("MergedController needs at least one controller")
+        super().__init__(buttons, deadzone_threshold_movement=controllers[0].deadzone_threshold_movement, deadzone_threshold_elevation=controllers[0].deadzone_threshold_elevation)
+
+        owners = dict(owners or {})
+        for name, index in owners.items():
+            if name not in AXES + SWITCHES + ('buttons',):
+                raise ValueError(f"unknown axis '{name}', expected one of {', '.join(AXES + SWITCHES)} or buttons")
+            if not 0 <= index < len(controllers):
+                raise ValueError(f"'{name}' owner {index} is out of range (0-{len(controllers) - 1})")
+
+        self.controllers = list(controllers)
+        self.owners = owners
+        self.threads = [AcquisitionThread(rc, min_interval=min_interval) for rc in self.controllers]
+        for thread in self.threads:
+            thread.start()
+
+        # Precomputed so update() is a plain loop over tuples
+        self._owned_axes = tuple((name, owners[name]) for name in AXES if name in owners)
+        self._shared_axes = tuple(name for name in AXES if name not in owners)
+        self._switch_owners = tuple((name, owners.get(name, 0)) for name in SWITCHES)
+        self._button_owner = owners.get('buttons')
+
+    def update(self):
+        for rc in self.controllers:
+            rc.pump_events()  # main-thread-only event queues (SDL) are drained here
+        snaps = [t.latest if t.connected else None for t in self.threads]
+        if not any(snaps):
+            return False
+
+        for name, index in self._owned_axes:
+            snap = snaps[index]
+            setattr(self, name, getattr(snap, name) if snap else 0.0)
+
+        for name in self._shared_axes:
+            value = 0.0
+            for snap in snaps:
+                if snap:
+                    value = getattr(snap, name)
+                    if value:
+                        break
+            setattr(self, name, value)
+
+        for name, index in self._switch_owners:
+            snap = snaps[index]
+            if snap:
+                setattr(self, name, getattr(snap, name))
+
+        if self._button_owner is not None:
+            snap = snaps[self._button_owner]
+            bits = snap.buttons if snap else 0
+        else:
+            bits = 0
+            for snap in snaps:
+                if snap:
+                    bits |= snap.buttons
+
+        self.update_buttons(bits, max(snap.timestamp for snap in snaps if snap))
+        return True
+
+    @property
+    def connected(self) -> bool:
+        return any(t.connected and rc.connected for t, rc in zip(self.threads, self.controllers))
+
+    @property
+    def is_connected(self) -> bool:
+        return any(t.is_alive() and t.connected for t in self.threads)
+
+    def close(self):
+        for thread in self.threads:
+            thread.stop()
+        for rc in self.controllers:
+            rc.close()
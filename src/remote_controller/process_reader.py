@@ -0,0 +1,156 @@
+import multiprocessing
+import struct
+import time
+from .base_rc import BaseRemoteController, RCConnectionError
+from .acquisition import RCSnapshot
+from src.utils.shared_ring import SharedFrameRing
+
+# RCSnapshot without its seq: timestamp, throttle, yaw, pitch, roll, tilt, sw1, sw2, buttons
+FRAME = struct.Struct('<6dbbB')
+
+# Values of the ring's writer state word
+STATE_STARTING = 0
+STATE_RUNNING = 1
+STATE_DISCONNECTED = 2
+
+buttons = [
+    ['button1', False],
+    ['button2', False],
+    ['button3', False],
+    ['button4', False],
+]
+
+
+def _reader_main(factory, factory_kwargs, ring_name, stop_event, min_interval, model_name, record_path):
+    """Child process: owns the device and streams decoded frames into the ring."""
+    ring = SharedFrameRing(FRAME, name=ring_name)
+    ring.state = STATE_STARTING
+    rc = None
+    recorder = None
+    try:
+        rc = factory(**factory_kwargs)
+        if record_path:
+            from src.utils.recorder import FrameRecorder
+            recorder = FrameRecorder(record_path, model_name)
+            rc.recorder = recorder
+        ring.state = STATE_RUNNING
+
+        while not stop_event.is_set():
+            if not rc.is_connected:
+                break
+            if rc.update():
+                ring.publish(*RCSnapshot.capture(rc, 0, time.perf_counter())[1:])
+            if min_interval:
+                time.sleep(min_interval)
+    except RCConnectionError as e:
+        print(f"Reader process: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.state = STATE_DISCONNECTED
+        if rc: rc.close()
+        if recorder: recorder.close()
+        ring.close()
+
+
+class ProcessController(BaseRemoteController):
+    """
+    Runs a controller in a child process and reads its frames from shared memory.
+
+    `factory(**factory_kwargs)` must build the real controller and be
+    importable from the child (a module-level function). If the child dies
+    or loses the device it is started again after restart_delay; meanwhile
+    the axes read as neutral so no key stays held.
+    """
+    def __init__(self, factory, factory_kwargs=None, deadzone_threshold_movement=0.1, deadzone_threshold_elevation=0.1,
+                 min_interval=0.001, restart_delay=0.5, max_restarts=None, model_name='', record_path=None, slots=64):
+        super().__init__(buttons, deadzone_threshold_movement=deadzone_threshold_movement, deadzone_threshold_elevation=deadzone_threshold_elevation)
+
+        self.factory = factory
+        self.factory_kwargs = factory_kwargs or {}
+        self.min_interval = min_interval
+        self.restart_delay = restart_delay
+        self.max_restarts = max_restarts
+        self.model_name = model_name
+        self.record_path = record_path
+
+        self.ring = SharedFrameRing(FRAME, slots=slots, create=True)
+        self._ctx = multiprocessing.get_context('spawn')  # same behaviour on Windows and Linux
+        self._stop_event = self._ctx.Event()
+        self.process = None
+        self.restarts = 0
+        self._restart_at = 0.0
+        self._last_count = 0
+        self.fresh = False
+
+        self._start_child()
+
+    def _start_child(self):
+        self._stop_event.clear()
+        self._first_count = self.ring.count  # frames from a previous child are stale
+        self.process = self._ctx.Process(
+            target=_reader_main,
+            args=(self.factory, self.factory_kwargs, self.ring.name, self._stop_event, self.min_interval, self.model_name, self.record_path),
+            name='rc-reader',
+            daemon=True,
+        )
+        self.process.start()
+
+    def _neutral(self):
+        self.throttle = self.yaw = self.pitch = self.roll = self.tilt = 0.0
+
+    def _supervise(self):
+        """Restarts the child if it exited. Returns True while it is running."""
+        if self.process.is_alive():
+            return True
+
+        now = time.perf_counter()
+        if not self._restart_at:
+            print(f"[!] Reader process exited (code {self.process.exitcode}), restarting...")
+            self._restart_at = now + self.restart_delay
+            self._neutral()
+        elif now >= self._restart_at and self.is_connected:
+            self.restarts += 1
+            self._restart_at = 0.0
+            self._start_child()
+        return False
+
+    def update(self):
+        if not self._supervise():
+            self.fresh = False
+            return True  # neutral sticks until the child is back
+
+        latest = self.ring.latest()
+        if latest is None or latest[0] <= self._first_count:
+            return False
+
+        count, (timestamp, throttle, yaw, pitch, roll, tilt, sw1, sw2, bits) = latest
+        self.fresh = count != self._last_count
+        self._last_count = count
+
+        self.throttle = throttle
+        self.yaw      = yaw
+        self.pitch    = pitch
+        self.roll     = roll
+        self.tilt     = tilt
+        self.sw1      = sw1
+        self.sw2      = sw2
+
+        self.update_buttons(bits, timestamp)
+        return True
+
+    @property
+    def connected(self) -> bool:
+        return not self._restart_at
+
+    @property
+    def is_connected(self) -> bool:
+        return self.max_restarts is None or self.restarts < self.max_restarts
+
+    def close(self):
+        self._stop_event.set()
+        if self.process:
+            self.process.join(1.0)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.ring.close()
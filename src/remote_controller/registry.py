@@ -0,0 +1,134 @@
+"""
+Controller drivers by model name, imported only when that model is built.
+
+main.py imports nothing but this module, so running an N1 never loads
+pygame and running an RC3 never loads pyserial.
+
+Other packages can add models through the 'dji_rc.drivers' entry point
+group. The entry point names the model and points at a factory:
+
+    [project.entry-points."dji_rc.drivers"]
+    MYRC = "my_package.my_rc:create"
+
+The factory is called with the driver options below as keyword
+arguments (it should accept **kwargs for the ones it doesn't use) and
+returns a BaseRemoteController, or raises RCConnectionError (worth retrying)
+or RCConfigurationError (not).
+"""
+from .base_rc import RCConfigurationError
+
+ENTRY_POINT_GROUP = 'dji_rc.drivers'
+
+# Options every factory gets, with their defaults
+DRIVER_OPTIONS = {
+    'port': None,
+    'device_index': 0,      # which controller of this model, when a session uses several
+    'exclude_ports': (),    # serial ports other controllers of the session have claimed
+    'pipeline_depth': 1,
+    'event_driven': False,
+    'replay_path': None,
+    'replay_speed': 1.0,
+}
+
+
+# Dead zones (movement, elevation) each built-in model runs with; a replay
+# uses the recorded model's so it behaves like the live session did
+DEADZONES = {
+    'RC3': (0.3, 0.6),
+    'M300': (0.1, 0.1),
+    'N1': (0.1, 0.1),
+}
+
+
+# --- Built-in drivers ---
+def _rc3(event_driven=False, device_index=0, **_):
+    from .dji_rc3 import DJIRC3
+    movement, elevation = DEADZONES['RC3']
+    return DJIRC3(joystick_index=device_index, deadzone_threshold_movement=movement, deadzone_threshold_elevation=elevation, event_driven=event_driven)
+
+
+def _serial_port(model, port, exclude_ports):
+    if port is None:
+        # Last good port first, then every serial port in parallel
+        from .discovery import discover_port
+        port = discover_port(model, exclude=exclude_ports)
+        if port:
+            print(f"Found {model} on {port}")
+    return port
+
+
+def _m300(port=None, pipeline_depth=1, exclude_ports=(), **_):
+    from .dji_m300 import DJIM300
+    movement, elevation = DEADZONES['M300']
+    return DJIM300(port=_serial_port('M300', port, exclude_ports), pipeline_depth=pipeline_depth,
+                   deadzone_threshold_movement=movement, deadzone_threshold_elevation=elevation)
+
+
+def _n1(port=None, pipeline_depth=1, exclude_ports=(), **_):
+    from .dji_rcN1 import DJIRCN1
+    movement, elevation = DEADZONES['N1']
+    return DJIRCN1(port=_serial_port('N1', port, exclude_ports), pipeline_depth=pipeline_depth,
+                   deadzone_threshold_movement=movement, deadzone_threshold_elevation=elevation)
+
+
+def _replay(replay_path=None, replay_speed=1.0, **_):
+    from .replay import ReplayController
+    if not replay_path:
+        raise RCConfigurationError("REPLAY needs a recording (--replay FILE)")
+    return ReplayController(replay_path, speed=replay_speed)
+
+
+BUILTIN = {
+    'RC3': _rc3,
+    'M300': _m300,
+    'N1': _n1,
+    'REPLAY': _replay,
+}
+
+_factories = dict(BUILTIN)
+_plugins = None  # name -> entry point, read on first use
+
+
+def _entry_points():
+    global _plugins
+    if _plugins is None:
+        _plugins = {}
+        try:
+            from importlib.metadata import entry_points
+            for ep in entry_points(group=ENTRY_POINT_GROUP):
+                _plugins.setdefault(ep.name, ep)
+        except Exception as e:
+            print(f"Could not read driver plugins: {e}")
+    return _plugins
+
+
+def register(name, factory):
+    """Adds (or replaces) a model from code instead of an entry point."""
+    _factories[name] = factory
+
+
+def available():
+    """Every model name: built-in, registered and installed plugins (not imported)."""
+    return list(_factories) + [name for name in _entry_points() if name not in _factories]
+
+
+def is_known(name):
+    return name in _factories or name in _entry_points()
+
+
+def load(name):
+    """The factory for `name`, importing a plugin's module on first use."""
+    factory = _factories.get(name)
+    if factory is None:
+        ep = _entry_points().get(name)
+        if ep is None:
+            raise ValueError(f"unknown model '{name}', expected one of {', '.join(available())}")
+        factory = _factories[name] = ep.load()
+    return factory
+
+
+def create(name, **options):
+    """Builds a driver. Raises RCConnectionError if the device isn't there."""
+    kwargs = dict(DRIVER_OPTIONS)
+    kwargs.update(options)
+    return load(name)(**kwargs)
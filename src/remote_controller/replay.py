@@ -0,0 +1,133 @@
+import mmap
+import time
+from .base_rc import BaseRemoteController, RCConfigurationError
+from .duml import read_axis
+from src.utils.recorder import HEADER, RECORD_HEADER, STATE, KIND_DUML, KIND_STATE, read_header
+from src.utils.gestures import PRESSED
+
+buttons = [
+    ['button1', False],
+    ['button2', False],
+    ['button3', False],
+    ['button4', False],
+]
+
+def _stick_packet_check(model):
+    if model == 'N1':
+        from .dji_rcN1 import DJIRCN1
+        return DJIRCN1._is_stick_packet
+    if model == 'M300':
+        from .dji_m300 import DJIM300
+        return DJIM300._is_stick_packet
+    return None
+
+
+class ReplayController(BaseRemoteController):
+    """
+    Plays back a FrameRecorder log as if it were the live device.
+
+    speed=1.0 replays in real time, other positive values scale time, and
+    speed=0 replays one stick/state frame per update(). In real time every
+    record that is due is applied, so logs recorded faster than the loop
+    runs keep their pace; only a button change ends an update() early, so
+    each edge gets a tick of its own for the gesture flags.
+    is_connected turns False at the end of the log unless loop=True.
+
+    The dead zones default to the ones the recorded model runs with live.
+    """
+    def __init__(self, path, speed=1.0, loop=False, deadzone_threshold_movement=None, deadzone_threshold_elevation=None):
+        try:
+            self._file = open(path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.model = read_header(self._map)
+        except (OSError, ValueError) as e:
+            raise RCConfigurationError(f"Cannot replay {path}: {e}")
+
+        from .registry import DEADZONES
+        movement, elevation = DEADZONES.get(self.model, (0.1, 0.1))
+        if deadzone_threshold_movement is not None:
+            movement = deadzone_threshold_movement
+        if deadzone_threshold_elevation is not None:
+            elevation = deadzone_threshold_elevation
+        super().__init__(buttons, deadzone_threshold_movement=movement, deadzone_threshold_elevation=elevation)
+
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+
+        self._is_stick_packet = _stick_packet_check(self.model)
+        self._view = memoryview(self._map)
+        self._end = len(self._map)
+        self.frames = 0
+        self._rewind()
+        print(f"Replaying {self.model} recording from {path}")
+
+    def _rewind(self):
+        self._pos = HEADER.size
+        self._start = time.perf_counter()
+        # Gestures run on recording time, continued across loops
+        self._time_base = getattr(self, '_frame_time', 0.0)
+
+    def _apply_duml(self, frame, frame_time):
+        if self._is_stick_packet is None or not self._is_stick_packet(frame):
+            return False
+        self.update_axes((read_axis(frame, 13), read_axis(frame, 16), read_axis(frame, 19),
+                          read_axis(frame, 22), read_axis(frame, 25)), frame_time)
+        return True
+
+    def _apply_state(self, payload, frame_time):
+        roll, pitch, throttle, yaw, tilt, sw1, sw2, bits = STATE.unpack(payload)
+        self.update_axes((roll, pitch, throttle, yaw), frame_time)
+        self.tilt     = tilt
+        self.sw1      = sw1
+        self.sw2      = sw2
+        self.update_buttons(bits, frame_time)
+        return True
+
+    def _at_end(self):
+        if self._pos + RECORD_HEADER.size > self._end:
+            return True
+        length = RECORD_HEADER.unpack_from(self._map, self._pos)[2]
+        return self._pos + RECORD_HEADER.size + length > self._end  # truncated last record
+
+    def update(self):
+        got_frame = False
+        elapsed = (time.perf_counter() - self._start) * self.speed
+        while True:
+            if self._at_end():
+                if not self.loop or self._pos == HEADER.size:
+                    return got_frame
+                self._rewind()
+                elapsed = 0.0
+
+            timestamp_ns, kind, length = RECORD_HEADER.unpack_from(self._map, self._pos)
+            if self.speed > 0 and elapsed < timestamp_ns / 1e9:
+                return got_frame  # not due yet
+
+            start = self._pos + RECORD_HEADER.size
+            payload = self._view[start:start + length]
+            self._pos = start + length
+            self.frames += 1
+
+            self._frame_time = self._time_base + timestamp_ns / 1e9
+            if kind == KIND_DUML:
+                applied = self._apply_duml(payload, self._frame_time)
+            elif kind == KIND_STATE:
+                edge = payload[STATE.size - 1] != self.gestures.masks[PRESSED]
+                applied = self._apply_state(payload, self._frame_time)
+                if edge:
+                    return True  # the loop sees this button change before the next one
+            else:
+                applied = False
+            got_frame |= applied
+            if applied and self.speed <= 0:
+                return True
+
+    @property
+    def is_connected(self) -> bool:
+        return self.loop or not self._at_end()
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+        self._file.close()
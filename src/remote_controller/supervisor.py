@@ -0,0 +1,166 @@
+import threading
+import time
+from .base_rc import BaseRemoteController, RCConnectionError
+from src.utils.event_log import log
+
+buttons = [
+    ['button1', False],
+    ['button2', False],
+    ['button3', False],
+    ['button4', False],
+]
+
+class ControllerSupervisor(BaseRemoteController):
+    """
+    Keeps a session alive across unplug/replug of the controller.
+
+    Wraps the live driver and mirrors its state. When the device is lost it
+    calls on_disconnect() once (e.g. to release every key), reports neutral
+    sticks and idle buttons, and gets the device back:
+      - hot_plug drivers (RC3) are simply polled until they re-attach,
+      - everything else is rebuilt with factory() on a background thread,
+        retrying with exponential backoff.
+    The caller's loop, and all of its hold/cruise state, never stops.
+    """
+    def __init__(self, rc, factory, on_disconnect=None, on_reconnect=None,
+                 min_backoff=0.05, max_backoff=0.5, max_attempts=None):
+        super().__init__(buttons, deadzone_threshold_movement=rc.deadzone_threshold_movement, deadzone_threshold_elevation=rc.deadzone_threshold_elevation)
+
+        self.factory = factory
+        self.on_disconnect = on_disconnect
+        self.on_reconnect = on_reconnect
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+
+        # Idle gestures shown while disconnected, so no gesture can fire
+        self._idle_gestures = self.gestures
+
+        self.rc = None
+        self.connected = False
+        self.disconnects = 0
+        self.failed_attempts = 0
+        self.gave_up = False
+
+        self._replacement = None  # new driver handed over by the reconnect thread
+        self._reconnect_thread = None
+        self._lost_at = 0.0
+        self._closing = threading.Event()
+
+        self._attach(rc)
+
+    @property
+    def recorder(self):
+        return self.rc.recorder if self.rc else None
+
+    @recorder.setter
+    def recorder(self, recorder):
+        # Forward to whichever driver is live, now and after a reconnect
+        self._recorder = recorder
+        if getattr(self, 'rc', None):
+            self.rc.recorder = recorder
+
+    def _attach(self, rc):
+        if self._recorder is None:
+            self._recorder = rc.recorder
+        else:
+            rc.recorder = self._recorder
+        self.rc = rc
+        self.connected = True
+        self._show_gestures(rc.gestures)
+
+    def _show_gestures(self, gestures):
+        self.gestures = gestures
+        self.button1, self.button2, self.button3, self.button4 = gestures.views
+
+    def _lost(self):
+        self.connected = False
+        self.disconnects += 1
+        self._lost_at = time.perf_counter()
+        log.event('device', "[!!!] CONTROLLER DISCONNECTED - reconnecting in the background [!!!]")
+
+        self.throttle = self.yaw = self.pitch = self.roll = self.tilt = 0.0
+        self._show_gestures(self._idle_gestures)
+        self.rc.gestures.reset()  # a button held at unplug must not "release" on replug
+        if self.on_disconnect:
+            self.on_disconnect()
+
+        if not self.rc.hot_plug:
+            self.rc.close()
+            self._reconnect_thread = threading.Thread(target=self._reconnect, name='rc-reconnect', daemon=True)
+            self._reconnect_thread.start()
+
+    def _reconnect(self):
+        backoff = self.min_backoff
+        while not self._closing.is_set():
+            try:
+                self._replacement = self.factory()
+                return
+            except RCConnectionError as e:
+                self.failed_attempts += 1
+                if self.max_attempts is not None and self.failed_attempts >= self.max_attempts:
+                    log.event('device', "Giving up reconnecting: {error}", error=e)
+                    self.gave_up = True
+                    return
+            self._closing.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _resumed(self):
+        log.event('device', ">>> CONTROLLER RECONNECTED after {seconds:.2f} s <<<", seconds=time.perf_counter() - self._lost_at)
+        if self.on_reconnect:
+            self.on_reconnect()
+
+    def _sync(self):
+        rc = self.rc
+        self.throttle = rc.throttle
+        self.yaw      = rc.yaw
+        self.pitch    = rc.pitch
+        self.roll     = rc.roll
+        self.tilt     = rc.tilt
+        self.sw1      = rc.sw1
+        self.sw2      = rc.sw2
+
+    def update(self):
+        if self.connected:
+            ok = self.rc.update()
+            if self.rc.is_connected:
+                if ok: self._sync()
+                return ok
+            self._lost()
+            return True  # one neutral tick so the caller releases its keys
+
+        if self.rc.hot_plug:
+            self.rc.update()  # lets the driver see the device come back
+            if self.rc.is_connected:
+                self._attach(self.rc)
+                self._resumed()
+            return True
+
+        replacement = self._replacement
+        if replacement is not None:
+            self._replacement = None
+            self._attach(replacement)
+            self._resumed()
+        return True
+
+    def pump_events(self):
+        if self.rc:
+            self.rc.pump_events()
+
+    def wait_for_input(self, timeout):
+        if self.connected:
+            return self.rc.wait_for_input(timeout)
+        return super().wait_for_input(timeout)
+
+    @property
+    def is_connected(self) -> bool:
+        return not self.gave_up
+
+    def close(self):
+        self._closing.set()
+        if self._reconnect_thread:
+            self._reconnect_thread.join(1.0)
+        if self._replacement:
+            self._replacement.close()
+        if self.rc:
+            self.rc.close()
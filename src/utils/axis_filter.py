@@ -0,0 +1,161 @@
+"""
+Axis conditioning: what a raw stick value goes through before the mapping.
+
+Per axis, in order:
+  1. smoothing (optional): 'lowpass' (fixed cutoff) or 'one_euro'
+     (cutoff rises with stick speed, so slow drift is smoothed and fast
+     moves are not delayed),
+  2. a Schmitt-trigger dead zone: the axis engages at |v| >= threshold and
+     only disengages below threshold * (1 - hysteresis), so a stick resting
+     near the threshold no longer flickers across it,
+  3. expo: (1 - e) * v + e * v**3 (only changes magnitudes, i.e. PWM duty),
+  4. transition limiting: the sign of the output (the key that would be
+     held) changes at most once per min_hold seconds.
+
+AxisConditioner.apply() runs all axes of a frame in one call, on the
+frame's own timestamp.
+"""
+import math
+
+# Axis order of AxisConditioner.apply(); the DUML payload and recordings use the same
+AXES = ('roll', 'pitch', 'throttle', 'yaw', 'tilt')
+
+SMOOTHING = (None, 'none', 'lowpass', 'one_euro')
+
+
+def _alpha(cutoff, dt):
+    """Exponential smoothing factor of a first-order low-pass at `cutoff` Hz."""
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class AxisConditioner:
+    def __init__(self, thresholds, hysteresis=0.2, expo=0.0, smoothing=None, cutoff=5.0, beta=0.0,
+                 d_cutoff=1.0, min_hold=0.0):
+        """
+        thresholds: dead zone per axis, in AXES order (fewer is fine, e.g. no tilt).
+        The other options apply to every axis; see configure() for one axis.
+        """
+        count = len(thresholds)
+        self.thresholds = list(thresholds)
+        self.hysteresis = [0.0] * count
+        self.expo = [0.0] * count
+        self.smoothing = [None] * count
+        self.cutoff = [cutoff] * count
+        self.beta = [beta] * count
+        self.d_cutoff = [d_cutoff] * count
+        self.min_hold = [0.0] * count
+        self.configure(hysteresis=hysteresis, expo=expo, smoothing=smoothing, min_hold=min_hold)
+
+        self.output = [0.0] * count
+        self.transitions = 0  # output sign changes let through
+        self.held = 0         # sign changes delayed by min_hold
+        self.reset()
+
+    def configure(self, axis=None, threshold=None, hysteresis=None, expo=None, smoothing=None,
+                  cutoff=None, beta=None, d_cutoff=None, min_hold=None):
+        """
+        Changes the given options for one axis (by name) or, with axis=None,
+        for all of them. None leaves an option as it is (smoothing='none' turns it off).
+        """
+        if axis is None:
+            indexes = range(len(self.thresholds))
+        elif axis in AXES and AXES.index(axis) < len(self.thresholds):
+            indexes = (AXES.index(axis),)
+        else:
+            raise ValueError(f"unknown axis '{axis}', expected one of {', '.join(AXES[:len(self.thresholds)])}")
+        if smoothing not in SMOOTHING:
+            raise ValueError(f"smoothing must be none, lowpass or one_euro, not '{smoothing}'")
+        if hysteresis is not None and not 0.0 <= hysteresis < 1.0:
+            raise ValueError("hysteresis must be in [0, 1)")
+        if expo is not None and not 0.0 <= expo <= 1.0:
+            raise ValueError("expo must be in [0, 1]")
+
+        for i in indexes:
+            for name, value in (('thresholds', threshold), ('hysteresis', hysteresis), ('expo', expo),
+                                ('cutoff', cutoff), ('beta', beta), ('d_cutoff', d_cutoff), ('min_hold', min_hold)):
+                if value is not None:
+                    getattr(self, name)[i] = value
+            if smoothing is not None:
+                self.smoothing[i] = None if smoothing == 'none' else smoothing
+
+        # Precomputed release points for apply()
+        self._release = [t * (1.0 - h) for t, h in zip(self.thresholds, self.hysteresis)]
+
+    def reset(self):
+        """Forgets filter and trigger state (e.g. after a reconnect)."""
+        count = len(self.thresholds)
+        self._active = [False] * count
+        self._smoothed = [None] * count     # last filter output, None until the first frame
+        self._slope = [0.0] * count         # one-euro: smoothed derivative
+        self._sign = [0] * count
+        self._changed = [float('-inf')] * count
+        self._last_time = None
+        self.output[:] = [0.0] * count
+
+    def _smooth(self, i, x, dt):
+        last = self._smoothed[i]
+        if last is None or dt <= 0.0:
+            self._smoothed[i] = x
+            return x
+        cutoff = self.cutoff[i]
+        if self.smoothing[i] == 'one_euro':
+            slope = self._slope[i] + _alpha(self.d_cutoff[i], dt) * ((x - last) / dt - self._slope[i])
+            self._slope[i] = slope
+            cutoff += self.beta[i] * abs(slope)
+        x = last + _alpha(cutoff, dt) * (x - last)
+        self._smoothed[i] = x
+        return x
+
+    def apply(self, values, now):
+        """
+        Conditions one frame: `values` in AXES order, `now` the frame's
+        perf_counter timestamp. Returns self.output (reused between calls).
+        """
+        dt = 0.0 if self._last_time is None else now - self._last_time
+        self._last_time = now
+
+        smoothing, active, release, thresholds = self.smoothing, self._active, self._release, self.thresholds
+        expo, min_hold, sign, output = self.expo, self.min_hold, self._sign, self.output
+        for i, x in enumerate(values):
+            if smoothing[i] is not None:
+                x = self._smooth(i, x, dt)
+
+            # Schmitt trigger
+            magnitude = x if x >= 0.0 else -x
+            if active[i]:
+                if magnitude < release[i]:
+                    active[i] = False
+            elif magnitude >= thresholds[i]:
+                active[i] = True
+            if not active[i]:
+                x = 0.0
+            elif expo[i]:
+                e = expo[i]
+                x = (1.0 - e) * x + e * x * x * x
+
+            s = (x > 0.0) - (x < 0.0)
+            if s != sign[i]:
+                if now - self._changed[i] < min_hold[i]:
+                    self.held += 1
+                    continue  # keep the previous output (and key) a little longer
+                sign[i] = s
+                self._changed[i] = now
+                self.transitions += 1
+            output[i] = x
+        return output
+
+    def __str__(self):
+        parts = []
+        for i, threshold in enumerate(self.thresholds):
+            text = f"{AXES[i]} {threshold:g}"
+            if self.hysteresis[i]:
+                text += f"/{self._release[i]:g}"
+            if self.smoothing[i]:
+                text += f" {self.smoothing[i]}@{self.cutoff[i]:g}Hz"
+            if self.expo[i]:
+                text += f" expo {self.expo[i]:g}"
+            if self.min_hold[i]:
+                text += f" hold {self.min_hold[i] * 1000:.0f}ms"
+            parts.append(text)
+        return ', '.join(parts)
@@ -0,0 +1,220 @@
+import time
+from src.utils.sequence import SequenceHandler
+from src.utils.event_log import log
+from src.utils.profile import INPUT_INDEX, SEQUENCE_TAP, compile_profiles
+
+EMERGENCY_PAUSE = 3.0
+
+PITCH, ROLL, YAW = INPUT_INDEX['pitch'], INPUT_INDEX['roll'], INPUT_INDEX['yaw']
+
+
+class ControlLoop:
+    """
+    One tick of RC -> keyboard mapping: buttons, cruise/turn holds, the
+    scripted sequence, switch taps and axis keys, as described by a
+    compiled mapping profile (see src.utils.profile).
+
+    With several profiles, `switch` ('sw1' or 'sw2') picks the active one:
+    positions -1/0/1 select profiles 0/1/2 (the last one repeats if fewer).
+    Pacing is left to the caller (see TickScheduler).
+    """
+    def __init__(self, rc, k_emu, profiles=None, switch=None):
+        self.rc = rc
+        self.k_emu = k_emu
+
+        self.profiles = profiles or compile_profiles(None, k_emu)
+        self._by_position = tuple(self.profiles[min(i, len(self.profiles) - 1)] for i in range(3))
+        self.switch_input = INPUT_INDEX[switch] if switch else -1
+        self.profile = self.profiles[0]
+        self._last_switch = [None] * len(self.profile.switches)
+
+        self.seq_handler = SequenceHandler()
+
+        # State toggles
+        self.hold_cruise = False  # Locks Pitch
+        self.hold_turn = False    # Locks Yaw
+        self.seq_running = False
+
+        # Values to store when hold is activated, by input index
+        self.frozen = [0.0] * len(INPUT_INDEX)
+
+        # Inputs are ignored until this perf_counter time (emergency pause)
+        self.paused_until = 0.0
+
+        # Optional StatePublisher; gets a snapshot of every decoded frame
+        self.publisher = None
+
+        # True while rc.connected is False; hold_cruise/hold_turn/frozen are
+        # kept so they apply again once the controller is back
+        self._device_lost = False
+
+    def _select_profile(self, inputs):
+        profile = self._by_position[inputs[self.switch_input] + 1]
+        if profile is self.profile:
+            return
+        log.event('loop', ">>> PROFILE: {name} <<<", name=profile.name)
+        # Neutral for the old profile's axes; flush() releases whatever the new one doesn't drive
+        for channel in self.profile.channels:
+            self.k_emu.set_axis(channel, 0)
+        self.seq_handler.stop()
+        self.profile = profile
+        self._last_switch = [None] * len(profile.switches)
+
+    def _release_all(self):
+        """Every channel neutral and any running sequence stopped."""
+        self.seq_handler.stop()
+        self.seq_running = False
+        for channel in self.profile.channels:
+            self.k_emu.set_axis(channel, 0)
+        self.k_emu.flush()
+
+    def tick(self):
+        """Runs one iteration. Returns False once the controller is gone."""
+        rc = self.rc
+        k_emu = self.k_emu
+
+        k_emu.service() # Release taps that are due
+
+        if not rc.is_connected:
+            log.event('loop', "[!!!] CONTROLLER DISCONNECTED [!!!]")
+            if self.publisher: self.publisher.publish(self, connected=False)
+            return False
+
+        ok = rc.update()
+
+        # Device gone but the session goes on (supervisor reconnecting):
+        # nothing is mapped, so the holds can't re-press their keys
+        if not rc.connected:
+            if not self._device_lost:
+                self._device_lost = True
+                self._release_all()
+            if self.publisher: self.publisher.publish(self, connected=False)
+            return True
+        self._device_lost = False
+
+        if not ok: return True
+
+        if self.paused_until:
+            if time.perf_counter() < self.paused_until:
+                if self.publisher: self.publisher.publish(self)
+                return True
+            self.paused_until = 0.0
+            log.event('loop', '>>> Emergency PAUSE Finished <<<')
+
+        self.map_frame()
+        if self.publisher: self.publisher.publish(self)
+        return True
+
+    def map_frame(self):
+        """Turns the controller's current frame into key events."""
+        rc = self.rc
+        k_emu = self.k_emu
+
+        inputs = (rc.throttle, rc.yaw, rc.pitch, rc.roll, rc.tilt, rc.sw1, rc.sw2)
+
+        if self.switch_input >= 0:
+            self._select_profile(inputs)
+        profile = self.profile
+
+        # Every button binding of the profile, matched in one pass
+        fired = rc.gestures.match(profile.patterns)
+
+        # --- 1. Control actions (may end the tick) ---
+        if fired:
+            for bit, action in profile.control:
+                if fired & bit and getattr(self, action)():
+                    return
+
+        overrides, self.seq_running = self.seq_handler.update()
+
+        if fired and not self.seq_running:
+            for bit, action in profile.holds:
+                if fired & bit:
+                    getattr(self, action)()
+
+        # --- 2. Switch positions (e.g. camera modes) ---
+        last_switch = self._last_switch
+        for i, (source, keys) in enumerate(profile.switches):
+            position = inputs[source]
+            if position != last_switch[i]:
+                key = keys[position + 1]
+                if key is not None: k_emu.tap_key(key)
+                last_switch[i] = position
+
+        if overrides:
+            # A step's tap fires once, on the tick the step starts
+            key = self.seq_handler.entered.get(SEQUENCE_TAP)
+            if key is not None:
+                k_emu.tap_key(key)
+
+        # --- 3. Handle Buttons (One-shot Taps) ---
+        if fired:
+            for bit, key in profile.taps:
+                if fired & bit:
+                    k_emu.tap_key(key)
+
+        # --- 4. Handle Keyboard Emulation ---
+        # Held axes use their frozen value, otherwise the sequence or the live stick
+        hold_cruise, hold_turn, frozen = self.hold_cruise, self.hold_turn, self.frozen
+        for source, channel, hold, when_input, when_value in profile.axes:
+            if when_input >= 0 and inputs[when_input] != when_value:
+                value = 0
+            elif (hold == 'cruise' and hold_cruise) or (hold == 'turn' and hold_turn):
+                value = frozen[source]
+            elif overrides:
+                value = overrides.get(source, inputs[source])
+            else:
+                value = inputs[source]
+            k_emu.set_axis(channel, value)
+
+        # Send only the keys whose state changed this tick
+        k_emu.flush()
+
+    # --- Button actions (named in the profile) ---
+    def emergency_pause(self):
+        log.event('loop', '>>> Emergency PAUSE for {seconds:.0f} sec <<<', seconds=EMERGENCY_PAUSE)
+        self.seq_handler.stop()
+        self.k_emu.force_cleanup()
+        self.hold_cruise = False
+        self.hold_turn = False
+        self.paused_until = time.perf_counter() + EMERGENCY_PAUSE
+        return True
+
+    def toggle_sequence(self):
+        if self.hold_cruise or self.hold_turn:
+            return False
+        if self.seq_running:
+            self.seq_handler.stop()
+        else:
+            self.seq_handler.start_sequence(self.profile.sequence)
+        return False
+
+    def toggle_hold(self):
+        rc = self.rc
+        if self.hold_cruise:
+            log.event('loop', '>>> DISABLE CRUISE <<<')
+            self.hold_cruise = False
+        else:
+            if self.hold_turn:
+                log.event('loop', '>>> DISABLE TURN <<<')
+                self.hold_turn = False
+            elif rc.yaw != 0:
+                log.event('loop', '>>> ENABLE TURN <<<')
+                self.frozen[YAW] = rc.yaw
+                self.hold_turn = True
+
+    def forward_cruise(self):
+        log.event('loop', '>>> ENABLE FORWARD CRUISE <<<')
+        self.hold_cruise = True
+        self.frozen[PITCH] = 1
+        self.frozen[ROLL] = 0
+
+    def free_cruise(self):
+        rc = self.rc
+        if rc.pitch != 0 or rc.roll != 0:
+            log.event('loop', '>>> ENABLE FREE CRUISE <<<')
+            self.hold_cruise = True
+            self.frozen[PITCH] = rc.pitch
+            self.frozen[ROLL] = rc.roll
+        else:
+            log.event('loop', '>>> FREE CRUISE HAS NO VALUES TO CRUISE<<<')
@@ -0,0 +1,200 @@
+"""
+Structured event log, written off the control loop's thread.
+
+log.event() / log.debug() only check the category's rate limit and append
+a tuple to a deque; formatting, JSON encoding and console output happen on
+a writer thread, so a slow console (Windows conhost can block for
+milliseconds per line) never stalls a tick.
+
+Until start() is called the log prints directly, as the code did before,
+so scripts that never start it (benchmarks, the sniffer) behave the same.
+
+Console modes:
+  all      every record (the old behaviour)
+  events   notices only, plus a periodic per-category summary
+  summary  only the periodic summary
+The file sink (JSONL, one object per record) always gets every record
+that passed its rate limit.
+"""
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+NOTICE = 'notice'  # state changes the operator should see
+DEBUG = 'debug'    # per-event diagnostics (key events, button dumps)
+
+CONSOLE_MODES = ('all', 'events', 'summary')
+
+# Records per second per category; the rest are counted as dropped
+DEFAULT_RATE_LIMITS = {
+    'device': 10.0,     # driver errors can repeat every frame
+    'button': 20.0,     # print_update dumps every frame
+    'scheduler': 10.0,  # overruns
+}
+
+
+class RateLimit:
+    """Token bucket: `rate` records per second, bursts of up to `burst`."""
+    __slots__ = ('rate', 'burst', 'tokens', 'last')
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(rate, 1.0)
+        self.tokens = self.burst
+        self.last = time.perf_counter()
+
+    def allow(self, now):
+        tokens = self.tokens + (now - self.last) * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        self.last = now
+        if tokens < 1.0:
+            self.tokens = tokens
+            return False
+        self.tokens = tokens - 1.0
+        return True
+
+
+def _format(message, fields):
+    try:
+        return message.format(**fields) if fields else message
+    except (KeyError, IndexError, ValueError):
+        return message
+
+
+class EventLog:
+    def __init__(self, rate_limits=None, max_pending=10000):
+        self.limits = {}
+        self.set_rate_limits(DEFAULT_RATE_LIMITS)
+        if rate_limits:
+            self.set_rate_limits(rate_limits)
+
+        self.console = 'all'
+        self.path = None
+        self.summary_interval = 10.0
+        self.flush_interval = 0.05
+
+        self._pending = deque(maxlen=max_pending)
+        self.dropped = {}       # category -> records refused by its rate limit
+        self.overflowed = 0     # records lost because the writer fell behind
+        self.written = 0
+        self._counts = {}       # category -> records since the last summary
+        self._file = None
+        self._stop_event = threading.Event()
+        self.thread = None
+
+    def set_rate_limits(self, rate_limits):
+        """{category: records per second}; 0 or None removes the limit."""
+        for category, rate in rate_limits.items():
+            if rate:
+                self.limits[category] = RateLimit(float(rate))
+            else:
+                self.limits.pop(category, None)
+
+    # --- Producers (any thread) ---
+    def event(self, category, message, **fields):
+        """A notice. `message` is a str.format template filled from `fields` by the writer."""
+        self._log(NOTICE, category, message, fields)
+
+    def debug(self, category, message, **fields):
+        self._log(DEBUG, category, message, fields)
+
+    def _log(self, level, category, message, fields):
+        limit = self.limits.get(category)
+        if limit is not None and not limit.allow(time.perf_counter()):
+            self.dropped[category] = self.dropped.get(category, 0) + 1
+            return
+
+        if self.thread is None:
+            print(_format(message, fields))
+            return
+
+        pending = self._pending
+        if len(pending) == pending.maxlen:
+            self.overflowed += 1  # the oldest record is pushed out
+        pending.append((time.time(), level, category, message, fields))
+
+    # --- Writer ---
+    def start(self, path=None, console='all', summary_interval=10.0):
+        if console not in CONSOLE_MODES:
+            raise ValueError(f"console must be one of {', '.join(CONSOLE_MODES)}")
+        self.console = console
+        self.path = path
+        self.summary_interval = summary_interval
+        if path:
+            self._file = open(path, 'a', encoding='utf-8')
+        self._stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name='event-log', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        next_summary = time.perf_counter() + self.summary_interval
+        while not self._stop_event.wait(self.flush_interval):
+            self._write_pending()
+            if self.console != 'all' and time.perf_counter() >= next_summary:
+                self._print_summary()
+                next_summary += self.summary_interval
+
+    def _write_pending(self):
+        pending = self._pending
+        console = self.console
+        counts = self._counts
+        lines = []
+        records = []
+        while True:
+            try:
+                wall, level, category, message, fields = pending.popleft()
+            except IndexError:
+                break
+            text = _format(message, fields)
+            counts[category] = counts.get(category, 0) + 1
+            if console == 'all' or (console == 'events' and level == NOTICE):
+                lines.append(text)
+            if self._file:
+                record = {'time': wall, 'level': level, 'category': category, 'message': text}
+                for key, value in fields.items():
+                    record.setdefault(key, value)
+                records.append(json.dumps(record, default=str))
+
+        if lines:
+            sys.stdout.write('\n'.join(lines) + '\n')
+            sys.stdout.flush()
+        if records:
+            self._file.write('\n'.join(records) + '\n')
+            self._file.flush()
+            self.written += len(records)
+
+    def _print_summary(self):
+        counts, self._counts = self._counts, {}
+        dropped = {category: n for category, n in self.dropped.items() if n}
+        if not counts and not dropped:
+            return
+        text = ', '.join(f"{category} {n}" for category, n in sorted(counts.items())) or 'no events'
+        if dropped:
+            text += ' | rate-limited: ' + ', '.join(f"{category} {n}" for category, n in sorted(dropped.items()))
+            for category in dropped:
+                self.dropped[category] = 0
+        if self.overflowed:
+            text += f' | lost: {self.overflowed}'
+        sys.stdout.write(f"[LOG] last {self.summary_interval:g} s: {text}\n")
+        sys.stdout.flush()
+
+    def stop(self):
+        """Writes what is still queued and goes back to printing directly."""
+        if self.thread is None:
+            return
+        self._stop_event.set()
+        self.thread.join(1.0)
+        self.thread = None
+        self._write_pending()
+        if self.console != 'all':
+            self._print_summary()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+# The process-wide log
+log = EventLog()
@@ -0,0 +1,204 @@
+"""
+Button gestures for all buttons of a controller at once.
+
+GestureEngine.update() takes a frame's raw button bits and that frame's
+monotonic timestamp, and runs every button's state machine in one pass
+over bitmasks. Timing comes from the frame, not from when the loop got
+around to it, so loop jitter doesn't change what counts as a long press.
+"""
+from src.utils.event_log import log
+
+# Gesture kinds, as indexes into GestureEngine.masks
+PRESSED = 0
+SHORT_TAP = 1               # released before long_threshold (one frame)
+LONG_PRESS = 2              # crossed long_threshold (one frame)
+MAINTAINED_LONG_PRESS = 3   # held past long_threshold (every frame)
+DOUBLE_TAP = 4              # second short tap within double_tap_window (one frame, with its SHORT_TAP)
+CHORD = 5                   # patterns only: buttons pressed together within chord_window
+
+KINDS = {
+    'pressed': PRESSED,
+    'short_tap': SHORT_TAP,
+    'long_press': LONG_PRESS,
+    'maintained_long_press': MAINTAINED_LONG_PRESS,
+    'double_tap': DOUBLE_TAP,
+    'chord': CHORD,
+}
+
+
+# One button's flags, as printed for print_update buttons
+VIEW_FORMAT = ('{name} - is_pressed: {pressed} | is_short_tap: {short_tap} | is_long_press: {long_press} | '
+               'is_maintained_long_press: {maintained} | is_double_tap: {double_tap}')
+
+
+def pattern(kind, buttons, with_kind=PRESSED, with_buttons=0):
+    """
+    A declared gesture for GestureEngine.match():
+      kind on every button in the `buttons` mask (CHORD: all pressed together),
+      optionally while every button in `with_buttons` is in `with_kind`
+      (a hold-combo, e.g. short_tap on button4 with button1 maintained).
+    """
+    return (kind, buttons, with_kind, with_buttons)
+
+
+class ButtonView:
+    """One button of a GestureEngine, with the old ButtonHandler flags."""
+    __slots__ = ('engine', 'bit', 'button_name', 'print_update')
+
+    def __init__(self, engine, bit, button_name, print_update=False):
+        self.engine = engine
+        self.bit = bit
+        self.button_name = button_name
+        self.print_update = print_update
+
+    @property
+    def is_pressed(self):
+        return bool(self.engine.masks[PRESSED] & self.bit)
+
+    @property
+    def is_short_tap(self):
+        return bool(self.engine.masks[SHORT_TAP] & self.bit)
+
+    @property
+    def is_long_press(self):
+        return bool(self.engine.masks[LONG_PRESS] & self.bit)
+
+    @property
+    def is_maintained_long_press(self):
+        return bool(self.engine.masks[MAINTAINED_LONG_PRESS] & self.bit)
+
+    @property
+    def is_double_tap(self):
+        return bool(self.engine.masks[DOUBLE_TAP] & self.bit)
+
+    def __int__(self):
+        return int(self.is_pressed)
+
+    def __str__(self):
+        return VIEW_FORMAT.format(name=self.button_name, pressed=self.is_pressed, short_tap=self.is_short_tap, long_press=self.is_long_press,
+                                  maintained=self.is_maintained_long_press, double_tap=self.is_double_tap)
+
+
+class GestureEngine:
+    def __init__(self, buttons, long_threshold=1.0, double_tap_window=0.3, chord_window=0.15):
+        """
+        buttons: [[name, print_update], ...], bit i = buttons[i]
+        """
+        self.long_threshold = long_threshold
+        self.double_tap_window = double_tap_window
+        self.chord_window = chord_window
+
+        self.views = tuple(ButtonView(self, 1 << i, name, print_update) for i, (name, print_update) in enumerate(buttons))
+        self._print_mask = sum(view.bit for view in self.views if view.print_update)
+
+        count = len(buttons)
+        self.masks = [0] * (DOUBLE_TAP + 1)
+        self.rising = 0
+        self.timestamp = 0.0
+        self._latched = 0                           # buttons whose long press already fired
+        self._press_start = [0.0] * count
+        self._last_tap = [float('-inf')] * count    # release time of the last short tap
+
+    def update(self, bits, timestamp):
+        masks = self.masks
+        last = masks[PRESSED]
+        rising = bits & ~last
+        falling = last & ~bits
+        latched = self._latched
+
+        # Releases: short taps, and double taps from the previous tap's time
+        short_tap = falling & ~latched
+        double_tap = 0
+        m = short_tap
+        while m:
+            low = m & -m
+            i = low.bit_length() - 1
+            if timestamp - self._last_tap[i] <= self.double_tap_window:
+                double_tap |= low
+                self._last_tap[i] = float('-inf')  # a third tap starts a new pair
+            else:
+                self._last_tap[i] = timestamp
+            m ^= low
+        latched &= ~falling
+
+        # Presses start their long-press clock at the frame's timestamp
+        m = rising
+        while m:
+            low = m & -m
+            self._press_start[low.bit_length() - 1] = timestamp
+            m ^= low
+
+        # Held buttons that crossed the threshold this frame
+        long_press = 0
+        m = bits & ~latched
+        while m:
+            low = m & -m
+            if timestamp - self._press_start[low.bit_length() - 1] >= self.long_threshold:
+                long_press |= low
+            m ^= low
+        latched |= long_press
+
+        self._latched = latched
+        self.rising = rising
+        self.timestamp = timestamp
+        masks[PRESSED] = bits
+        masks[SHORT_TAP] = short_tap
+        masks[LONG_PRESS] = long_press
+        masks[MAINTAINED_LONG_PRESS] = bits & latched
+        masks[DOUBLE_TAP] = double_tap
+
+        if self._print_mask:
+            # The flags go to the log as values; the writer thread formats them
+            for view in self.views:
+                if view.print_update:
+                    bit = view.bit
+                    log.debug('button', VIEW_FORMAT, name=view.button_name, pressed=bool(bits & bit),
+                              short_tap=bool(short_tap & bit), long_press=bool(long_press & bit),
+                              maintained=bool(bits & latched & bit), double_tap=bool(double_tap & bit))
+
+    def update_edges(self, edges):
+        """
+        Several (bits, timestamp) states in arrival order, e.g. every button
+        event since the last tick. Each is timed on its own and the one-frame
+        flags of all of them are kept, so a press and release between two
+        ticks still shows as a short tap.
+        """
+        masks = self.masks
+        short_tap = long_press = double_tap = rising = 0
+        for bits, timestamp in edges:
+            self.update(bits, timestamp)
+            short_tap |= masks[SHORT_TAP]
+            long_press |= masks[LONG_PRESS]
+            double_tap |= masks[DOUBLE_TAP]
+            rising |= self.rising
+        masks[SHORT_TAP] = short_tap
+        masks[LONG_PRESS] = long_press
+        masks[DOUBLE_TAP] = double_tap
+        self.rising = rising
+
+    def _chord(self, mask):
+        """All of `mask` down, the last of them pressed this frame, within chord_window."""
+        if self.masks[PRESSED] & mask != mask or not self.rising & mask:
+            return False
+        starts = [self._press_start[i] for i in range(len(self._press_start)) if mask >> i & 1]
+        return max(starts) - min(starts) <= self.chord_window
+
+    def match(self, patterns):
+        """Evaluates declared patterns for this frame. Returns a mask, bit i = patterns[i] fired."""
+        masks = self.masks
+        fired = 0
+        for i, (kind, buttons, with_kind, with_buttons) in enumerate(patterns):
+            if kind == CHORD:
+                if not self._chord(buttons):
+                    continue
+            elif masks[kind] & buttons != buttons:
+                continue
+            if with_buttons and masks[with_kind] & with_buttons != with_buttons:
+                continue
+            fired |= 1 << i
+        return fired
+
+    def reset(self):
+        self.masks[:] = [0] * len(self.masks)
+        self.rising = 0
+        self._latched = 0
@@ -0,0 +1,311 @@
+"""
+Loop health metrics: per-stage latency histograms and counters.
+
+Nothing here is called unless metrics are enabled: instrumentation works
+by wrapping methods on the live objects (Metrics.timed), so a disabled
+session runs exactly the same code as before. Counters that the drivers
+and the scheduler already keep (CRC errors, timeouts, overruns) are read
+only when the metrics are exported.
+
+Exported as Prometheus text (MetricsServer, localhost only) and/or as
+periodic JSON lines with per-second rates (MetricsDumper).
+"""
+import json
+import threading
+import time
+
+PREFIX = 'dji_rc_'
+
+
+class Histogram:
+    """
+    Latency histogram with power-of-two microsecond buckets (1 us .. ~8 s).
+    observe() is a bit_length() and three increments.
+    """
+    BUCKETS = 24
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.counts = [0] * (self.BUCKETS + 1)  # last bucket: over 2**BUCKETS us
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        i = int(seconds * 1e6).bit_length()
+        if i > self.BUCKETS:
+            i = self.BUCKETS
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @staticmethod
+    def upper_bound(i):
+        return (1 << i) / 1e6
+
+    def percentile(self, pct):
+        """Upper bound of the bucket holding the pct-th percentile, in seconds."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.upper_bound(i), self.max)
+        return self.max
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+
+def drivers_of(rc):
+    """The concrete drivers behind a (possibly wrapped or merged) controller."""
+    drivers = []
+    for child in getattr(rc, 'controllers', [rc]):
+        while getattr(child, 'rc', None) is not None:
+            child = child.rc
+        if not hasattr(child, 'controllers') and not hasattr(child, 'factory_kwargs'):
+            drivers.append(child)
+    return drivers
+
+
+class Metrics:
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self._collected = {}  # name -> (help, fn) read at export time
+        self.started = time.perf_counter()
+
+    def histogram(self, name, help_text):
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, help_text)
+        return self.histograms[name]
+
+    def counter(self, name, help_text):
+        if name not in self.counters:
+            self.counters[name] = Counter(name, help_text)
+        return self.counters[name]
+
+    def collect(self, name, help_text, fn):
+        """Registers a counter kept elsewhere; fn() is called on export."""
+        self._collected[name] = (help_text, fn)
+
+    # --- Instrumentation ---
+    def timed(self, obj, method, histogram, counter=None):
+        """
+        Replaces obj.method with a wrapper that times every call into
+        `histogram`. With `counter`, calls returning a true value are counted.
+        """
+        original = getattr(obj, method)
+        observe = histogram.observe
+        clock = time.perf_counter
+
+        if counter is None:
+            def wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    observe(clock() - start)
+        else:
+            def wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    result = original(*args, **kwargs)
+                finally:
+                    observe(clock() - start)
+                if result:
+                    counter.value += 1
+                return result
+
+        wrapper.__wrapped__ = original
+        setattr(obj, method, wrapper)
+
+    def instrument_driver(self, rc):
+        """Device read/decode and gesture stages of a concrete driver (call again after a reconnect)."""
+        instrumented_by = rc.__dict__.setdefault('_instrumented_by', [])
+        if self in instrumented_by:
+            return  # hot-plug drivers survive a reconnect
+        instrumented_by.append(self)
+
+        read = self.histogram('device_read_seconds', 'Time spent reading from the device')
+        decode = self.histogram('decode_seconds', 'Time spent decoding frames into axes')
+        gesture = self.histogram('gesture_seconds', 'Time spent in the gesture engine')
+
+        if hasattr(rc, 'parser'):  # DUML serial drivers
+            self.timed(rc.parser, 'fill_from', read)
+            self.timed(rc, '_drain', decode)
+        if hasattr(rc, '_poll_all'):  # DJIRC3
+            self.timed(rc, '_handle_events', read)
+            self.timed(rc, '_poll_all', read)
+            self.timed(rc, '_apply_axes', decode)
+        self.timed(rc, 'update_buttons', gesture)
+
+    def instrument_controller(self, rc):
+        """
+        The loop-facing controller plus every driver it wraps. Drivers that
+        run in a reader process (--process) only report the update() stage.
+        """
+        self.timed(rc, 'update', self.histogram('device_update_seconds', 'Time spent in the controller update() called by the loop'),
+                   self.counter('frames_total', 'Controller updates that produced a frame'))
+        if rc not in drivers_of(rc):
+            # Wrappers run the gesture engine themselves on the loop thread
+            self.timed(rc, 'update_buttons', self.histogram('gesture_seconds', 'Time spent in the gesture engine'))
+        for driver in drivers_of(rc):
+            self.instrument_driver(driver)
+
+        def driver_sum(attr, parser=False):
+            def fn():
+                total = 0
+                for driver in drivers_of(rc):  # the live ones, after any reconnect
+                    source = getattr(driver, 'parser', None) if parser else driver
+                    total += getattr(source, attr, 0)
+                return total
+            return fn
+
+        self.collect('crc_errors_total', 'Frames dropped for a bad CRC', driver_sum('corrupt_frames', parser=True))
+        self.collect('dropped_bytes_total', 'Bytes discarded while resyncing the DUML stream', driver_sum('dropped_bytes', parser=True))
+        self.collect('poll_timeouts_total', 'Stick polls that got no reply', driver_sum('poll_timeouts'))
+
+    def instrument_keyboard(self, k_emu):
+        emit = self.histogram('key_emit_seconds', 'Time spent sending one key event to the OS')
+        events = self.counter('key_events_total', 'Key presses and releases sent')
+        for method in ('_press', '_release'):
+            self.timed(k_emu, method, emit)
+            original = getattr(k_emu, method)
+
+            def counted(key, _original=original):
+                events.value += 1
+                return _original(key)
+            setattr(k_emu, method, counted)
+
+    def instrument_loop(self, loop, scheduler):
+        self.timed(loop, 'tick', self.histogram('tick_seconds', 'Time spent in one control loop tick'))
+        self.timed(loop, 'map_frame', self.histogram('mapping_seconds', 'Time spent mapping a frame to keys, key emission included'))
+        self.collect('ticks_total', 'Control loop ticks', lambda: scheduler.ticks)
+        self.collect('overruns_total', 'Ticks that ended after the next deadline', lambda: scheduler.overruns)
+        self.collect('skipped_ticks_total', 'Deadlines dropped to realign after an overrun', lambda: scheduler.skipped)
+
+    # --- Export ---
+    def values(self):
+        """Flat {name: counter value} of every counter, own or collected."""
+        values = {name: c.value for name, c in self.counters.items()}
+        for name, (_, fn) in self._collected.items():
+            try:
+                values[name] = fn()
+            except Exception:
+                pass
+        return values
+
+    def prometheus(self):
+        lines = []
+        values = self.values()
+        helps = {name: c.help for name, c in self.counters.items()}
+        helps.update({name: help_text for name, (help_text, _) in self._collected.items()})
+        for name in sorted(values):
+            lines.append(f'# HELP {PREFIX}{name} {helps[name]}')
+            lines.append(f'# TYPE {PREFIX}{name} counter')
+            lines.append(f'{PREFIX}{name} {values[name]}')
+
+        for name, h in sorted(self.histograms.items()):
+            full = PREFIX + name
+            lines.append(f'# HELP {full} {h.help}')
+            lines.append(f'# TYPE {full} histogram')
+            cumulative = 0
+            for i, n in enumerate(h.counts[:-1]):
+                cumulative += n
+                lines.append(f'{full}_bucket{{le="{h.upper_bound(i):.6f}"}} {cumulative}')
+            lines.append(f'{full}_bucket{{le="+Inf"}} {h.count}')
+            lines.append(f'{full}_sum {h.sum:.9f}')
+            lines.append(f'{full}_count {h.count}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        return {
+            'uptime': time.perf_counter() - self.started,
+            'counters': self.values(),
+            'latency_us': {
+                name: {'count': h.count, 'mean': h.sum / h.count * 1e6 if h.count else 0.0,
+                       'p50': h.percentile(50) * 1e6, 'p99': h.percentile(99) * 1e6, 'max': h.max * 1e6}
+                for name, h in self.histograms.items()
+            },
+        }
+
+
+class MetricsServer:
+    """Serves GET /metrics in Prometheus text format on localhost."""
+    def __init__(self, metrics, port=9108, host='127.0.0.1'):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # only loaded with --metrics-port
+        self.metrics = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split('?')[0] != '/metrics':
+                    handler.send_error(404)
+                    return
+                body = metrics.prometheus().encode()
+                handler.send_response(200)
+                handler.send_header('Content-Type', 'text/plain; version=0.0.4')
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass  # no console output per scrape
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True)
+        self.thread.start()
+        print(f"Metrics at http://{host}:{self.server.server_port}/metrics")
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MetricsDumper:
+    """Appends a JSON line with counters, per-second rates and latencies every `interval` seconds."""
+    def __init__(self, metrics, path, interval=10.0):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._last = (time.perf_counter(), metrics.values())
+        self._stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='metrics-dump', daemon=True)
+        self.thread.start()
+
+    def dump(self):
+        now = time.perf_counter()
+        snapshot = self.metrics.snapshot()
+        last_time, last_values = self._last
+        elapsed = now - last_time
+        snapshot['rates'] = {name: (value - last_values.get(name, 0)) / elapsed
+                             for name, value in snapshot['counters'].items()} if elapsed > 0 else {}
+        snapshot['time'] = time.time()
+        self._last = (now, snapshot['counters'])
+        try:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(snapshot) + '\n')
+        except OSError as e:
+            print(f"Could not write metrics: {e}")
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.dump()
+
+    def close(self):
+        self._stop_event.set()
+        self.thread.join(1.0)
+        self.dump()
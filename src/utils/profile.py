@@ -0,0 +1,232 @@
+"""
+Mapping profiles: which stick drives which keys, what each button gesture
+does and what each switch position taps.
+
+A profile is a JSON (or TOML) file, compiled once at startup into flat
+tuples of channel numbers, key bits and attribute getters, so the control
+loop never looks up an enum or a dict per tick. See DEFAULT_PROFILE for
+the format; it is the behaviour of the original hand-written loop.
+"""
+import json
+from pynput.keyboard import Key
+from src.utils.gestures import KINDS, CHORD, pattern
+from src.utils.sequence import EASINGS, SequenceStep
+
+# Controller values a binding can read; the loop snapshots them in this order
+INPUTS = ('throttle', 'yaw', 'pitch', 'roll', 'tilt', 'sw1', 'sw2')
+INPUT_INDEX = {name: i for i, name in enumerate(INPUTS)}
+
+# Hold groups: which inputs a hold freezes
+HOLDS = {
+    'cruise': ('pitch', 'roll'),
+    'turn': ('yaw',),
+}
+
+# Button actions run by ControlLoop, in the phase they belong to:
+#   control - before the sequence update (may end the tick)
+#   hold    - only while no sequence is running
+CONTROL_ACTIONS = ('emergency_pause', 'toggle_sequence')
+HOLD_ACTIONS = ('toggle_hold', 'forward_cruise', 'free_cruise')
+
+# Sequence step key carrying the key to tap while the step runs
+SEQUENCE_TAP = 'tap'
+
+DEFAULT_PROFILE = {
+    'name': 'default',
+    'axes': [
+        {'input': 'pitch', 'keys': ['w', 's'], 'hold': 'cruise'},
+        {'input': 'roll', 'keys': ['d', 'a'], 'hold': 'cruise'},
+        {'input': 'yaw', 'keys': ['e', 'q'], 'hold': 'turn'},
+        {'input': 'throttle', 'keys': ['c', 'z']},
+        {'input': 'tilt', 'keys': ['down', 'up']},
+        # Extra camera yaw (fast phase) in wide mode
+        {'input': 'yaw', 'keys': ['right', 'left'], 'hold': 'turn', 'when': {'sw1': 1}},
+    ],
+    # Gestures: pressed, short_tap, long_press, maintained_long_press, double_tap,
+    # chord ('button': [1, 2]); 'with' makes a hold-combo
+    'buttons': [
+        {'button': 1, 'gesture': 'short_tap', 'action': 'emergency_pause'},
+        {'button': 3, 'gesture': 'long_press', 'action': 'toggle_sequence'},
+        {'button': 4, 'gesture': 'short_tap', 'action': 'toggle_hold'},
+        {'button': 4, 'gesture': 'short_tap', 'with': [1, 'maintained_long_press'], 'action': 'forward_cruise'},
+        {'button': 4, 'gesture': 'long_press', 'action': 'free_cruise'},
+        {'button': 2, 'gesture': 'short_tap', 'tap': 't'},
+        {'button': 3, 'gesture': 'short_tap', 'tap': 'f'},
+    ],
+    'switches': [
+        # Camera modes: wide, zoom, IR
+        {'switch': 'sw1', 'taps': {'1': '1', '0': '2', '-1': '3'}},
+    ],
+    # Steps may also ramp: 'ease': linear | ease_in | ease_out | ease_in_out,
+    # from the previous step's values or an explicit 'from': {...}
+    'sequence': [
+        {'duration': 3.0, 'axes': {'pitch': 1.0, 'yaw': 0.0}},  # Cross
+        {'duration': 0.1, 'tap': 'space'},                      # Wait
+        {'duration': 8.0, 'axes': {'pitch': 0.0, 'yaw': 1.0}},  # Turn 180
+    ],
+}
+
+
+class ProfileError(ValueError):
+    """Raised for a mapping profile that cannot be compiled."""
+    pass
+
+
+def load_profile(path):
+    """Reads a profile from a .json or .toml file."""
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            raise ProfileError("TOML profiles need Python 3.11+, use JSON instead")
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path) as f:
+            data = json.load(f)
+    data.setdefault('name', path)
+    return data
+
+
+def parse_key(name):
+    """'w' -> 'w', 'space' -> Key.space."""
+    if not isinstance(name, str):
+        raise ProfileError(f"key must be a name like 'w' or 'space', got {name!r}")
+    if len(name) == 1:
+        return name
+    key = getattr(Key, name, None)
+    if key is None:
+        raise ProfileError(f"unknown key '{name}'")
+    return key
+
+
+def _input(name):
+    if name not in INPUT_INDEX:
+        raise ProfileError(f"unknown input '{name}', expected one of {', '.join(INPUTS)}")
+    return INPUT_INDEX[name]
+
+
+def _buttons(buttons):
+    """1 or [1, 4] -> bit mask."""
+    mask = 0
+    for button in buttons if isinstance(buttons, list) else [buttons]:
+        if not isinstance(button, int) or not 1 <= button <= 4:
+            raise ProfileError(f"button must be 1-4, got {button}")
+        mask |= 1 << (button - 1)
+    return mask
+
+
+def _kind(gesture):
+    if gesture not in KINDS:
+        raise ProfileError(f"unknown gesture '{gesture}', expected one of {', '.join(KINDS)}")
+    return KINDS[gesture]
+
+
+def _pattern(binding):
+    """
+    {'button': 4, 'gesture': 'short_tap'}, chords as {'button': [1, 2], 'gesture': 'chord'},
+    hold-combos with 'with': [button(s), gesture] held at the same time.
+    """
+    kind = _kind(binding.get('gesture', 'short_tap'))
+    buttons = _buttons(binding.get('button'))
+    with_kind, with_buttons = KINDS['pressed'], 0
+    if 'with' in binding:
+        with_buttons = _buttons(binding['with'][0])
+        with_kind = _kind(binding['with'][1])
+        if with_kind == CHORD:
+            raise ProfileError(f"'with' cannot be a chord: {binding}")
+    return pattern(kind, buttons, with_kind, with_buttons)
+
+
+class CompiledProfile:
+    """
+    A profile bound to one KeyboardEmulator.
+
+    axes:      (input, channel, hold or None, when input or -1, when value)
+    patterns:  every button binding's gesture, for GestureEngine.match()
+    control:   (pattern bit, action)
+    holds:     (pattern bit, action)
+    taps:      (pattern bit, key)
+    switches:  (input, keys by position + 1)
+    channels:  every axis channel the profile drives
+    """
+    def __init__(self, data, k_emu):
+        self.name = data.get('name', 'unnamed')
+
+        axes = []
+        for binding in data.get('axes', []):
+            try:
+                pos_key, neg_key = (parse_key(k) for k in binding['keys'])
+            except (KeyError, TypeError, ValueError):
+                raise ProfileError(f"axis binding needs 'keys': [positive, negative]: {binding}")
+            hold = binding.get('hold')
+            if hold is not None and hold not in HOLDS:
+                raise ProfileError(f"unknown hold '{hold}', expected one of {', '.join(HOLDS)}")
+            if 'input' not in binding:
+                raise ProfileError(f"axis binding needs 'input': {binding}")
+            when_input, when_value = -1, 0
+            if 'when' in binding:
+                try:
+                    (name, when_value), = binding['when'].items()
+                except (AttributeError, ValueError):
+                    raise ProfileError(f"'when' must be one input and its value, e.g. {{'sw1': 1}}: {binding}")
+                when_input = _input(name)
+            axes.append((_input(binding['input']), k_emu.register_axis(pos_key, neg_key), hold, when_input, when_value))
+        self.axes = tuple(axes)
+        self.channels = tuple(sorted({axis[1] for axis in self.axes}))
+
+        patterns, control, holds, taps = [], [], [], []
+        for binding in data.get('buttons', []):
+            bit = 1 << len(patterns)
+            patterns.append(_pattern(binding))
+
+            if 'tap' in binding:
+                taps.append((bit, parse_key(binding['tap'])))
+                continue
+            action = binding.get('action')
+            if action in CONTROL_ACTIONS:
+                control.append((bit, action))
+            elif action in HOLD_ACTIONS:
+                holds.append((bit, action))
+            else:
+                raise ProfileError(f"button binding needs 'tap' or an action ({', '.join(CONTROL_ACTIONS + HOLD_ACTIONS)}): {binding}")
+        self.patterns = tuple(patterns)
+        self.control = tuple(control)
+        self.holds = tuple(holds)
+        self.taps = tuple(taps)
+
+        switches = []
+        for binding in data.get('switches', []):
+            if binding.get('switch') not in ('sw1', 'sw2'):
+                raise ProfileError(f"switch binding needs 'switch': sw1 or sw2: {binding}")
+            taps_by_pos = binding.get('taps', {})
+            keys = tuple(parse_key(taps_by_pos[str(pos)]) if str(pos) in taps_by_pos else None for pos in (-1, 0, 1))
+            switches.append((_input(binding['switch']), keys))
+        self.switches = tuple(switches)
+
+        self.sequence = [self._compile_step(step) for step in data.get('sequence', [])]
+
+    @staticmethod
+    def _compile_step(step):
+        axes_map = {_input(name): value for name, value in step.get('axes', {}).items()}
+        if 'tap' in step:
+            axes_map[SEQUENCE_TAP] = parse_key(step['tap'])
+        start_map = {_input(name): value for name, value in step.get('from', {}).items()}
+        ease = step.get('ease', 'hold')
+        if ease not in EASINGS:
+            raise ProfileError(f"unknown ease '{ease}', expected one of {', '.join(EASINGS)}")
+        duration = step.get('duration')
+        if isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration < 0:
+            raise ProfileError(f"sequence step needs 'duration' in seconds: {step}")
+        return SequenceStep(duration=duration, axes_map=axes_map, ease=ease, start_map=start_map)
+
+    def __str__(self):
+        return (f"{self.name}: {len(self.axes)} axes | {len(self.control) + len(self.holds) + len(self.taps)} buttons | "
+                f"{len(self.switches)} switches | {len(self.sequence)} sequence steps")
+
+
+def compile_profiles(paths, k_emu):
+    """Compiles each profile file, or DEFAULT_PROFILE when none is given."""
+    if not paths:
+        return [CompiledProfile(DEFAULT_PROFILE, k_emu)]
+    return [CompiledProfile(load_profile(path), k_emu) for path in paths]
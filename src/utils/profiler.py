@@ -0,0 +1,272 @@
+"""
+Built-in profiling for the control loop (main.py --profile).
+
+'sample' mode samples the loop thread's stack with sys._current_frames()
+from a helper thread and writes collapsed stacks on exit, one
+"frame;frame;... count" line per distinct stack, ready for flamegraph.pl
+or speedscope. 'cprofile' mode runs cProfile for the first `window`
+seconds of the loop and writes the same collapsed-stack format (counts
+in microseconds, rebuilt from cProfile's caller graph) plus the raw
+pstats dump next to it (.pstats).
+
+With slow_tick set, every tick is split into stages (device read,
+decode, gesture, mapping, key emission, ...) by the same method wrapping
+the metrics use. A tick longer than slow_tick is reported with its
+slowest stage, and in sample mode its stacks are filed under
+"slow tick [stage]" so the flamegraph shows what those ticks were doing.
+"""
+import os
+import sys
+import threading
+import time
+from src.utils.metrics import Metrics
+from src.utils.event_log import log
+
+# Leaf stages, and the parent stage whose leftover time they are carved from
+STAGE_PARENTS = {
+    'device_read_seconds': 'device_update_seconds',
+    'decode_seconds': 'device_update_seconds',
+    'gesture_seconds': 'device_update_seconds',
+    'key_emit_seconds': 'mapping_seconds',
+    'device_update_seconds': 'tick_seconds',
+    'mapping_seconds': 'tick_seconds',
+}
+
+
+class _StageClock:
+    """Histogram stand-in that sums one tick's time per stage."""
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+
+    def observe(self, seconds):
+        self.totals[self.name] = self.totals.get(self.name, 0.0) + seconds
+
+
+class StageMetrics(Metrics):
+    """Metrics whose histograms only accumulate the current tick's stage times."""
+    def __init__(self):
+        super().__init__()
+        self.totals = {}
+
+    def histogram(self, name, help_text):
+        if name not in self.histograms:
+            self.histograms[name] = _StageClock(self.totals, name)
+        return self.histograms[name]
+
+    def slowest_stage(self):
+        """Name of the stage that took the most time of its own this tick."""
+        own = dict(self.totals)
+        for stage, parent in STAGE_PARENTS.items():
+            if stage in self.totals and parent in own:
+                own[parent] -= self.totals[stage]
+        if not own:
+            return 'unknown'
+        name = max(own, key=own.get)
+        return {'tick_seconds': 'loop', 'device_update_seconds': 'device'}.get(name, name[:-len('_seconds')])
+
+
+def _frame_name(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _pstats_name(func):
+    filename, line, name = func
+    if filename == '~':
+        return name  # built-in, e.g. <built-in method time.sleep>
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def fold_pstats(stats, max_depth=64, min_time=1e-6):
+    """
+    Collapsed stacks from pstats.Stats(...).stats, as {stack: microseconds}.
+
+    cProfile only knows caller -> callee edges, so stacks are rebuilt from
+    the roots down: a function's own time is spread over the paths that
+    reach it in proportion to the time each caller spent in it. Recursive
+    calls are cut at the first repeat.
+    """
+    callees = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.items():
+        known = [caller for caller in callers if caller in stats]
+        if not known:
+            roots.append(func)
+        for caller in known:
+            callees.setdefault(caller, []).append((func, callers[caller][3]))
+
+    names = {func: _pstats_name(func) for func in stats}
+    folded = {}
+
+    def walk(func, path, on_path, inclusive):
+        total = stats[func][3]
+        share = inclusive / total if total else 0.0
+        own = stats[func][2] * share
+        if own >= min_time:
+            key = ';'.join(path)
+            folded[key] = folded.get(key, 0) + int(own * 1e6)
+        if len(path) >= max_depth:
+            return
+        for callee, time_in_callee in callees.get(func, ()):
+            child = time_in_callee * share
+            if child >= min_time and callee not in on_path:
+                on_path.add(callee)
+                path.append(names[callee])
+                walk(callee, path, on_path, child)
+                path.pop()
+                on_path.discard(callee)
+
+    for root in roots:
+        walk(root, [names[root]], {root}, stats[root][3])
+    return {key: count for key, count in folded.items() if count}
+
+
+def _write_folded(path, folded):
+    with open(path, 'w') as f:
+        for key, count in sorted(folded.items()):
+            f.write(f"{key} {count}\n")
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack every `interval` seconds into folded counts."""
+    def __init__(self, thread_id, interval=0.001):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.bucket = {}  # stacks of the current tick (or idle gap)
+        self.folded = {}  # everything filed so far
+        self.samples = 0
+        self._names = {}  # code object -> frame name
+        self._stop_event = threading.Event()
+
+    def run(self):
+        names = self._names
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                name = names.get(code)
+                if name is None:
+                    name = names[code] = _frame_name(code)
+                stack.append(name)
+                frame = frame.f_back
+            key = ';'.join(reversed(stack))
+            bucket = self.bucket
+            bucket[key] = bucket.get(key, 0) + 1
+            self.samples += 1
+
+    def file(self, prefix=None):
+        """Moves the current bucket into the totals, optionally under a root frame."""
+        bucket, self.bucket = self.bucket, {}
+        folded = self.folded
+        for key, count in bucket.items():
+            if prefix:
+                key = f"{prefix};{key}"
+            folded[key] = folded.get(key, 0) + count
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(1.0)
+        self.file()
+
+    def write(self, path):
+        _write_folded(path, self.folded)
+
+
+class LoopProfiler:
+    def __init__(self, mode='sample', out_path=None, interval=0.001, window=30.0, slow_tick=None):
+        """mode None: no stack profile, only the per-stage slow-tick report."""
+        if mode not in (None, 'sample', 'cprofile'):
+            raise ValueError("mode must be 'sample', 'cprofile' or None")
+        self.mode = mode
+        self.out_path = out_path or 'profile.folded'
+        self.stats_path = os.path.splitext(self.out_path)[0] + '.pstats'  # cprofile mode
+        self.interval = interval
+        self.window = window
+        self.slow_tick = slow_tick
+
+        self.stages = StageMetrics() if slow_tick else None
+        self.slow_ticks = 0
+        self.slow_by_stage = {}
+        self._last_stage = 'unknown'
+        self.sampler = None
+        self.cprofile = None
+        self._cprofile_until = 0.0
+
+    def attach(self, rc, k_emu, loop, scheduler):
+        """Wraps loop.tick (and, for slow-tick marking, the stage methods)."""
+        if self.stages:
+            self.stages.instrument_controller(rc)
+            self.stages.instrument_keyboard(k_emu)
+            self.stages.instrument_loop(loop, scheduler)
+
+        tick = loop.tick
+        clock = time.perf_counter
+
+        def profiled_tick():
+            sampler = self.sampler
+            if sampler:
+                sampler.file()  # samples since the last tick: the scheduler's wait
+            if self.stages:
+                self.stages.totals.clear()
+            start = clock()
+            try:
+                return tick()
+            finally:
+                end = clock()
+                slow = self.slow_tick and end - start > self.slow_tick
+                if slow:
+                    self._mark_slow(end - start)
+                if sampler:
+                    sampler.file(f"slow tick [{self._last_stage}]" if slow else None)
+                if self.cprofile and end > self._cprofile_until:
+                    self._stop_cprofile()
+
+        loop.tick = profiled_tick
+
+    def on_reconnect(self, rc):
+        if self.stages:
+            self.stages.instrument_driver(rc)
+
+    def _mark_slow(self, duration):
+        stage = self.stages.slowest_stage()
+        self._last_stage = stage
+        self.slow_ticks += 1
+        self.slow_by_stage[stage] = self.slow_by_stage.get(stage, 0) + 1
+        log.event('profile', "[PROFILE] Slow tick: {ms:.1f} ms, mostly {stage}", ms=duration * 1000, stage=stage)
+
+    def start(self):
+        """Call from the loop thread, right before the loop."""
+        if self.mode == 'sample':
+            self.sampler = StackSampler(threading.get_ident(), self.interval)
+            self.sampler.start()
+        elif self.mode == 'cprofile':
+            import cProfile  # only loaded for --profile cprofile
+            self.cprofile = cProfile.Profile()
+            self._cprofile_until = time.perf_counter() + self.window
+            self.cprofile.enable()
+
+    def _stop_cprofile(self):
+        import pstats
+        self.cprofile.disable()
+        stats = pstats.Stats(self.cprofile)
+        self.cprofile.dump_stats(self.stats_path)
+        _write_folded(self.out_path, fold_pstats(stats.stats))
+        print(f"[PROFILE] cProfile window done, collapsed stacks (us) in {self.out_path}, pstats in {self.stats_path}")
+        stats.sort_stats('cumulative').print_stats(15)
+        self.cprofile = None
+
+    def stop(self):
+        if self.sampler:
+            self.sampler.stop()
+            self.sampler.write(self.out_path)
+            print(f"[PROFILE] {self.sampler.samples} samples, collapsed stacks in {self.out_path}")
+            self.sampler = None
+        if self.cprofile:
+            self._stop_cprofile()
+        if self.slow_tick:
+            stages = ', '.join(f"{stage}: {n}" for stage, n in sorted(self.slow_by_stage.items(), key=lambda item: -item[1]))
+            print(f"[PROFILE] Slow ticks (> {self.slow_tick * 1000:.1f} ms): {self.slow_ticks}" + (f" | {stages}" if stages else ''))
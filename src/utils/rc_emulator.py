@@ -0,0 +1,383 @@
+"""
+Virtual DJI RC on a pseudo-terminal, for soak and load tests of the DUML
+drivers (Linux/macOS: needs os.openpty).
+
+The emulator answers what DJIRCN1/DJIM300 send: the simulator-enable
+frame gets an ack and every stick poll gets a stick packet with the
+current trajectory sample. With stream_rate it also pushes unsolicited
+stick packets at up to ~1 kHz. The link can be impaired: fixed latency,
+jitter, lost frames, lost bytes and corrupted frames.
+
+    python -m src.utils.rc_emulator --model N1 --trajectory random --stream-rate 1000 \\
+        --latency 2 --jitter 1 --byte-loss 0.001 --corrupt 0.001 --link /tmp/rc_n1
+    python main.py --model N1 --port /tmp/rc_n1
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import struct
+import threading
+import time
+import tty
+
+from src.remote_controller.duml import DumlStreamParser, build_frame, frame_seq
+from src.utils.scheduler import TickScheduler
+
+AXES = ('roll', 'pitch', 'throttle', 'yaw', 'tilt')
+
+# Stick packet payload size per model: N1 replies are exactly 38 bytes, M300 ones 77
+PAYLOAD_SIZES = {'N1': 25, 'M300': 64}
+DEVICE_ID = 0x06  # the RC's address in the requests (receiver byte)
+
+CMD_SET_SIMULATOR = 0x06
+CMD_STICKS = 0x01
+CMD_ENABLE = 0x24
+
+
+def encode_axis(value):
+    """-1.0..1.0 to the RC's 16-bit value (center 1024, 660 throw)."""
+    return struct.pack('<H', int(round(1024 + max(-1.0, min(1.0, value)) * 660)))
+
+
+# --- Trajectories: sample(t) -> [roll, pitch, throttle, yaw, tilt] at t seconds ---
+class ManualTrajectory:
+    """Axes set from code; changed_at is the perf_counter time of the last set_axes()."""
+    def __init__(self):
+        self.axes = [0.0] * len(AXES)
+        self.changed_at = None
+
+    def set_axes(self, **values):
+        axes = list(self.axes)
+        for name, value in values.items():
+            axes[AXES.index(name)] = value
+        self.axes = axes  # swapped in one go, the server thread never sees half an update
+        self.changed_at = time.perf_counter()
+
+    def sample(self, t):
+        return self.axes
+
+
+class SineTrajectory:
+    """Every axis a sine of `amplitude`, axis i with period period * (1 + i / 2)."""
+    def __init__(self, amplitude=1.0, period=4.0):
+        self.amplitude = amplitude
+        self.omegas = [2.0 * math.pi / (period * (1 + i / 2)) for i in range(len(AXES))]
+
+    def sample(self, t):
+        return [self.amplitude * math.sin(w * t) for w in self.omegas]
+
+
+class RandomTrajectory:
+    """
+    Random stick positions, each held for a random time, plus sensor noise.
+    Exercises dead-zone crossings, direction flips and idle stretches.
+    """
+    def __init__(self, seed=None, min_hold=0.05, max_hold=1.0, noise=0.01, idle=0.3):
+        self.random = random.Random(seed)
+        self.min_hold = min_hold
+        self.max_hold = max_hold
+        self.noise = noise
+        self.idle = idle  # chance a new target is centre stick
+        self.targets = [0.0] * len(AXES)
+        self.next_change = [0.0] * len(AXES)
+
+    def sample(self, t):
+        rnd = self.random
+        values = []
+        for i in range(len(AXES)):
+            if t >= self.next_change[i]:
+                self.targets[i] = 0.0 if rnd.random() < self.idle else rnd.uniform(-1.0, 1.0)
+                self.next_change[i] = t + rnd.uniform(self.min_hold, self.max_hold)
+            values.append(self.targets[i] + (rnd.gauss(0.0, self.noise) if self.noise else 0.0))
+        return values
+
+
+class ScriptedTrajectory:
+    """
+    Keyframes [[t, {axis: value, ...}], ...], linearly interpolated; axes
+    not named in a keyframe keep their previous value. Loops by default.
+    """
+    def __init__(self, keyframes, loop=True):
+        if not keyframes:
+            raise ValueError("a scripted trajectory needs at least one keyframe")
+        self.loop = loop
+        self.times = []
+        self.values = []
+        current = [0.0] * len(AXES)
+        for t, axes in sorted(keyframes, key=lambda k: k[0]):
+            for name, value in axes.items():
+                current[AXES.index(name)] = float(value)
+            self.times.append(float(t))
+            self.values.append(list(current))
+        self.duration = self.times[-1]
+
+    @classmethod
+    def load(cls, path, loop=True):
+        with open(path) as f:
+            return cls(json.load(f), loop)
+
+    def sample(self, t):
+        times = self.times
+        if self.loop and self.duration > 0:
+            t %= self.duration
+        if t <= times[0]:
+            return self.values[0]
+        if t >= times[-1]:
+            return self.values[-1]
+        i = 1
+        while times[i] < t:
+            i += 1
+        f = (t - times[i - 1]) / (times[i] - times[i - 1])
+        a, b = self.values[i - 1], self.values[i]
+        return [x + (y - x) * f for x, y in zip(a, b)]
+
+
+TRAJECTORIES = {
+    'still': ManualTrajectory,
+    'sine': SineTrajectory,
+    'random': RandomTrajectory,
+}
+
+
+class RCEmulator:
+    """
+    One virtual RC. `port` is the pty to open with the driver.
+
+    latency/jitter are seconds (jitter: uniform 0..jitter extra per frame,
+    frames still leave in order, as on a serial link). drop, byte_loss and
+    corrupt are per-frame probabilities: the whole frame is lost, one byte
+    of it is lost, or one bit of it is flipped.
+    """
+    def __init__(self, model='N1', trajectory=None, stream_rate=0.0, latency=0.0, jitter=0.0,
+                 drop=0.0, byte_loss=0.0, corrupt=0.0, require_enable=False, seed=None):
+        if model not in PAYLOAD_SIZES:
+            raise ValueError(f"model must be one of {', '.join(PAYLOAD_SIZES)}")
+        self.model = model
+        self.payload_size = PAYLOAD_SIZES[model]
+        self.trajectory = trajectory or ManualTrajectory()
+        self.stream_rate = stream_rate
+        self.latency = latency
+        self.jitter = jitter
+        self.drop = drop
+        self.byte_loss = byte_loss
+        self.corrupt = corrupt
+        self.require_enable = require_enable
+        self.random = random.Random(seed)
+
+        self._master, slave = os.openpty()
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        self._slave = slave  # kept open so the pty survives the driver closing it
+
+        # --- Counters ---
+        self.polls = 0
+        self.enables = 0
+        self.enabled = False
+        self.sent = 0
+        self.dropped = 0
+        self.bytes_lost = 0
+        self.corrupted = 0
+        self.stream_seq = 0
+        self.streamed = 0
+
+        self.start_time = time.perf_counter()
+        self._client = None           # sender id of the last request, replies go back to it
+        self._write_lock = threading.Lock()
+        self._queue = []              # (send_at, order, frame) when latency/jitter is set
+        self._queue_order = 0
+        self._last_send_at = 0.0
+        self._queue_ready = threading.Condition()
+        self._running = True
+
+        self._threads = [threading.Thread(target=self._serve, name='rc-emulator', daemon=True)]
+        if stream_rate:
+            self._threads.append(threading.Thread(target=self._stream, name='rc-emulator-stream', daemon=True))
+        if latency or jitter:
+            self._threads.append(threading.Thread(target=self._deliver, name='rc-emulator-link', daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    # --- Frames ---
+    def stick_packet(self, receiver, seq, now=None):
+        t = (time.perf_counter() if now is None else now) - self.start_time
+        payload = bytearray(self.payload_size)
+        for i, value in enumerate(self.trajectory.sample(t)):
+            # axis i lives at frame offset 13 + 3 * i, the payload starts at 11
+            payload[2 + 3 * i:4 + 3 * i] = encode_axis(value)
+        return build_frame(DEVICE_ID, receiver, seq, 0x80, CMD_SET_SIMULATOR, CMD_STICKS, bytes(payload))
+
+    def _impair(self, frame):
+        """Applies drop/byte loss/corruption; None if the frame is lost."""
+        rnd = self.random
+        if self.drop and rnd.random() < self.drop:
+            self.dropped += 1
+            return None
+        if self.byte_loss and rnd.random() < self.byte_loss:
+            i = rnd.randrange(len(frame))
+            frame = frame[:i] + frame[i + 1:]
+            self.bytes_lost += 1
+        if self.corrupt and rnd.random() < self.corrupt:
+            data = bytearray(frame)
+            data[rnd.randrange(len(data))] ^= 1 << rnd.randrange(8)
+            frame = bytes(data)
+            self.corrupted += 1
+        return frame
+
+    def send(self, frame):
+        frame = self._impair(frame)
+        if frame is None:
+            return
+        if not (self.latency or self.jitter):
+            self._write(frame)
+            return
+        with self._queue_ready:
+            send_at = time.perf_counter() + self.latency + (self.random.uniform(0.0, self.jitter) if self.jitter else 0.0)
+            send_at = max(send_at, self._last_send_at)  # a serial link doesn't reorder
+            self._last_send_at = send_at
+            self._queue_order += 1
+            heapq.heappush(self._queue, (send_at, self._queue_order, frame))
+            self._queue_ready.notify()
+
+    def _write(self, frame):
+        with self._write_lock:
+            try:
+                os.write(self._master, frame)
+                self.sent += 1
+            except OSError:
+                pass
+
+    # --- Threads ---
+    def _serve(self):
+        # The drivers' hard-coded enable frames don't carry a valid CRC16; the RC takes them anyway
+        parser = DumlStreamParser(check_crc16=False)
+        while self._running:
+            try:
+                data = os.read(self._master, 4096)
+            except OSError:
+                return
+            parser.feed(data)
+            for request in parser.frames_available():
+                if request[9] != CMD_SET_SIMULATOR:
+                    continue
+                sender, seq = request[4], frame_seq(request)
+                self._client = sender
+                if request[10] == CMD_ENABLE:
+                    self.enables += 1
+                    self.enabled = True
+                    self.send(build_frame(DEVICE_ID, sender, seq, 0x80, CMD_SET_SIMULATOR, CMD_ENABLE, b'\x00'))
+                elif request[10] == CMD_STICKS:
+                    self.polls += 1
+                    if self.enabled or not self.require_enable:
+                        self.send(self.stick_packet(sender, seq))
+
+    def _stream(self):
+        scheduler = TickScheduler(rate=self.stream_rate, spin=min(0.0005, 0.5 / self.stream_rate))
+        scheduler.reset()
+        while self._running:
+            now = scheduler.wait()
+            client = self._client
+            if client is None or (self.require_enable and not self.enabled):
+                continue  # nobody has talked to us yet
+            self.stream_seq = (self.stream_seq + 1) & 0xFFFF
+            self.send(self.stick_packet(client, self.stream_seq, now))
+            self.streamed += 1
+
+    def _deliver(self):
+        queue = self._queue
+        while self._running:
+            with self._queue_ready:
+                while self._running and not queue:
+                    self._queue_ready.wait(0.1)
+                if not queue:
+                    continue
+                send_at = queue[0][0]
+                delay = send_at - time.perf_counter()
+                if delay > 0:
+                    self._queue_ready.wait(delay)  # a new frame can't be due earlier than this one
+                    continue
+                frame = heapq.heappop(queue)[2]
+            self._write(frame)
+
+    def close(self):
+        self._running = False
+        with self._queue_ready:
+            self._queue_ready.notify_all()
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        for thread in self._threads[1:]:
+            thread.join(0.5)  # the reader may sit in os.read() until the process ends; it's a daemon
+
+    def __str__(self):
+        text = f"polls: {self.polls} | sent: {self.sent}"
+        if self.stream_rate:
+            text += f" | streamed: {self.streamed}"
+        if self.drop or self.byte_loss or self.corrupt:
+            text += f" | dropped: {self.dropped} | bytes lost: {self.bytes_lost} | corrupted: {self.corrupted}"
+        return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Virtual DJI N1/M300 on a pseudo-terminal, for driver soak tests")
+    parser.add_argument('--model', choices=list(PAYLOAD_SIZES), default='N1')
+    parser.add_argument('--trajectory', choices=list(TRAJECTORIES) + ['script'], default='random',
+                        help='Stick motion (default: random)')
+    parser.add_argument('--script', default=None, help='Keyframe JSON for --trajectory script: [[t, {"pitch": 1.0}], ...]')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for the random trajectory and the impairments')
+    parser.add_argument('--stream-rate', type=float, default=0.0, help='Also push stick packets at N Hz, up to ~1000 (default: off)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Milliseconds added to every frame')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Up to N random milliseconds more per frame')
+    parser.add_argument('--drop', type=float, default=0.0, help='Probability that a frame is lost')
+    parser.add_argument('--byte-loss', type=float, default=0.0, help='Probability that a frame loses one byte')
+    parser.add_argument('--corrupt', type=float, default=0.0, help='Probability that a frame gets one bit flipped')
+    parser.add_argument('--require-enable', action='store_true', help='Ignore stick polls until the simulator-enable frame')
+    parser.add_argument('--link', default=None, help='Also expose the pty under this path (symlink)')
+    parser.add_argument('--duration', type=float, default=None, help='Stop after N seconds (default: until Ctrl+C)')
+    parser.add_argument('--stats', type=float, default=10.0, help='Seconds between statistics lines (default: 10)')
+    args = parser.parse_args()
+
+    if args.trajectory == 'script':
+        if not args.script:
+            parser.error('--trajectory script requires --script FILE')
+        trajectory = ScriptedTrajectory.load(args.script)
+    elif args.trajectory == 'random':
+        trajectory = RandomTrajectory(seed=args.seed)
+    else:
+        trajectory = TRAJECTORIES[args.trajectory]()
+
+    emulator = RCEmulator(args.model, trajectory, stream_rate=args.stream_rate,
+                          latency=args.latency / 1000.0, jitter=args.jitter / 1000.0,
+                          drop=args.drop, byte_loss=args.byte_loss, corrupt=args.corrupt,
+                          require_enable=args.require_enable, seed=args.seed)
+    port = emulator.port
+    if args.link:
+        if os.path.islink(args.link):
+            os.remove(args.link)
+        os.symlink(emulator.port, args.link)
+        port = args.link
+    print(f"Virtual {args.model} on {port} ({args.trajectory} sticks). Press Ctrl+C to stop.")
+
+    end = time.perf_counter() + args.duration if args.duration else None
+    try:
+        while True:
+            wait = args.stats if end is None else min(args.stats, end - time.perf_counter())
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            print(emulator)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.close()
+        if args.link and os.path.islink(args.link):
+            os.remove(args.link)
+        print(f"Done. {emulator}")
+
+
+if __name__ == '__main__':
+    main()
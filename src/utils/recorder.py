@@ -0,0 +1,56 @@
+import struct
+import time
+
+# Log layout:
+#   header: MAGIC (8 bytes) + model name (16 bytes, NUL padded)
+#   records, back to back: RECORD_HEADER (timestamp ns, kind, length) + payload
+MAGIC = b'DJIREC1\x00'
+HEADER = struct.Struct('<8s16s')
+RECORD_HEADER = struct.Struct('<QBH')
+
+KIND_DUML = 1   # raw DUML frame as received from N1/M300
+KIND_STATE = 2  # axis/switch/button vector (RC3 and other HID devices)
+
+# roll, pitch, throttle, yaw, tilt (before deadzone), sw1, sw2, button bits
+STATE = struct.Struct('<5fbbB')
+
+
+class FrameRecorder:
+    """
+    Append-only binary log of every raw frame a controller produces.
+
+    Records are timestamped with a monotonic clock relative to the start of
+    the recording and go through a large write buffer, so the control loop
+    only pays for a memcpy per frame.
+    """
+    def __init__(self, path, model, buffer_size=1 << 16):
+        self.path = path
+        self.model = model
+        self.frames = 0
+        self._file = open(path, 'wb', buffering=buffer_size)
+        self._file.write(HEADER.pack(MAGIC, model.encode('ascii')[:16]))
+        self._start_ns = time.perf_counter_ns()
+        self._pack_header = RECORD_HEADER.pack
+
+    def write(self, kind, data):
+        self._file.write(self._pack_header(time.perf_counter_ns() - self._start_ns, kind, len(data)))
+        self._file.write(data)
+        self.frames += 1
+
+    def write_state(self, roll, pitch, throttle, yaw, tilt, sw1, sw2, buttons):
+        self.write(KIND_STATE, STATE.pack(roll, pitch, throttle, yaw, tilt, sw1, sw2, buttons))
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            print(f"Recorded {self.frames} frames to {self.path}")
+
+
+def read_header(buf):
+    """Returns the model name stored in a recording, or raises ValueError."""
+    if len(buf) < HEADER.size:
+        raise ValueError("recording is too short")
+    magic, model = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("not a controller recording")
+    return model.rstrip(b'\x00').decode('ascii')
@@ -0,0 +1,97 @@
+import time
+from src.utils.event_log import log
+
+class TickScheduler:
+    """
+    Fixed-rate loop pacing on absolute perf_counter deadlines.
+
+    Every tick's deadline is start + n * period, so time spent inside the
+    tick never accumulates into drift. With spin > 0 the last `spin` seconds
+    before a deadline are busy-waited instead of slept, trading CPU for a
+    tighter wake-up than the OS timer gives.
+
+    When a tick runs past the next deadline the missed ticks are dropped and
+    the schedule realigns to the grid. on_overrun='report' also prints them.
+
+    An optional waiter(timeout) -> bool replaces the sleep (e.g. the
+    controller's wait_for_input). If it returns True the tick runs right
+    away; the deadline it woke before stays pending for the next wait().
+    """
+    def __init__(self, rate=100.0, spin=0.0, on_overrun='skip', waiter=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if on_overrun not in ('skip', 'report'):
+            raise ValueError("on_overrun must be 'skip' or 'report'")
+
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.spin = spin
+        self.on_overrun = on_overrun
+        self.waiter = waiter
+
+        self.ticks = 0
+        self.overruns = 0       # ticks that ended after the next deadline
+        self.skipped = 0        # deadlines dropped to realign
+        self.max_lateness = 0.0
+        self.early_wakes = 0    # ticks started by the waiter before their deadline
+
+        self.reset()
+
+    def reset(self):
+        """Restarts the grid from now (e.g. after a deliberate pause)."""
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time
+        self._woke_early = False
+        self._window_start = self.start_time
+        self._window_ticks = 0
+        self.actual_rate = 0.0
+
+    def wait(self):
+        """Blocks until the next tick is due. Returns the tick's deadline."""
+        if not self._woke_early:
+            self.deadline += self.period
+        self._woke_early = False
+        now = time.perf_counter()
+
+        late = now - self.deadline
+        if late > 0:
+            missed = int(late / self.period) + 1
+            self.overruns += 1
+            self.skipped += missed - 1
+            self.max_lateness = max(self.max_lateness, late)
+            if self.on_overrun == 'report':
+                log.event('scheduler', "[SCHEDULER] Overrun: {late_ms:.1f} ms late, skipped {skipped} tick(s)", late_ms=late * 1000, skipped=missed - 1)
+            # Realign to the last grid point instead of bursting to catch up
+            self.deadline += (missed - 1) * self.period
+        else:
+            remaining = -late
+            if self.waiter is not None:
+                while remaining > self.spin:
+                    if self.waiter(remaining - self.spin):
+                        self.early_wakes += 1
+                        self._woke_early = True
+                        self._count_tick()
+                        return time.perf_counter()
+                    remaining = self.deadline - time.perf_counter()
+            elif remaining > self.spin:
+                time.sleep(remaining - self.spin)
+            deadline = self.deadline
+            while time.perf_counter() < deadline:
+                pass
+
+        self._count_tick()
+        return self.deadline
+
+    def _count_tick(self):
+        self.ticks += 1
+        self._window_ticks += 1
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.actual_rate = self._window_ticks / elapsed
+            self._window_start = now
+            self._window_ticks = 0
+
+    def __str__(self):
+        return (f"target: {self.rate:.0f} Hz | actual: {self.actual_rate:.1f} Hz | ticks: {self.ticks} | "
+                f"overruns: {self.overruns} | skipped: {self.skipped} | early: {self.early_wakes} | max late: {self.max_lateness * 1000:.1f} ms")
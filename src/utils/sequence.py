@@ -1,63 +1,172 @@
 import time
+from src.utils.event_log import log
+
+# Easing curves: progress 0..1 through a step -> fraction of the way to the target
+EASINGS = {
+    'hold': None,                              # jump to the target (constant)
+    'linear': lambda t: t,
+    'ease_in': lambda t: t * t,
+    'ease_out': lambda t: t * (2.0 - t),
+    'ease_in_out': lambda t: t * t * (3.0 - 2.0 * t),
+}
 
 class SequenceStep:
-    def __init__(self, duration, axes_map):
+    def __init__(self, duration, axes_map, ease='hold', start_map=None):
         """
         duration: Seconds to run this step
-        axes_map: Dict, e.g., {KbAxis.PITCH: 0.5, KbAxis.YAW: 0.2}
+        axes_map: Dict of overrides by input index, e.g., {INPUT_INDEX['pitch']: 0.5}
+        ease:     'hold' keeps axes_map constant; any other EASINGS curve ramps
+                  each numeric value from start_map (default: the previous
+                  step's value, else 0.0) to axes_map over the step
         """
+        if ease not in EASINGS:
+            raise ValueError(f"unknown ease '{ease}', expected one of {', '.join(EASINGS)}")
         self.duration = duration
         self.axes_map = axes_map
+        self.ease = ease
+        self.start_map = start_map or {}
+
+
+def _is_ramped(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class Timeline:
+    """
+    One running sequence.
+
+    Every step boundary is computed from the start time once, so a late
+    tick never pushes the following steps back. The cursor only moves
+    forward, which makes the per-tick step lookup amortized O(1).
+    """
+    def __init__(self, steps, start_time, name=''):
+        self.steps = steps
+        self.name = name
+        self.start_time = start_time
+        self.index = 0
+        self.entered = False  # the last sample() was the first one in its step
+        self._sampled = -1    # step of the last sample()
+
+        self.ends = []
+        self._ramps = []  # per step: (static values, ((key, start, delta), ...), easing) or None
+        end = start_time
+        previous = {}
+        for step in steps:
+            end += step.duration
+            self.ends.append(end)
+
+            ease = EASINGS[step.ease]
+            if ease is None or step.duration <= 0:
+                self._ramps.append(None)
+            else:
+                static = {k: v for k, v in step.axes_map.items() if not _is_ramped(v)}
+                ramps = tuple((k, start, v - start) for k, v in step.axes_map.items() if _is_ramped(v)
+                              for start in (step.start_map.get(k, previous.get(k, 0.0)),))
+                self._ramps.append((static, ramps, ease))
+            previous = step.axes_map
+
+    @property
+    def end_time(self):
+        return self.ends[-1] if self.ends else self.start_time
+
+    def sample(self, now):
+        """Returns the overrides at `now`, or None once the sequence has ended."""
+        ends = self.ends
+        i = self.index
+        n = len(ends)
+        while i < n and now >= ends[i]:
+            i += 1
+        if i != self.index:
+            self.index = i
+            if i < n:
+                log.event('sequence', ">>> STEP {step}/{steps}", step=i + 1, steps=n)
+        if i >= n:
+            return None
+        self.entered = i != self._sampled
+        self._sampled = i
+
+        step = self.steps[i]
+        ramp = self._ramps[i]
+        if ramp is None:
+            return step.axes_map
+
+        static, ramps, ease = ramp
+        f = ease((now - (ends[i] - step.duration)) / step.duration)
+        values = dict(static)
+        for key, start, delta in ramps:
+            values[key] = start + delta * f
+        return values
+
 
 class SequenceHandler:
+    """
+    Runs sequences on time.perf_counter() (monotonic).
+
+    Several sequences can run at once on numbered layers; where they set
+    the same value the higher layer wins.
+    """
     def __init__(self):
-        self.steps = []
-        self.active = False
-        self.current_step_idx = 0
-        self.step_start_time = 0
+        self.layers = {}  # layer -> Timeline
+        self._order = ()  # layers, lowest first
+        # Values of the steps entered by the last update() (for one-shot
+        # actions such as taps), merged like the overrides
+        self.entered = {}
 
-    def start_sequence(self, steps_list):
+    @property
+    def active(self):
+        return bool(self.layers)
+
+    def start_sequence(self, steps_list, layer=0, name='', start_time=None):
         if not steps_list:
             return
-        self.steps = steps_list
-        self.current_step_idx = 0
-        self.step_start_time = time.time()
-        self.active = True
-        print(f">>> SEQUENCE STARTED: {len(self.steps)} steps loaded.")
-
-    def stop(self):
-        if self.active:
-            print(">>> SEQUENCE TERMINATED <<<")
-        self.active = False
-        self.steps = []
-
-    def update(self):
+        if start_time is None:
+            start_time = time.perf_counter()
+        self.layers[layer] = Timeline(steps_list, start_time, name)
+        self._order = tuple(sorted(self.layers))
+        log.event('sequence', ">>> SEQUENCE STARTED: {steps} steps loaded.", steps=len(steps_list))
+
+    def stop(self, layer=None):
+        """Stops one layer, or every sequence."""
+        if layer is None:
+            if self.layers:
+                log.event('sequence', ">>> SEQUENCE TERMINATED <<<")
+            self.layers.clear()
+            self.entered = {}
+        elif self.layers.pop(layer, None) is not None:
+            log.event('sequence', ">>> SEQUENCE TERMINATED <<<")
+        self._order = tuple(sorted(self.layers))
+
+    def update(self, now=None):
         """
         Returns: (axes_to_override_dict, is_running)
         """
-        # 1. Check if we are active and within bounds
-        if not self.active or self.current_step_idx >= len(self.steps):
-            if self.active: # If we were active but just hit the end
-                print(">>> SEQUENCE FINISHED <<<")
-                self.active = False
+        if not self.layers:
+            self.entered = {}
             return {}, False
+        if now is None:
+            now = time.perf_counter()
 
-        current_step = self.steps[self.current_step_idx]
-        elapsed = time.time() - self.step_start_time
-
-        # 2. Check if current step is finished
-        if elapsed >= current_step.duration:
-            self.current_step_idx += 1
-            self.step_start_time = time.time()
-            
-            # Check if there's actually another step coming
-            if self.current_step_idx < len(self.steps):
-                print(f">>> STEP {self.current_step_idx + 1}/{len(self.steps)}")
-                # Recurse to immediately start the next step's logic
-                return self.update()
+        overrides = None
+        entered = None
+        finished = False
+        for layer in self._order:
+            timeline = self.layers[layer]
+            values = timeline.sample(now)
+            if values is None:
+                log.event('sequence', ">>> SEQUENCE FINISHED <<<")
+                del self.layers[layer]
+                finished = True
+                continue
+            if overrides is None:
+                overrides = values
             else:
-                print(">>> SEQUENCE FINISHED <<<")
-                self.active = False
-                return {}, False
+                overrides = {**overrides, **values}  # higher layer wins
+            if timeline.entered:
+                entered = values if entered is None else {**entered, **values}
+        self.entered = entered or {}
+        if finished:
+            self._order = tuple(sorted(self.layers))
 
-        return current_step.axes_map, True
\ No newline at end of file
+        if overrides is None:
+            return {}, False
+        return overrides, True
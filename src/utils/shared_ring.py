@@ -0,0 +1,118 @@
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+MAGIC = 0x52434452  # 'RDCR'
+
+# magic, version, slot size, slot count, writer state, total frames written
+RING_HEADER = struct.Struct('<IHHIIQ')
+SLOT_SEQ = struct.Struct('<Q')
+
+
+def _untrack(shm):
+    """
+    Before Python 3.13 attaching to a segment registers it with the resource
+    tracker, so an unrelated reader process would unlink it (and warn) when
+    it exits. Child processes share their parent's tracker and don't need this.
+    """
+    try:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+class SharedFrameRing:
+    """
+    Fixed-size frame ring in multiprocessing.shared_memory.
+
+    One writer, any number of readers, no locks and no pickling: frames are
+    packed with a struct.Struct. Each slot is guarded by its own sequence
+    counter (odd while being written), so a reader that races the writer
+    notices and retries instead of returning a torn frame.
+    """
+    VERSION = 1
+
+    def __init__(self, frame_struct, slots=64, name=None, create=False, track=True, replace=False):
+        self.frame_struct = frame_struct
+        self.slot_size = SLOT_SEQ.size + frame_struct.size
+        self.slots = slots
+
+        size = RING_HEADER.size + slots * self.slot_size
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        except FileExistsError:
+            if not (create and replace):
+                raise
+            # replace: a segment left behind by a killed writer is unlinked and made afresh
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self.shm.name
+        self.owner = create
+        self.buf = self.shm.buf
+
+        if create:
+            RING_HEADER.pack_into(self.buf, 0, MAGIC, self.VERSION, self.slot_size, slots, 0, 0)
+        else:
+            if not track:
+                _untrack(self.shm)
+            magic, version, slot_size, slots, _, _ = RING_HEADER.unpack_from(self.buf, 0)
+            if magic != MAGIC or version != self.VERSION or slot_size != self.slot_size:
+                raise ValueError(f"shared memory '{name}' is not a compatible frame ring")
+            self.slots = slots
+
+    # --- Header fields ---
+    _STATE_OFFSET = 12
+    _COUNT_OFFSET = 16
+
+    @property
+    def count(self):
+        return struct.unpack_from('<Q', self.buf, self._COUNT_OFFSET)[0]
+
+    @property
+    def state(self):
+        """Free-form writer status word (see process_reader for its values)."""
+        return struct.unpack_from('<I', self.buf, self._STATE_OFFSET)[0]
+
+    @state.setter
+    def state(self, value):
+        struct.pack_into('<I', self.buf, self._STATE_OFFSET, value)
+
+    def _slot_offset(self, count):
+        return RING_HEADER.size + (count % self.slots) * self.slot_size
+
+    def publish(self, *values):
+        count = self.count
+        offset = self._slot_offset(count)
+        SLOT_SEQ.pack_into(self.buf, offset, 2 * count + 1)
+        self.frame_struct.pack_into(self.buf, offset + SLOT_SEQ.size, *values)
+        SLOT_SEQ.pack_into(self.buf, offset, 2 * count + 2)
+        struct.pack_into('<Q', self.buf, self._COUNT_OFFSET, count + 1)
+
+    def read(self, count, retries=8):
+        """Returns frame number `count` (0-based), or None if it was overwritten."""
+        offset = self._slot_offset(count)
+        expected = 2 * count + 2
+        for _ in range(retries):
+            if SLOT_SEQ.unpack_from(self.buf, offset)[0] != expected:
+                return None
+            values = self.frame_struct.unpack_from(self.buf, offset + SLOT_SEQ.size)
+            if SLOT_SEQ.unpack_from(self.buf, offset)[0] == expected:
+                return values
+        return None
+
+    def latest(self):
+        """Returns (frame count, values) for the newest frame, or None."""
+        count = self.count
+        while count:
+            values = self.read(count - 1)
+            if values is not None:
+                return count, values
+            count = self.count  # writer lapped us mid-read
+        return None
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,128 @@
+"""
+Live controller state in shared memory for local observers (HUD overlay,
+health monitor, ...).
+
+The control loop publishes one snapshot per decoded frame into a
+SharedFrameRing; readers in other processes poll it at their own rate
+with StateReader, without sockets and without the loop ever waiting on
+them (a reader that races the writer retries, see SharedFrameRing).
+
+    python -m src.utils.state_publisher --name dji_rc_state --rate 10
+"""
+import argparse
+import struct
+import time
+from collections import namedtuple
+from src.utils.shared_ring import SharedFrameRing
+from src.utils.gestures import PRESSED, SHORT_TAP, LONG_PRESS, MAINTAINED_LONG_PRESS, DOUBLE_TAP
+
+DEFAULT_NAME = 'dji_rc_state'
+
+# Bumped whenever the snapshot layout changes; readers refuse other versions
+STATE_VERSION = 1
+
+# version (u16), mode flags (u16), profile index (u8), sw1, sw2 (i8),
+# perf_counter and wall time of the frame (f64), throttle, yaw, pitch, roll, tilt (f32),
+# button bits per gesture kind (u32): pressed, short tap, long press, maintained long press, double tap
+SNAPSHOT = struct.Struct('<HHBbbdd5f5I')
+
+# Mode flags
+CONNECTED = 1 << 0
+HOLD_CRUISE = 1 << 1
+HOLD_TURN = 1 << 2
+SEQUENCE = 1 << 3
+PAUSED = 1 << 4
+
+GESTURE_KINDS = (PRESSED, SHORT_TAP, LONG_PRESS, MAINTAINED_LONG_PRESS, DOUBLE_TAP)
+
+State = namedtuple('State', 'frame version flags profile sw1 sw2 timestamp wall_time '
+                            'throttle yaw pitch roll tilt '
+                            'pressed short_tap long_press maintained_long_press double_tap')
+
+
+class StatePublisher:
+    """
+    Writer side: owns the segment and unlinks it on close(). publish()
+    packs straight into the ring, so it costs one struct pack per frame.
+    reclaim=True replaces a segment of that name left behind by a killed run.
+    """
+    def __init__(self, name=DEFAULT_NAME, slots=16, reclaim=False):
+        self.ring = SharedFrameRing(SNAPSHOT, slots=slots, name=name, create=True, replace=reclaim)
+        self.name = self.ring.name
+        self.published = 0
+
+    def publish(self, loop, connected=True):
+        """Snapshot of the loop's controller and modes, timestamped now."""
+        rc = loop.rc
+        masks = rc.gestures.masks
+        flags = CONNECTED if connected else 0
+        if loop.hold_cruise: flags |= HOLD_CRUISE
+        if loop.hold_turn: flags |= HOLD_TURN
+        if loop.seq_running: flags |= SEQUENCE
+        if loop.paused_until: flags |= PAUSED
+
+        self.ring.publish(STATE_VERSION, flags, loop.profiles.index(loop.profile), rc.sw1, rc.sw2,
+                          time.perf_counter(), time.time(),
+                          rc.throttle, rc.yaw, rc.pitch, rc.roll, rc.tilt,
+                          *[masks[kind] for kind in GESTURE_KINDS])
+        self.published += 1
+
+    def close(self):
+        self.ring.close()
+
+
+class StateReader:
+    """
+    Reader side, from any local process. Doesn't register the segment with
+    the resource tracker, so exiting never removes it from under the writer.
+    """
+    def __init__(self, name=DEFAULT_NAME):
+        self.ring = SharedFrameRing(SNAPSHOT, name=name, track=False)
+
+    def read(self):
+        """The newest State, or None if nothing was published yet."""
+        latest = self.ring.latest()
+        if latest is None:
+            return None
+        count, values = latest
+        if values[0] != STATE_VERSION:
+            raise ValueError(f"state layout version {values[0]}, this reader understands {STATE_VERSION}")
+        return State(count, *values)
+
+    def close(self):
+        self.ring.close()
+
+
+def format_state(state):
+    modes = [name for bit, name in ((HOLD_CRUISE, 'cruise'), (HOLD_TURN, 'turn'),
+                                    (SEQUENCE, 'sequence'), (PAUSED, 'paused')) if state.flags & bit]
+    age = (time.perf_counter() - state.timestamp) * 1000
+    return (f"#{state.frame} {'' if state.flags & CONNECTED else 'DISCONNECTED '}"
+            f"T: {state.throttle: .2f} | Y: {state.yaw: .2f} | P: {state.pitch: .2f} | R: {state.roll: .2f} | "
+            f"Tilt: {state.tilt: .2f} | SW1: {state.sw1} SW2: {state.sw2} | buttons: {state.pressed:04b} | "
+            f"profile {state.profile} | {' '.join(modes) or '-'} | {age:.1f} ms old")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prints the state published by main.py --publish-state")
+    parser.add_argument('--name', type=str, default=DEFAULT_NAME, help=f'Segment name (default: {DEFAULT_NAME})')
+    parser.add_argument('--rate', type=float, default=10.0, help='Reads per second (default: 10)')
+    args = parser.parse_args()
+
+    reader = StateReader(args.name)
+    last = None
+    try:
+        while True:
+            state = reader.read()
+            if state is not None and state.frame != last:
+                print(format_state(state))
+                last = state.frame
+            time.sleep(1.0 / args.rate)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
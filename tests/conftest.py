@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import the code the way main.py does (from src.x import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pygame (RC3) never needs a window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+pytest.importorskip('pynput.keyboard', exc_type=ImportError)  # needs a display on Linux
+
+from src.keyboard.keyboard import KeyboardEmulator
+from src.keyboard.sinks import RecordingSink
+from src.remote_controller.base_rc import BaseRemoteController
+from src.utils.control_loop import ControlLoop
+from src.utils.profile import CompiledProfile
+
+PROFILE = {
+    'name': 'test',
+    'axes': [{'input': 'pitch', 'keys': ['w', 's'], 'hold': 'cruise'}],
+    'buttons': [{'button': 4, 'gesture': 'short_tap', 'action': 'forward_cruise'}],
+    'sequence': [
+        {'duration': 10.0, 'tap': 'x'},
+        {'duration': 10.0, 'tap': 'y'},
+    ],
+}
+
+
+class FakeController(BaseRemoteController):
+    """Frames are whatever the test sets; connected is flipped by hand."""
+    def __init__(self):
+        super().__init__([[f'button{i}', False] for i in range(1, 5)], 0.1, 0.1)
+        self.bits = 0
+
+    def update(self):
+        self.update_buttons(self.bits)
+        return True
+
+    @property
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def setup():
+    sink = RecordingSink()
+    k_emu = KeyboardEmulator(print_events=False, sinks=[sink])
+    rc = FakeController()
+    loop = ControlLoop(rc, k_emu, [CompiledProfile(PROFILE, k_emu)])
+    yield rc, loop, sink
+    k_emu.close()
+
+
+def presses(sink, key):
+    return sum(1 for _, pressed, k in sink.events if pressed and k == key)
+
+
+def test_sequence_step_taps_once(setup):
+    rc, loop, sink = setup
+    start = time.perf_counter()
+    loop.seq_handler.start_sequence(loop.profile.sequence, start_time=start)
+    for _ in range(5):
+        loop.tick()
+    assert presses(sink, 'x') == 1
+
+    # Move the second step's start into the past: its key taps once too
+    loop.seq_handler.layers[0].ends[0] = start
+    for _ in range(5):
+        loop.tick()
+    assert presses(sink, 'x') == 1
+    assert presses(sink, 'y') == 1
+
+
+def test_no_keys_while_disconnected_and_holds_come_back(setup):
+    rc, loop, sink = setup
+    loop.tick()
+    rc.bits = 0b1000
+    loop.tick()
+    rc.bits = 0
+    loop.tick()  # short tap on button 4: forward cruise holds pitch at 1
+    assert loop.hold_cruise
+    assert sink.events[-1][1:] == (True, 'w')
+
+    rc.connected = False
+    rc.pitch = 0.0
+    loop.tick()
+    assert sink.events[-1][1:] == (False, 'w')
+    count = len(sink.events)
+    for _ in range(5):
+        loop.tick()
+    assert len(sink.events) == count  # the hold doesn't press 'w' again
+    assert loop.hold_cruise
+
+    rc.connected = True
+    loop.tick()
+    assert sink.events[-1][1:] == (True, 'w')
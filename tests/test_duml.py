@@ -0,0 +1,69 @@
+from src.remote_controller.duml import DumlStreamParser, build_frame, frame_seq
+
+
+def frame(seq, payload=b'\x01\x02\x03'):
+    return build_frame(0x06, 0x0a, seq, 0x40, 0x06, 0x01, payload)
+
+
+def parse(parser):
+    return [bytes(f) for f in parser.frames_available()]
+
+
+def test_garbage_before_a_frame_is_skipped():
+    parser = DumlStreamParser()
+    parser.feed(b'\x00\x12\x34' + frame(1))
+    assert parse(parser) == [frame(1)]
+    assert parser.dropped_bytes == 3
+    assert parser.corrupt_frames == 0
+
+
+def test_resyncs_after_a_bad_frame_crc():
+    bad = bytearray(frame(1))
+    bad[-1] ^= 0xFF
+    parser = DumlStreamParser()
+    parser.feed(bytes(bad) + frame(2))
+    frames = parse(parser)
+    assert frames == [frame(2)]
+    assert parser.corrupt_frames >= 1
+
+
+def test_resyncs_after_a_bad_header_crc():
+    bad = bytearray(frame(1))
+    bad[3] ^= 0xFF
+    parser = DumlStreamParser()
+    parser.feed(bytes(bad) + frame(2))
+    assert parse(parser) == [frame(2)]
+    assert parser.corrupt_frames >= 1
+
+
+def test_truncated_frame_followed_by_a_good_one():
+    parser = DumlStreamParser()
+    parser.feed(frame(1)[:7] + frame(2))
+    assert [frame_seq(f) for f in map(bytes, parser.frames_available())] == [2]
+
+
+def test_partial_frames_wait_for_the_rest():
+    data = frame(1) + frame(2)
+    parser = DumlStreamParser()
+    got = []
+    for i in range(len(data)):
+        parser.feed(data[i:i + 1])
+        got += parse(parser)
+        if i < len(frame(1)) - 1:
+            assert got == []
+    assert got == [frame(1), frame(2)]
+    assert parser.buffered == 0
+    assert parser.dropped_bytes == 0
+
+
+def test_split_across_many_feeds_with_compaction():
+    parser = DumlStreamParser(capacity=64)
+    got = []
+    for seq in range(50):
+        data = frame(seq)
+        parser.feed(data[:5])
+        got += parse(parser)
+        parser.feed(data[5:])
+        got += parse(parser)
+    assert [frame_seq(f) for f in got] == list(range(50))
+    assert parser.dropped_frames == 0
@@ -0,0 +1,79 @@
+from src.utils.gestures import (DOUBLE_TAP, LONG_PRESS, MAINTAINED_LONG_PRESS, PRESSED, SHORT_TAP,
+                                GestureEngine)
+
+B1, B2 = 1, 2
+
+
+def engine():
+    return GestureEngine([['button1', False], ['button2', False]], long_threshold=1.0, double_tap_window=0.3)
+
+
+def test_short_tap_on_release_for_one_frame():
+    g = engine()
+    g.update(B1, 0.0)
+    assert g.masks[PRESSED] == B1 and not g.masks[SHORT_TAP]
+    g.update(0, 0.2)
+    assert g.masks[SHORT_TAP] == B1
+    g.update(0, 0.25)
+    assert not g.masks[SHORT_TAP]
+
+
+def test_long_press_fires_once_at_the_threshold():
+    g = engine()
+    g.update(B1, 10.0)
+    g.update(B1, 10.99)
+    assert not g.masks[LONG_PRESS]
+    g.update(B1, 11.0)
+    assert g.masks[LONG_PRESS] == B1
+    assert g.masks[MAINTAINED_LONG_PRESS] == B1
+    g.update(B1, 12.0)
+    assert not g.masks[LONG_PRESS]
+    assert g.masks[MAINTAINED_LONG_PRESS] == B1
+    # Releasing a long press is not a tap
+    g.update(0, 12.5)
+    assert not g.masks[SHORT_TAP]
+
+
+def test_timing_follows_the_frame_timestamps():
+    g = engine()
+    g.update(B2, 5.0)
+    g.update(0, 5.9)  # 0.9 s apart: still a tap, however late the loop saw it
+    assert g.masks[SHORT_TAP] == B2
+
+
+def test_double_tap_inside_the_window():
+    g = engine()
+    g.update(B1, 0.0)
+    g.update(0, 0.1)
+    g.update(B1, 0.2)
+    g.update(0, 0.3)
+    assert g.masks[SHORT_TAP] == B1
+    assert g.masks[DOUBLE_TAP] == B1
+
+
+def test_no_double_tap_outside_the_window():
+    g = engine()
+    g.update(B1, 0.0)
+    g.update(0, 0.1)
+    g.update(B1, 0.5)
+    g.update(0, 0.6)
+    assert g.masks[SHORT_TAP] == B1
+    assert not g.masks[DOUBLE_TAP]
+
+
+def test_edges_within_one_tick_keep_the_tap():
+    g = engine()
+    g.update(0, 0.0)
+    g.update_edges([(B1, 0.010), (0, 0.015), (0, 0.020)])
+    assert g.masks[SHORT_TAP] == B1
+    assert not g.masks[PRESSED]
+    g.update(0, 0.030)
+    assert not g.masks[SHORT_TAP]
+
+
+def test_edges_within_one_tick_keep_a_double_tap():
+    g = engine()
+    g.update_edges([(B1, 0.00), (0, 0.05), (B1, 0.10), (0, 0.15), (B1, 0.20), (B1, 0.21)])
+    assert g.masks[SHORT_TAP] == B1
+    assert g.masks[DOUBLE_TAP] == B1
+    assert g.masks[PRESSED] == B1
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip('pynput.keyboard', exc_type=ImportError)  # needs a display on Linux
+
+from src.keyboard.keyboard import KeyboardEmulator
+from src.keyboard.sinks import RecordingSink
+from src.utils.profile import DEFAULT_PROFILE, CompiledProfile, ProfileError
+
+
+@pytest.fixture
+def k_emu():
+    k_emu = KeyboardEmulator(print_events=False, sinks=[RecordingSink()])
+    yield k_emu
+    k_emu.close()
+
+
+def test_default_profile_compiles(k_emu):
+    profile = CompiledProfile(DEFAULT_PROFILE, k_emu)
+    assert len(profile.axes) == 6
+    assert len(profile.sequence) == 3
+
+
+@pytest.mark.parametrize('data', [
+    {'axes': [{'keys': ['w', 's']}]},
+    {'axes': [{'input': 'pitch', 'keys': 5}]},
+    {'axes': [{'input': 'pitch', 'keys': ['w', 's'], 'when': 3}]},
+    {'axes': [{'input': 'speed', 'keys': ['w', 's']}]},
+    {'buttons': [{'button': 1, 'tap': 1}]},
+    {'buttons': [{'button': 5, 'tap': 'x'}]},
+    {'switches': [{'switch': 'sw1', 'taps': {'1': 2}}]},
+    {'sequence': [{'axes': {'pitch': 1.0}}]},
+    {'sequence': [{'duration': 1.0, 'ease': 'bounce'}]},
+])
+def test_malformed_profiles_raise_profile_error(k_emu, data):
+    with pytest.raises(ProfileError):
+        CompiledProfile(data, k_emu)
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.remote_controller import replay
+from src.remote_controller.replay import ReplayController
+from src.utils.recorder import HEADER, KIND_STATE, MAGIC, RECORD_HEADER, STATE
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(replay, 'time', SimpleNamespace(perf_counter=clock.perf_counter))
+    return clock
+
+
+def write_recording(path, count, period, pressed=()):
+    """A 'RC3' log with one state record every `period` seconds; buttons down for the indexes in `pressed`."""
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, b'RC3'))
+        for i in range(count):
+            payload = STATE.pack(0.0, 0.5, 0.0, 0.0, 0.0, 0, 0, 1 if i in pressed else 0)
+            f.write(RECORD_HEADER.pack(round(i * period * 1e9), KIND_STATE, len(payload)))
+            f.write(payload)
+
+
+def test_1khz_log_keeps_real_time_at_a_100hz_loop(tmp_path, clock):
+    path = str(tmp_path / 'fast.rec')
+    write_recording(path, 1000, 0.001, pressed=range(500, 505))
+    rc = ReplayController(path)
+    taps = updates = 0
+    try:
+        while rc.is_connected and updates < 200:
+            clock.now += 0.01
+            rc.update()
+            updates += 1
+            taps += rc.button1.is_short_tap
+    finally:
+        rc.close()
+    assert rc.frames == 1000
+    # 100 ticks of 10 ms, plus one early return per button edge
+    assert updates <= 103
+    assert taps == 1
+
+
+def test_speed_zero_applies_one_frame_per_update(tmp_path, clock):
+    path = str(tmp_path / 'steps.rec')
+    write_recording(path, 10, 0.5)
+    rc = ReplayController(path, speed=0)
+    try:
+        for _ in range(3):
+            assert rc.update()
+        assert rc.frames == 3
+    finally:
+        rc.close()
+
+
+def test_uses_the_recorded_models_dead_zones(tmp_path, clock):
+    path = str(tmp_path / 'rc3.rec')
+    write_recording(path, 1, 0.01)
+    rc = ReplayController(path)
+    try:
+        assert (rc.deadzone_threshold_movement, rc.deadzone_threshold_elevation) == (0.3, 0.6)
+    finally:
+        rc.close()
@@ -0,0 +1,50 @@
+from src.utils.sequence import SequenceHandler, SequenceStep, Timeline
+
+PITCH, YAW = 2, 1
+
+
+def steps():
+    return [
+        SequenceStep(1.0, {PITCH: 1.0}),
+        SequenceStep(0.5, {'tap': 'x'}),
+        SequenceStep(2.0, {YAW: 1.0}, ease='linear'),
+    ]
+
+
+def test_steps_follow_the_start_time():
+    timeline = Timeline(steps(), 100.0)
+    assert timeline.sample(100.0) == {PITCH: 1.0}
+    assert timeline.sample(100.99) == {PITCH: 1.0}
+    assert timeline.sample(101.0) == {'tap': 'x'}
+    # A late sample lands in the step it belongs to, later steps aren't pushed back
+    assert timeline.sample(102.5)[YAW] == 0.5
+    assert timeline.sample(103.5) is None
+    assert timeline.end_time == 103.5
+
+
+def test_linear_ramp_from_the_previous_step():
+    timeline = Timeline([SequenceStep(1.0, {YAW: 1.0}), SequenceStep(1.0, {YAW: -1.0}, ease='linear')], 0.0)
+    timeline.sample(0.5)
+    assert timeline.sample(1.0)[YAW] == 1.0
+    assert timeline.sample(1.5)[YAW] == 0.0
+
+
+def test_entered_only_on_the_first_update_of_a_step():
+    handler = SequenceHandler()
+    handler.start_sequence(steps(), start_time=0.0)
+    handler.update(1.0)
+    assert handler.entered == {'tap': 'x'}
+    for now in (1.1, 1.2, 1.3):
+        overrides, running = handler.update(now)
+        assert running and overrides == {'tap': 'x'}
+        assert handler.entered == {}
+
+
+def test_higher_layer_wins_and_finishing_stops():
+    handler = SequenceHandler()
+    handler.start_sequence([SequenceStep(1.0, {PITCH: 1.0, YAW: 1.0})], layer=0, start_time=0.0)
+    handler.start_sequence([SequenceStep(0.5, {YAW: -1.0})], layer=1, start_time=0.0)
+    assert handler.update(0.1) == ({PITCH: 1.0, YAW: -1.0}, True)
+    assert handler.update(0.6) == ({PITCH: 1.0, YAW: 1.0}, True)
+    assert handler.update(1.0) == ({}, False)
+    assert not handler.active
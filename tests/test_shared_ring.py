@@ -0,0 +1,74 @@
+import struct
+import threading
+
+from src.utils.shared_ring import SLOT_SEQ, SharedFrameRing
+
+FRAME = struct.Struct('<Qdd')
+
+
+def make_ring(slots=4):
+    return SharedFrameRing(FRAME, slots=slots, create=True)
+
+
+def test_read_and_latest():
+    ring = make_ring()
+    try:
+        assert ring.latest() is None
+        ring.publish(1, 1.0, 2.0)
+        ring.publish(2, 3.0, 4.0)
+        assert ring.read(0) == (1, 1.0, 2.0)
+        assert ring.latest() == (2, (2, 3.0, 4.0))
+    finally:
+        ring.close()
+
+
+def test_overwritten_slot_reads_as_none():
+    ring = make_ring(slots=4)
+    try:
+        for n in range(6):
+            ring.publish(n, float(n), float(n))
+        assert ring.read(0) is None
+        assert ring.read(1) is None
+        assert ring.read(5) == (5, 5.0, 5.0)
+    finally:
+        ring.close()
+
+
+def test_slot_being_written_reads_as_none():
+    ring = make_ring()
+    try:
+        ring.publish(1, 1.0, 1.0)
+        # Writer stopped halfway: the slot's sequence is odd
+        SLOT_SEQ.pack_into(ring.buf, ring._slot_offset(0), 1)
+        assert ring.read(0) is None
+    finally:
+        ring.close()
+
+
+def test_concurrent_reader_never_sees_a_torn_frame():
+    ring = make_ring(slots=8)
+    done = threading.Event()
+
+    def writer():
+        for n in range(1, 20000):
+            ring.publish(n, float(n), float(n))
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    reads = 0
+    last = 0
+    try:
+        while not done.is_set():
+            latest = ring.latest()
+            if latest is None:
+                continue
+            count, (n, a, b) = latest
+            assert n == count and a == b == float(n)
+            assert n >= last
+            last = n
+            reads += 1
+    finally:
+        thread.join()
+        ring.close()
+    assert reads